@@ -1,18 +1,36 @@
+import os
 import re
-import numpy as np
+from functools import lru_cache
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-# Try to load model safely
-try:
-    import joblib
-    model = joblib.load("model.pkl")
-    print("✅ Loaded trained model successfully.")
-except Exception as e:
-    print(f"⚠️ Could not load model.pkl: {e}")
-    print("Using dummy model instead.")
-    model = None
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model.pkl"))
+# Load the model when the server starts instead of on the first prediction
+WARM_UP_ON_START = os.getenv("WARM_UP_ON_START", "true").lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=1)
+def get_model():
+    """
+    Load the trained model on first use, so importing this module stays cheap.
+    Returns None (rule-based estimates only) if model.pkl is missing or corrupted.
+    """
+    try:
+        import joblib
+        model = joblib.load(MODEL_PATH)
+        print("✅ Loaded trained model successfully.")
+        return model
+    except Exception as e:
+        print(f"⚠️ Could not load model.pkl: {e}")
+        print("Using dummy model instead.")
+        return None
+
+
+def warm_up():
+    """Load the model ahead of the first request"""
+    if WARM_UP_ON_START:
+        get_model()
 
 
 def predict_emission(activity: str):
@@ -38,8 +56,10 @@ def predict_emission(activity: str):
 
     base_emission = value * factor
 
+    model = get_model()
     if model:
         try:
+            import numpy as np
             prediction = model.predict(np.array([[base_emission]]))[0]
             return float(prediction)
         except Exception as e:
@@ -52,6 +72,7 @@ def predict_emission(activity: str):
 # ---------------- FastAPI App ---------------- #
 
 app = FastAPI(title="CarbonSmart AI Prediction API")
+app.add_event_handler("startup", warm_up)
 
 # Allow frontend access
 app.add_middleware(
@@ -1,5 +1,5 @@
 from flask import Flask, request, jsonify
-from ai_predict import predict_emission
+from ai_predict import predict_emission, warm_up
 
 app = Flask(__name__)
 
@@ -18,4 +18,5 @@ def predict():
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
+    warm_up()
     app.run(host='127.0.0.1', port=8002)
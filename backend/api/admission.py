@@ -0,0 +1,303 @@
+# backend/api/admission.py
+"""
+Admission control for on-chain writes (mints and marketplace transfers).
+
+Every write is sent by the single backend signer, so one wallet flooding
+log/ with offset activities would otherwise take the signer from
+everyone else. Each write needs a token from three buckets:
+
+- the wallet's bucket for its kind (CHAIN_MINTS_PER_MINUTE, CHAIN_TRANSFERS_PER_MINUTE)
+- the user's bucket for its kind (same rates)
+- the signer's bucket shared by all writes (CHAIN_SIGNER_WRITES_PER_SECOND)
+
+A request that can't get its tokens straight away waits in its wallet's
+queue instead of being rejected. Waiting wallets are served round-robin,
+one write per wallet per turn, so a wallet with a long backlog can't delay
+the others. A request is only rejected (429) when its wallet already has
+CHAIN_QUEUE_MAX_PER_WALLET requests waiting or it has waited
+CHAIN_QUEUE_MAX_WAIT seconds.
+
+Buckets and queues live in the process, like the order book: limits
+apply per worker.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+CHAIN_MINTS_PER_MINUTE = float(os.getenv("CHAIN_MINTS_PER_MINUTE", "6"))
+CHAIN_MINT_BURST = int(os.getenv("CHAIN_MINT_BURST", "3"))
+CHAIN_TRANSFERS_PER_MINUTE = float(os.getenv("CHAIN_TRANSFERS_PER_MINUTE", "30"))
+CHAIN_TRANSFER_BURST = int(os.getenv("CHAIN_TRANSFER_BURST", "10"))
+CHAIN_SIGNER_WRITES_PER_SECOND = float(os.getenv("CHAIN_SIGNER_WRITES_PER_SECOND", "5"))
+CHAIN_SIGNER_BURST = int(os.getenv("CHAIN_SIGNER_BURST", "10"))
+CHAIN_QUEUE_MAX_WAIT = float(os.getenv("CHAIN_QUEUE_MAX_WAIT", "30"))
+CHAIN_QUEUE_MAX_PER_WALLET = int(os.getenv("CHAIN_QUEUE_MAX_PER_WALLET", "10"))
+
+# (tokens per second, burst) per kind, for both the wallet and the user bucket
+KIND_LIMITS = {
+    'mint': (CHAIN_MINTS_PER_MINUTE / 60, CHAIN_MINT_BURST),
+    'transfer': (CHAIN_TRANSFERS_PER_MINUTE / 60, CHAIN_TRANSFER_BURST),
+}
+
+# Idle full buckets and idle tenants' metrics are dropped after this many seconds
+IDLE_TIMEOUT = 3600
+# Waits kept per tenant for the recent average
+RECENT_WAITS = 100
+
+
+class AdmissionRejected(Exception):
+    """The write was not admitted; retry_after is a suggested delay in seconds"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: int) -> float:
+        """Seconds until cost tokens are available (after refill)"""
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+
+class _Waiter:
+    __slots__ = ('kind', 'wallet', 'user', 'cost', 'enqueued_at', 'admitted')
+
+    def __init__(self, kind, wallet, user, cost, now):
+        self.kind = kind
+        self.wallet = wallet
+        self.user = user
+        self.cost = cost
+        self.enqueued_at = now
+        self.admitted = False
+
+
+class _TenantStats:
+    __slots__ = ('admitted', 'queued', 'rejected', 'total_wait', 'max_wait', 'recent_waits', 'last_seen')
+
+    def __init__(self, now):
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=RECENT_WAITS)
+        self.last_seen = now
+
+
+class AdmissionController:
+    """Token buckets plus a round-robin queue of waiting writes per wallet"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._buckets = {}
+        # tenant -> deque of waiters; order is the round-robin order
+        self._queues = OrderedDict()
+        self._stats = {}
+        self._pruned_at = time.monotonic()
+
+    @staticmethod
+    def tenant_of(wallet: str = None, user: str = None) -> str:
+        return (wallet or '').lower() or f"user:{user or 'anonymous'}"
+
+    def _bucket(self, key: tuple, rate: float, burst: int, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, burst, now)
+        else:
+            bucket.refill(now)
+        return bucket
+
+    def _buckets_for(self, waiter: _Waiter, now: float) -> list:
+        rate, burst = KIND_LIMITS[waiter.kind]
+        buckets = [self._bucket(('signer',), CHAIN_SIGNER_WRITES_PER_SECOND, CHAIN_SIGNER_BURST, now)]
+        if waiter.wallet:
+            buckets.append(self._bucket(('wallet', waiter.kind, waiter.wallet.lower()), rate, burst, now))
+        if waiter.user:
+            buckets.append(self._bucket(('user', waiter.kind, waiter.user), rate, burst, now))
+        return buckets
+
+    def _dispatch(self, now: float) -> tuple:
+        """
+        Admit waiting writes round-robin while their buckets allow
+
+        Returns:
+            tuple of (waiters admitted, seconds until the next waiting write
+            could be admitted or None if none wait)
+        """
+        admitted = []
+        progressed = True
+        while progressed and self._queues:
+            progressed = False
+            for tenant in list(self._queues):
+                queue = self._queues[tenant]
+                waiter = queue[0]
+                buckets = self._buckets_for(waiter, now)
+                if any(bucket.wait_time(waiter.cost) for bucket in buckets):
+                    continue
+                for bucket in buckets:
+                    bucket.tokens -= waiter.cost
+                queue.popleft()
+                waiter.admitted = True
+                admitted.append(waiter)
+                progressed = True
+                # Served this turn: go to the back of the rotation
+                if queue:
+                    self._queues.move_to_end(tenant)
+                else:
+                    del self._queues[tenant]
+
+        next_ready = None
+        for queue in self._queues.values():
+            waiter = queue[0]
+            ready = max(bucket.wait_time(waiter.cost) for bucket in self._buckets_for(waiter, now))
+            next_ready = ready if next_ready is None else min(next_ready, ready)
+        return admitted, next_ready
+
+    def _record(self, tenant: str, now: float, wait: float = None, queued: bool = False, rejected: bool = False):
+        stats = self._stats.get(tenant)
+        if stats is None:
+            stats = self._stats[tenant] = _TenantStats(now)
+        stats.last_seen = now
+        if rejected:
+            stats.rejected += 1
+            return
+        stats.admitted += 1
+        if queued:
+            stats.queued += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        stats.recent_waits.append(wait)
+
+    def _prune(self, now: float):
+        if now - self._pruned_at < 60:
+            return
+        self._pruned_at = now
+        for key, bucket in list(self._buckets.items()):
+            idle = now - bucket.updated
+            bucket.refill(now)
+            if bucket.tokens >= bucket.burst and idle > IDLE_TIMEOUT:
+                del self._buckets[key]
+        for tenant, stats in list(self._stats.items()):
+            if tenant not in self._queues and now - stats.last_seen > IDLE_TIMEOUT:
+                del self._stats[tenant]
+
+    def admit(self, kind: str, wallet: str = None, user: str = None, cost: int = 1) -> float:
+        """
+        Wait until a write may be sent
+
+        Args:
+            kind: 'mint' or 'transfer'
+            wallet: wallet the write is for (the round-robin tenant)
+            user: username the write is for
+            cost: tokens the write takes from each bucket
+
+        Returns:
+            seconds spent waiting
+
+        Raises:
+            AdmissionRejected: the wallet's queue is full or the wait timed out
+        """
+        tenant = self.tenant_of(wallet, user)
+        with self._cond:
+            now = time.monotonic()
+            self._prune(now)
+            queue = self._queues.get(tenant)
+            if queue is not None and len(queue) >= CHAIN_QUEUE_MAX_PER_WALLET:
+                self._record(tenant, now, rejected=True)
+                _, next_ready = self._dispatch(now)
+                raise AdmissionRejected(
+                    f"Too many {kind} requests waiting for this wallet; try again shortly",
+                    max(1.0, next_ready or 1.0)
+                )
+
+            waiter = _Waiter(kind, wallet, user, cost, now)
+            if queue is None:
+                queue = self._queues[tenant] = deque()
+            queue.append(waiter)
+            deadline = now + CHAIN_QUEUE_MAX_WAIT
+            queued = False
+            while True:
+                admitted, next_ready = self._dispatch(now)
+                if any(other is not waiter for other in admitted):
+                    # Wake the threads whose writes were admitted here
+                    self._cond.notify_all()
+                if waiter.admitted:
+                    wait = now - waiter.enqueued_at
+                    self._record(tenant, now, wait, queued)
+                    return wait
+                queued = True
+                if now >= deadline:
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._queues[tenant]
+                    self._record(tenant, now, rejected=True)
+                    raise AdmissionRejected(
+                        f"Timed out after {CHAIN_QUEUE_MAX_WAIT:.0f}s waiting to send a {kind}; try again shortly",
+                        max(1.0, next_ready or 1.0)
+                    )
+                timeout = deadline - now if next_ready is None else min(deadline - now, next_ready)
+                self._cond.wait(max(timeout, 0.001))
+                now = time.monotonic()
+
+    def metrics(self, limit: int = 50) -> dict:
+        """Queue depth and wait times, overall and for the busiest tenants"""
+        with self._cond:
+            now = time.monotonic()
+            tenants = []
+            for tenant in set(self._stats) | set(self._queues):
+                stats = self._stats.get(tenant) or _TenantStats(now)
+                queue = self._queues.get(tenant, ())
+                recent = stats.recent_waits
+                tenants.append({
+                    'tenant': tenant,
+                    'depth': len(queue),
+                    'oldestWaitMs': round((now - queue[0].enqueued_at) * 1000) if queue else 0,
+                    'admitted': stats.admitted,
+                    'queued': stats.queued,
+                    'rejected': stats.rejected,
+                    'avgWaitMs': round(stats.total_wait / stats.admitted * 1000, 1) if stats.admitted else 0,
+                    'recentAvgWaitMs': round(sum(recent) / len(recent) * 1000, 1) if recent else 0,
+                    'maxWaitMs': round(stats.max_wait * 1000, 1),
+                })
+            tenants.sort(key=lambda t: (t['depth'], t['queued'] + t['rejected']), reverse=True)
+            return {
+                'depth': sum(len(queue) for queue in self._queues.values()),
+                'waitingWallets': len(self._queues),
+                'admitted': sum(t['admitted'] for t in tenants),
+                'queued': sum(t['queued'] for t in tenants),
+                'rejected': sum(t['rejected'] for t in tenants),
+                'tenants': tenants[:limit],
+            }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController()
+    return _controller
+
+
+def admit_chain_write(kind: str, wallet: str = None, user: str = None, cost: int = 1) -> float:
+    """Block until the write may be sent; see AdmissionController.admit"""
+    return get_admission_controller().admit(kind, wallet, user, cost)
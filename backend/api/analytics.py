@@ -0,0 +1,199 @@
+# backend/api/analytics.py
+"""
+Marketplace price and volume analytics.
+
+Every completed sale is folded into an hourly MarketPriceBucket for its
+activity type (trade count, ETH volume, CO2 volume, min/max and a
+price-per-tonne histogram). Queries never look at individual sales: they
+load the buckets in range into NumPy arrays and regroup them into the
+requested interval, so a year of hourly buckets is a few thousand rows.
+NumPy is imported on first use, not with this module (see api/startup.py).
+
+VWAP per tonne is exact (total ETH / total tonnes). Percentiles come from
+the merged histograms and are accurate to half a bin, about 2.3% of the
+price with HISTOGRAM_BINS_PER_DECADE = 50.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import MarketPriceBucket
+
+HISTOGRAM_BINS_PER_DECADE = 50
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# ?interval= -> seconds per output bucket
+ANALYTICS_INTERVALS = {
+    'hour': 3600,
+    'day': 86400,
+    'week': 7 * 86400,
+}
+# The Unix epoch was a Thursday; weeks start on Monday
+WEEK_OFFSET = 4 * 86400
+
+
+def price_per_tonne(price_eth: float, co2_grams: int):
+    """ETH per tonne of CO2, or None when the credit has no CO2 amount"""
+    if not co2_grams or co2_grams <= 0:
+        return None
+    return price_eth * 1_000_000 / co2_grams
+
+
+def price_bin(ppt: float) -> int:
+    return math.floor(math.log10(ppt) * HISTOGRAM_BINS_PER_DECADE)
+
+
+def _hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def record_sales(sales):
+    """
+    Fold completed sales into their hourly buckets
+
+    Args:
+        sales: iterable of (activity_type, price_eth, co2_grams, sold_at)
+    """
+    grouped = defaultdict(list)
+    for activity_type, price_eth, co2_grams, sold_at in sales:
+        grouped[(activity_type, _hour_start(sold_at or timezone.now()))].append((price_eth or 0, co2_grams or 0))
+
+    with transaction.atomic():
+        for (activity_type, bucket_start), trades in grouped.items():
+            bucket, _ = MarketPriceBucket.objects.select_for_update().get_or_create(
+                activity_type=activity_type,
+                bucket_start=bucket_start
+            )
+            histogram = bucket.price_per_tonne_histogram
+            for price_eth, co2_grams in trades:
+                bucket.trade_count += 1
+                bucket.volume_eth += price_eth
+                bucket.volume_grams += co2_grams
+                ppt = price_per_tonne(price_eth, co2_grams)
+                if ppt is None or ppt <= 0:
+                    continue
+                key = str(price_bin(ppt))
+                histogram[key] = histogram.get(key, 0) + 1
+                if bucket.min_price_per_tonne is None or ppt < bucket.min_price_per_tonne:
+                    bucket.min_price_per_tonne = ppt
+                if bucket.max_price_per_tonne is None or ppt > bucket.max_price_per_tonne:
+                    bucket.max_price_per_tonne = ppt
+            bucket.save()
+
+
+def record_listing_sales(listings, sold_at: datetime = None):
+    """Fold sold MarketplaceListings into the aggregates"""
+    record_sales(
+        (listing.activity_type, listing.price_eth, listing.co2_grams, sold_at or listing.sold_at)
+        for listing in listings
+    )
+
+
+def _stats_row(trade_count, volume_eth, volume_grams, min_ppt, max_ppt, histogram, bin_values) -> dict:
+    """Summary fields for one group; histogram is a dense count vector over bin_values"""
+    import numpy as np
+
+    tonnes = volume_grams / 1_000_000
+    percentiles = {}
+    binned = histogram.sum()
+    if binned:
+        cumulative = np.cumsum(histogram)
+        targets = np.asarray(PERCENTILES) / 100 * binned
+        picks = bin_values[np.searchsorted(cumulative, targets, side='left')]
+        # Bin centres can fall just outside the prices actually seen
+        picks = np.clip(picks, min_ppt, max_ppt)
+        percentiles = {f'p{q}': float(value) for q, value in zip(PERCENTILES, picks)}
+
+    return {
+        'tradeCount': int(trade_count),
+        'volumeEth': float(volume_eth),
+        'volumeTonnes': float(tonnes),
+        'vwapPerTonne': float(volume_eth / tonnes) if tonnes else None,
+        'minPricePerTonne': float(min_ppt) if np.isfinite(min_ppt) else None,
+        'maxPricePerTonne': float(max_ppt) if np.isfinite(max_ppt) else None,
+        'pricePerTonnePercentiles': percentiles,
+    }
+
+
+def compute_market_stats(start: datetime, end: datetime, interval: str = 'day', activity_type: str = None) -> dict:
+    """
+    Time-bucketed VWAP, percentiles, trade count and volume per activity type
+
+    Args:
+        start: inclusive start of the range
+        end: exclusive end of the range
+        interval: one of ANALYTICS_INTERVALS
+        activity_type: restrict to one activity type
+
+    Returns:
+        dict with 'series' (one row per activity type and interval) and
+        'summary' (one row per activity type over the whole range)
+    """
+    import numpy as np
+
+    step = ANALYTICS_INTERVALS[interval]
+    buckets = MarketPriceBucket.objects.filter(bucket_start__gte=_hour_start(start), bucket_start__lt=end)
+    if activity_type:
+        buckets = buckets.filter(activity_type=activity_type)
+    rows = list(buckets.order_by().values_list(
+        'activity_type', 'bucket_start', 'trade_count', 'volume_eth', 'volume_grams',
+        'min_price_per_tonne', 'max_price_per_tonne', 'price_per_tonne_histogram'
+    ))
+    if not rows:
+        return {'series': [], 'summary': []}
+
+    types, starts, counts, eth, grams, mins, maxs, histograms = zip(*rows)
+    counts = np.asarray(counts, dtype=np.int64)
+    eth = np.asarray(eth, dtype=np.float64)
+    grams = np.asarray(grams, dtype=np.float64)
+    mins = np.asarray([np.inf if v is None else v for v in mins], dtype=np.float64)
+    maxs = np.asarray([-np.inf if v is None else v for v in maxs], dtype=np.float64)
+
+    # Dense (rows x bins) histogram matrix over the bins that actually occur
+    bins = np.asarray(sorted({int(key) for histogram in histograms for key in histogram}), dtype=np.int64)
+    bin_index = {int(b): i for i, b in enumerate(bins)}
+    matrix = np.zeros((len(rows), len(bins)), dtype=np.int64)
+    for row, histogram in enumerate(histograms):
+        for key, count in histogram.items():
+            matrix[row, bin_index[int(key)]] = count
+    bin_values = 10 ** ((bins + 0.5) / HISTOGRAM_BINS_PER_DECADE)
+
+    # Group rows by (activity type, interval start)
+    type_names, type_codes = np.unique(np.asarray(types), return_inverse=True)
+    epoch = np.asarray([int(moment.timestamp()) for moment in starts], dtype=np.int64)
+    offset = WEEK_OFFSET if interval == 'week' else 0
+    interval_starts = (epoch - offset) // step * step + offset
+    keys = np.stack([type_codes, interval_starts], axis=1)
+    groups, group_codes = np.unique(keys, axis=0, return_inverse=True)
+    group_codes = group_codes.reshape(-1)
+
+    def reduce(codes, size):
+        sums = [np.bincount(codes, weights=values, minlength=size) for values in (counts, eth, grams)]
+        low = np.full(size, np.inf)
+        high = np.full(size, -np.inf)
+        np.minimum.at(low, codes, mins)
+        np.maximum.at(high, codes, maxs)
+        merged = np.zeros((size, len(bins)), dtype=np.int64)
+        np.add.at(merged, codes, matrix)
+        return sums, low, high, merged
+
+    (g_counts, g_eth, g_grams), g_low, g_high, g_hist = reduce(group_codes, len(groups))
+    series = []
+    for i, (type_code, interval_start) in enumerate(groups):
+        row = _stats_row(g_counts[i], g_eth[i], g_grams[i], g_low[i], g_high[i], g_hist[i], bin_values)
+        row['activityType'] = str(type_names[type_code])
+        row['bucketStart'] = datetime.fromtimestamp(int(interval_start), tz=dt_timezone.utc).isoformat()
+        series.append(row)
+
+    (t_counts, t_eth, t_grams), t_low, t_high, t_hist = reduce(type_codes, len(type_names))
+    summary = []
+    for i, name in enumerate(type_names):
+        row = _stats_row(t_counts[i], t_eth[i], t_grams[i], t_low[i], t_high[i], t_hist[i], bin_values)
+        row['activityType'] = str(name)
+        summary.append(row)
+
+    return {'series': series, 'summary': summary}
@@ -0,0 +1,158 @@
+# backend/api/archive.py
+"""
+Cold storage for old activities.
+
+`python manage.py archive_activities` moves Activity rows older than
+ACTIVITY_ARCHIVE_AFTER_DAYS into ActivityArchive, keeping their id and
+columns and storing the request payload as zlib-compressed JSON. Rows
+that still take part in the marketplace stay in the hot table: minted
+credits (listing and order book lookups go by token_id), rows referenced
+by a listing, and rows whose transaction is still pending.
+
+User history reads both tables and merges them on (timestamp, id), so
+archived rows come back in the same shape and order as before they moved.
+"""
+import heapq
+import json
+import os
+import zlib
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Activity, ActivityArchive
+from .pagination import decode_cursor, encode_cursor, keyset_filter
+from .serializers import ACTIVITY_FIELDS, format_datetime
+
+ACTIVITY_ARCHIVE_AFTER_DAYS = int(os.getenv("ACTIVITY_ARCHIVE_AFTER_DAYS", "180"))
+ACTIVITY_ARCHIVE_BATCH_SIZE = int(os.getenv("ACTIVITY_ARCHIVE_BATCH_SIZE", "1000"))
+
+COMPRESSION_LEVEL = 6
+
+# Preset zlib dictionary: activity payloads are a few hundred bytes, too
+# small to compress on their own, but nearly all share these keys and
+# values. Blobs can only be read with the dictionary they were written
+# with, so this must never change once rows have been archived.
+COMPRESSION_DICTIONARY = (
+    b'"transport","electricity","waste","driving","flight","home_energy","renewable_energy",'
+    b'"carbon_offset","recycling","tree_planting","solar_energy", km kWh kg miles trees '
+    b'{"user":"","activity_type":"","activity":"","user_wallet":"0x",'
+    b'"is_offset":false,"wait_for_confirmation":false}'
+    b'{"user":"","activity_type":"","activity":"","user_wallet":"0x",'
+    b'"is_offset":true,"wait_for_confirmation":true}'
+)
+
+# ActivityArchive columns read back for history, in ACTIVITY_FIELDS order
+ARCHIVE_FIELDS = tuple('data_compressed' if field == 'data' else field for field in ACTIVITY_FIELDS)
+
+
+def compress_data(data) -> bytes:
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=COMPRESSION_DICTIONARY)
+    return compressor.compress(json.dumps(data, separators=(',', ':')).encode()) + compressor.flush()
+
+
+def decompress_data(blob):
+    decompressor = zlib.decompressobj(zdict=COMPRESSION_DICTIONARY)
+    return json.loads(decompressor.decompress(bytes(blob)) + decompressor.flush())
+
+
+def archive_cutoff(days: int = None):
+    """Activities logged before this moment are old enough to archive"""
+    return timezone.now() - timedelta(days=ACTIVITY_ARCHIVE_AFTER_DAYS if days is None else days)
+
+
+def archivable_activities(cutoff):
+    """Activities older than cutoff that no longer take part in the marketplace"""
+    return Activity.objects.filter(
+        timestamp__lt=cutoff,
+        token_id__isnull=True,
+    ).exclude(
+        listings__isnull=False
+    ).exclude(
+        purchased_listings__isnull=False
+    ).exclude(
+        pending_transactions__status='pending'
+    )
+
+
+def archive_activities(cutoff, batch_size: int = ACTIVITY_ARCHIVE_BATCH_SIZE) -> dict:
+    """
+    Move archivable activities older than cutoff into ActivityArchive
+
+    Each batch is copied and deleted in one transaction, so an interrupted
+    run leaves every row in exactly one of the two tables.
+
+    Args:
+        cutoff: datetime; only activities logged before it are moved
+        batch_size: rows moved per transaction
+
+    Returns:
+        dict with archived (rows moved), data_bytes (payload size as JSON)
+        and compressed_bytes (payload size stored)
+    """
+    stats = {'archived': 0, 'data_bytes': 0, 'compressed_bytes': 0}
+    while True:
+        with transaction.atomic():
+            rows = list(archivable_activities(cutoff).order_by('id').values(*ACTIVITY_FIELDS)[:batch_size])
+            if not rows:
+                return stats
+            archived = []
+            for row in rows:
+                data = row.pop('data')
+                row['data_compressed'] = compress_data(data)
+                stats['data_bytes'] += len(json.dumps(data, separators=(',', ':')))
+                stats['compressed_bytes'] += len(row['data_compressed'])
+                archived.append(ActivityArchive(**row))
+            ActivityArchive.objects.bulk_create(archived)
+            Activity.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            stats['archived'] += len(rows)
+
+
+def get_user_activity_page(username: str, limit: int = None, cursor: str = None) -> tuple:
+    """
+    A user's activities, newest first, from the hot table and the archive
+
+    Each table is read with a keyset query on (timestamp, id) and the two
+    are merged, so a page that reaches past the hot rows continues into
+    archived ones. Only archived rows that make it onto the page are
+    decompressed.
+
+    Args:
+        username: Activity.user
+        limit: page size, or None for the whole history
+        cursor: next_cursor from the previous page (raises InvalidCursor if malformed)
+
+    Returns:
+        tuple of (rows, next_cursor); rows match ActivitySerializer output
+        and next_cursor is None on the last page
+    """
+    hot = Activity.objects.filter(user=username)
+    cold = ActivityArchive.objects.filter(user=username)
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        hot = hot.filter(keyset_filter('timestamp', True, value, row_id))
+        cold = cold.filter(keyset_filter('timestamp', True, value, row_id))
+
+    hot = hot.order_by('-timestamp', '-id').values(*ACTIVITY_FIELDS)
+    cold = cold.order_by('-timestamp', '-id').values(*ARCHIVE_FIELDS)
+    if limit is not None:
+        hot, cold = hot[:limit + 1], cold[:limit + 1]
+
+    rows = list(heapq.merge(hot, cold, key=lambda row: (row['timestamp'], row['id']), reverse=True))
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['timestamp'], rows[-1]['id'])
+
+    tz = timezone.get_current_timezone()
+    page = []
+    for row in rows:
+        if 'data_compressed' in row:
+            row = {
+                field: decompress_data(row['data_compressed']) if field == 'data' else row[field]
+                for field in ACTIVITY_FIELDS
+            }
+        row['timestamp'] = format_datetime(row['timestamp'], tz)
+        page.append(row)
+    return page, next_cursor
@@ -0,0 +1,145 @@
+# backend/api/async_views.py
+"""
+Async views for the read-only endpoints that mostly wait on the chain.
+
+Served under ASGI (backend/asgi.py), a request waiting on the node holds
+a coroutine instead of a worker thread, so one worker process carries
+many concurrent chain reads. They still work under WSGI, where Django
+runs each one to completion on its own event loop and the loop's RPC
+session is closed with the request.
+
+DRF's api_view does not run async handlers, so these are plain Django
+views returning the same JSON bodies.
+"""
+from functools import wraps
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotAllowed, JsonResponse
+
+from .blockchain_utils import aget_user_credits, acheck_nft_approval, aget_connection_status
+
+
+def async_api_view(methods: list):
+    """Restrict an async view to the given HTTP methods"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                if not isinstance(request, ASGIRequest):
+                    # Under WSGI the event loop ends with this request
+                    from .async_web3 import close_async_client
+                    await close_async_client()
+        return wrapper
+    return decorator
+
+
+@async_api_view(['GET'])
+async def get_blockchain_credits(request, wallet_address):
+    """
+    Get all carbon credit NFTs for a wallet address directly from blockchain.
+
+    URL: GET /api/credits/<wallet_address>/
+    """
+    try:
+        result = await aget_user_credits(wallet_address)
+        if result.get('success'):
+            return JsonResponse({
+                'wallet': wallet_address,
+                'credits': result.get('credits', []),
+                'total_credits': len(result.get('credits', []))
+            }, status=200)
+        else:
+            return JsonResponse({
+                'error': result.get('error', 'Unknown error')
+            }, status=400)
+    except Exception as e:
+        print(f"Error fetching blockchain credits: {e}")
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@async_api_view(['GET'])
+async def blockchain_status(request):
+    """
+    Check blockchain connection status.
+
+    URL: GET /api/blockchain/status/
+    """
+    try:
+        return JsonResponse(await aget_connection_status(), status=200)
+    except Exception as e:
+        return JsonResponse({"error": str(e), "connected": False}, status=500)
+
+
+@async_api_view(['GET'])
+async def get_user_nft_credits(request, wallet_address):
+    """
+    Get all NFT credits owned by a user's wallet address.
+    This fetches directly from the blockchain.
+
+    URL: GET /api/marketplace/user-credits/<wallet_address>/
+    """
+    try:
+        result = await aget_user_credits(wallet_address)
+
+        if result.get('success'):
+            credits = result.get('credits', [])
+            return JsonResponse({
+                'success': True,
+                'credits': credits,
+                'count': len(credits)
+            }, status=200)
+        else:
+            return JsonResponse({
+                'success': False,
+                'error': result.get('error', 'Failed to fetch credits'),
+                'credits': []
+            }, status=400)
+
+    except Exception as e:
+        print(f"Error fetching user NFT credits: {e}")
+        return JsonResponse({
+            'success': False,
+            'error': str(e),
+            'credits': []
+        }, status=500)
+
+
+@async_api_view(['GET'])
+async def check_approval_status(request, token_id, owner_address):
+    """
+    Check if the backend contract is approved to transfer a specific NFT
+
+    URL: GET /api/marketplace/check-approval/<token_id>/<owner_address>/?refresh=true
+
+    getApproved and isApprovedForAll are read concurrently. Pass
+    refresh=true right after approving to bypass the read cache.
+    """
+    try:
+        fresh = request.GET.get('refresh', '').lower() in ('1', 'true', 'yes')
+        approval_result = await acheck_nft_approval(owner_address, int(token_id), fresh=fresh)
+
+        if approval_result.get('success'):
+            return JsonResponse({
+                'success': True,
+                'approved': approval_result.get('approved'),
+                'backend_address': approval_result.get('backend_address'),
+                'is_approved_for_all': approval_result.get('is_approved_for_all')
+            }, status=200)
+        else:
+            return JsonResponse({
+                'success': False,
+                'error': approval_result.get('error'),
+                'approved': False
+            }, status=400)
+
+    except Exception as e:
+        print(f"Error checking approval: {e}")
+        return JsonResponse({
+            'success': False,
+            'error': str(e),
+            'approved': False
+        }, status=500)
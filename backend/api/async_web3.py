@@ -0,0 +1,194 @@
+# backend/api/async_web3.py
+"""
+AsyncWeb3 client for the read-only, chain-bound endpoints.
+
+Under ASGI one worker process serves many requests on a single event loop.
+Each loop gets one AsyncWeb3 client whose aiohttp session (and its
+connection pool) is shared by every request on that loop, so waiting on
+the node costs a coroutine rather than a worker thread. Independent reads
+within one request are issued together with asyncio.gather.
+
+Reads skip web3's contract layer: each function's selector and ABI types
+are resolved once, and eth_call goes straight to the provider. Looking up
+the ABI entry and running the middleware stack on every call otherwise
+costs a few milliseconds of CPU, which caps how many calls one event loop
+can keep in flight.
+
+Results go through the same chain_cache entries as web3_interact's sync
+reads, so both paths share hits and invalidations.
+"""
+import asyncio
+import os
+
+import aiohttp
+from eth_abi import decode, encode
+from eth_utils.abi import function_abi_to_4byte_selector, get_abi_input_types, get_abi_output_types
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, AsyncHTTPProvider, Web3
+
+from .chain_cache import chain_cache
+from .web3_interact import RPC_URLS, CONTRACT_ADDRESS, CREDITS_PAGE_SIZE, format_credit, load_contract_abi
+
+# Connections one worker's session keeps open to the node (bounds in-flight RPC calls)
+ASYNC_RPC_MAX_CONNECTIONS = int(os.getenv("ASYNC_RPC_MAX_CONNECTIONS", "100"))
+ASYNC_RPC_TIMEOUT = float(os.getenv("ASYNC_RPC_TIMEOUT", "30"))
+
+
+class AsyncChainClient:
+    """CarbonCredit reads bound to one event loop and one aiohttp session"""
+
+    def __init__(self, rpc_url: str = None, contract_address: str = None,
+                 max_connections: int = ASYNC_RPC_MAX_CONNECTIONS):
+        self.rpc_url = rpc_url or RPC_URLS[0]
+        self.contract_address = Web3.to_checksum_address(contract_address or CONTRACT_ADDRESS)
+        self.max_connections = max_connections
+        self.w3 = None
+        self.session = None
+        # function name -> (selector hex, input types, output types)
+        self.functions = {}
+        for entry in load_contract_abi():
+            if entry.get('type') == 'function' and entry['name'] not in self.functions:
+                self.functions[entry['name']] = (
+                    '0x' + function_abi_to_4byte_selector(entry).hex(),
+                    get_abi_input_types(entry),
+                    get_abi_output_types(entry)
+                )
+
+    async def connect(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=ASYNC_RPC_TIMEOUT)
+        )
+        provider = AsyncHTTPProvider(self.rpc_url)
+        await provider.cache_async_session(self.session)
+        self.w3 = AsyncWeb3(provider)
+        return self
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+
+    async def call(self, function_name: str, *args):
+        """
+        eth_call a contract view function at the latest block
+
+        Args:
+            function_name: contract function name
+            *args: function arguments
+
+        Returns:
+            The decoded return value (a tuple for several outputs)
+        """
+        selector, input_types, output_types = self.functions[function_name]
+        response = await self.w3.provider.make_request('eth_call', [
+            {'to': self.contract_address, 'data': selector + encode(input_types, args).hex()},
+            'latest'
+        ])
+        if response.get('error'):
+            raise ValueError(f"{function_name} failed: {response['error'].get('message', response['error'])}")
+        values = decode(output_types, HexBytes(response['result']))
+        return values[0] if len(values) == 1 else values
+
+    async def balance_of(self, owner_address: str, fresh: bool = False) -> int:
+        return await chain_cache.aget_or_fetch(
+            'balanceOf', (owner_address,),
+            lambda: self.call('balanceOf', owner_address),
+            fresh=fresh
+        )
+
+    async def get_credit(self, token_id: int):
+        return await chain_cache.aget_or_fetch(
+            'getCredit', (token_id,),
+            lambda: self.call('getCredit', token_id)
+        )
+
+    async def get_approved(self, token_id: int, fresh: bool = False) -> str:
+        return await chain_cache.aget_or_fetch(
+            'getApproved', (token_id,),
+            lambda: self._get_approved(token_id),
+            fresh=fresh
+        )
+
+    async def _get_approved(self, token_id: int) -> str:
+        return Web3.to_checksum_address(await self.call('getApproved', token_id))
+
+    async def is_approved_for_all(self, owner_address: str, operator_address: str, fresh: bool = False) -> bool:
+        return await chain_cache.aget_or_fetch(
+            'isApprovedForAll', (owner_address, operator_address),
+            lambda: self.call('isApprovedForAll', owner_address, operator_address),
+            fresh=fresh
+        )
+
+    async def get_user_token_ids(self, user_address: str, page_size: int = CREDITS_PAGE_SIZE) -> list:
+        """All token IDs of an owner; every getUserCreditsPaged page is requested at once"""
+        # Fresh, so a balance cached before a mint or transfer can't drop the last page
+        balance = await self.balance_of(user_address, fresh=True)
+        if balance == 0:
+            return []
+        pages = await asyncio.gather(*[
+            self.call('getUserCreditsPaged', user_address, offset, page_size)
+            for offset in range(0, balance, page_size)
+        ])
+        return [token_id for page in pages for token_id in page]
+
+    async def get_user_credits(self, user_address: str) -> dict:
+        """Async get_user_credits: token IDs, then every uncached getCredit concurrently"""
+        try:
+            user_address = Web3.to_checksum_address(user_address)
+            token_ids = await self.get_user_token_ids(user_address)
+            credit_data = await asyncio.gather(*[self.get_credit(token_id) for token_id in token_ids])
+            return {'success': True, 'credits': [
+                format_credit(token_id, data) for token_id, data in zip(token_ids, credit_data)
+            ]}
+        except Exception as e:
+            print(f"Error getting user credits: {e}")
+            return {'success': False, 'error': str(e), 'credits': []}
+
+    async def check_nft_approval(self, owner_address: str, token_id: int, backend_address: str,
+                                 fresh: bool = False) -> dict:
+        """Async check_nft_approval: getApproved and isApprovedForAll in parallel"""
+        try:
+            owner_address = Web3.to_checksum_address(owner_address)
+            approved_address, is_approved_for_all = await asyncio.gather(
+                self.get_approved(token_id, fresh=fresh),
+                self.is_approved_for_all(owner_address, backend_address, fresh=fresh),
+                return_exceptions=True
+            )
+            if isinstance(approved_address, Exception):
+                approved_address = None
+            if isinstance(is_approved_for_all, Exception):
+                is_approved_for_all = False
+            is_approved = bool(approved_address) and approved_address.lower() == backend_address.lower()
+            return {
+                'success': True,
+                'approved': is_approved or is_approved_for_all,
+                'approved_address': approved_address,
+                'is_approved_for_all': is_approved_for_all,
+                'backend_address': backend_address
+            }
+        except Exception as e:
+            print(f"Error checking approval: {e}")
+            return {'success': False, 'approved': False, 'error': str(e)}
+
+
+_clients = {}
+
+
+async def get_async_client() -> AsyncChainClient:
+    """The client for the running event loop, created on first use"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        # Stored as a task so concurrent first requests share one connect()
+        client = _clients[loop] = asyncio.ensure_future(AsyncChainClient().connect())
+        # Under WSGI every async view runs on a short-lived loop; forget closed ones
+        for other in [other for other in _clients if other.is_closed()]:
+            del _clients[other]
+    return await client
+
+
+async def close_async_client():
+    """Close the running loop's client, for loops that end with the request (WSGI)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await (await client).close()
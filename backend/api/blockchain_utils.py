@@ -1,10 +1,604 @@
 # backend/api/blockchain_utils.py
-def mint_credit(user_address, emission_amount):
+"""
+Chain backend selection.
+
+Everything the API needs from the CarbonCredit contract goes through a
+ChainBackend: minting, transfers, ownership and approval reads, credit
+listings and receipt polling. Two implementations exist:
+
+- Web3ChainBackend (CHAIN_BACKEND=web3, the default) talks to the deployed
+  contract through web3_interact.
+- InMemoryChainBackend (CHAIN_BACKEND=memory) simulates the contract in
+  process: sequential token IDs, per-owner enumeration, single-token and
+  operator approvals, and the same revert reasons. Every transaction is
+  mined instantly into its own block. Use it for staging and load tests
+  that should not need a node; state is lost when the process exits.
+
+Call sites import the module-level functions below, which forward to the
+backend chosen in settings.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+# keccak256("CreditMinted(address,uint256,uint256,bytes32)"); the simulator's mint receipts carry it too.
+# Spelled out so importing this module doesn't pull in web3 (see web3_interact)
+CREDIT_MINTED_TOPIC = '0xd144b683c17e4ce00292ab7407786ebb7b3f25c23f807eaea0adecef26767c82'
+# The contract packs amounts into a uint128 and the activity type into a bytes32
+MAX_CO2_GRAMS = 2 ** 128 - 1
+MAX_ACTIVITY_TYPE_BYTES = 32
+
+# Return transaction hashes as soon as they are broadcast and confirm them in
+# the background (see api/tx_tracker.py) instead of blocking the request
+ASYNC_TX_SUBMISSION = os.getenv("ASYNC_TX_SUBMISSION", "false").lower() in ("1", "true", "yes")
+
+# Receipts the simulator keeps for get_transaction_receipts (oldest are dropped first)
+CHAIN_SIMULATOR_RECEIPTS = int(os.getenv("CHAIN_SIMULATOR_RECEIPTS", "100000"))
+# Treat every owner as having called setApprovalForAll(backend wallet), as sellers
+# are asked to before listing; without it transfers need explicit approvals
+CHAIN_SIMULATOR_AUTO_APPROVE = os.getenv("CHAIN_SIMULATOR_AUTO_APPROVE", "true").lower() in ("1", "true", "yes")
+# Backend wallet used by the simulator when PRIVATE_KEY is not set
+SIMULATOR_BACKEND_ADDRESS = '0x000000000000000000000000000000000000bacc'
+
+
+class ChainBackend:
+    """Operations the API performs against the CarbonCredit contract"""
+
+    name = None
+
+    def get_backend_address(self) -> str:
+        """Address of the wallet that mints and transfers on behalf of users"""
+        raise NotImplementedError
+
+    def mint_credit(self, user_address: str, emission_amount: float, activity_type: str = "general",
+                    wait_for_receipt: bool = True) -> dict:
+        raise NotImplementedError
+
+    def transfer_nft(self, from_address: str, to_address: str, token_id: int, wait_for_receipt: bool = True) -> dict:
+        raise NotImplementedError
+
+    def batch_transfer_nfts(self, transfers: list, to_address: str, wait_for_receipt: bool = True) -> dict:
+        raise NotImplementedError
+
+    def owner_of(self, token_id: int, fresh: bool = False) -> str:
+        raise NotImplementedError
+
+    def get_user_balance(self, user_address: str) -> int:
+        raise NotImplementedError
+
+    def get_user_credits(self, user_address: str) -> dict:
+        raise NotImplementedError
+
+    def check_nft_approval(self, owner_address: str, token_id: int, fresh: bool = False) -> dict:
+        raise NotImplementedError
+
+    def check_nft_approvals(self, owner_address: str, token_ids: list, fresh: bool = False) -> dict:
+        raise NotImplementedError
+
+    def get_transaction_receipts(self, tx_hashes: list) -> dict:
+        raise NotImplementedError
+
+    def get_minted_token_id(self, raw_receipt: dict):
+        """Read the token ID from the CreditMinted log of a raw (unformatted) receipt"""
+        for log in raw_receipt.get('logs', []):
+            topics = log.get('topics', [])
+            if len(topics) >= 3 and topics[0].lower().removeprefix('0x') == CREDIT_MINTED_TOPIC.lower().removeprefix('0x'):
+                return int(topics[2], 16)
+        return None
+
+    def get_block_number(self):
+        raise NotImplementedError
+
+    def invalidate_token_cache(self, token_id: int, *owner_addresses: str):
+        """Drop any cached reads touched by a transfer of token_id"""
+
+    def get_connection_status(self) -> dict:
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Create clients and connections ahead of the first request"""
+
+    # Async variants for ASGI views; by default the sync call runs in a worker thread
+
+    async def aget_user_credits(self, user_address: str) -> dict:
+        return await sync_to_async(self.get_user_credits, thread_sensitive=False)(user_address)
+
+    async def acheck_nft_approval(self, owner_address: str, token_id: int, fresh: bool = False) -> dict:
+        return await sync_to_async(self.check_nft_approval, thread_sensitive=False)(owner_address, token_id, fresh)
+
+    async def aget_connection_status(self) -> dict:
+        return await sync_to_async(self.get_connection_status, thread_sensitive=False)()
+
+
+class Web3ChainBackend(ChainBackend):
+    """The deployed contract, through web3_interact"""
+
+    name = 'web3'
+
+    def __init__(self):
+        from . import web3_interact
+        self.web3 = web3_interact
+
+    def get_backend_address(self) -> str:
+        return self.web3.get_backend_account().address
+
+    def mint_credit(self, user_address, emission_amount, activity_type="general", wait_for_receipt=True):
+        return self.web3.mint_credit(user_address, emission_amount, activity_type, wait_for_receipt)
+
+    def transfer_nft(self, from_address, to_address, token_id, wait_for_receipt=True):
+        return self.web3.transfer_nft(from_address, to_address, token_id, wait_for_receipt)
+
+    def batch_transfer_nfts(self, transfers, to_address, wait_for_receipt=True):
+        return self.web3.batch_transfer_nfts(transfers, to_address, wait_for_receipt)
+
+    def owner_of(self, token_id, fresh=False):
+        return self.web3.cached_owner_of(token_id, fresh=fresh)
+
+    def get_user_balance(self, user_address):
+        return self.web3.get_user_balance(user_address)
+
+    def get_user_credits(self, user_address):
+        return self.web3.get_user_credits(user_address)
+
+    def check_nft_approval(self, owner_address, token_id, fresh=False):
+        return self.web3.check_nft_approval(owner_address, token_id, fresh=fresh)
+
+    def check_nft_approvals(self, owner_address, token_ids, fresh=False):
+        return self.web3.check_nft_approvals(owner_address, token_ids, fresh=fresh)
+
+    def get_transaction_receipts(self, tx_hashes):
+        return self.web3.get_transaction_receipts(tx_hashes)
+
+    def get_minted_token_id(self, raw_receipt):
+        return self.web3.get_minted_token_id(raw_receipt)
+
+    def get_block_number(self):
+        from .head_tracker import get_head_tracker
+        return get_head_tracker().block_number
+
+    def invalidate_token_cache(self, token_id, *owner_addresses):
+        self.web3.invalidate_token_cache(token_id, *owner_addresses)
+
+    def get_connection_status(self):
+        return self.web3.get_connection_status()
+
+    def warm_up(self):
+        self.web3.warm_up()
+        # The async views' client module (aiohttp, AsyncWeb3)
+        from . import async_web3  # noqa: F401
+
+    async def aget_user_credits(self, user_address):
+        from .async_web3 import get_async_client
+        return await (await get_async_client()).get_user_credits(user_address)
+
+    async def acheck_nft_approval(self, owner_address, token_id, fresh=False):
+        from .async_web3 import get_async_client
+        if not self.web3.get_contract():
+            return {'success': False, 'approved': False, 'error': 'Contract not initialized'}
+        client = await get_async_client()
+        return await client.check_nft_approval(owner_address, token_id, self.get_backend_address(), fresh=fresh)
+
+
+class ChainRevert(Exception):
+    """A simulated transaction or call that the contract would revert"""
+
+
+class InMemoryChainBackend(ChainBackend):
     """
-    Mock blockchain minting — replace with Web3 integration later.
+    In-process simulation of CarbonCredit (ERC721 + per-owner enumeration)
+
+    All state sits behind one lock; each write is one transaction mined
+    into its own block, like a Hardhat node with automine.
     """
-    print(f"Simulating mint for {user_address} with emission {emission_amount}")
-    if emission_amount > 0:
-        return "0x123abcFAKEHASH"
-    else:
-        return "Minting failed"
+
+    name = 'memory'
+    chain_id = 31337
+
+    def __init__(self, backend_address: str = None, auto_approve: bool = CHAIN_SIMULATOR_AUTO_APPROVE):
+        self._lock = threading.Lock()
+        self.backend_address = backend_address or self._default_backend_address()
+        self.auto_approve = auto_approve
+        self.last_token_id = 0
+        self.block_number = 0
+        self.owners = {}  # tokenId -> owner
+        self.credits = {}  # tokenId -> (co2 grams, timestamp, activity type)
+        self.owned_tokens = {}  # owner -> [tokenId], order as getUserCredits returns it
+        self.owned_index = {}  # tokenId -> index in its owner's list
+        self.token_approvals = {}  # tokenId -> approved address
+        self.operator_approvals = set()  # (owner, operator)
+        self.receipts = OrderedDict()
+
+    @staticmethod
+    def _default_backend_address() -> str:
+        from web3 import Web3
+        private_key = os.getenv("PRIVATE_KEY", "")
+        if not private_key:
+            return Web3.to_checksum_address(SIMULATOR_BACKEND_ADDRESS)
+        from eth_account import Account
+        return Account.from_key(private_key if private_key.startswith('0x') else f'0x{private_key}').address
+
+    # Contract semantics (callers hold self._lock)
+
+    def _owner_of(self, token_id: int) -> str:
+        owner = self.owners.get(token_id)
+        if owner is None:
+            raise ChainRevert("ERC721: invalid token ID")
+        return owner
+
+    def _is_approved_for_all(self, owner: str, operator: str) -> bool:
+        if self.auto_approve and operator == self.backend_address:
+            return True
+        return (owner, operator) in self.operator_approvals
+
+    def _is_approved_or_owner(self, spender: str, token_id: int) -> bool:
+        owner = self._owner_of(token_id)
+        return (spender == owner
+                or self.token_approvals.get(token_id) == spender
+                or self._is_approved_for_all(owner, spender))
+
+    def _add_to_owner(self, owner: str, token_id: int):
+        tokens = self.owned_tokens.setdefault(owner, [])
+        self.owned_index[token_id] = len(tokens)
+        tokens.append(token_id)
+
+    def _remove_from_owner(self, owner: str, token_id: int):
+        # Swap the last token into the removed slot, as the contract does
+        tokens = self.owned_tokens[owner]
+        index = self.owned_index.pop(token_id)
+        last_token = tokens.pop()
+        if last_token != token_id:
+            tokens[index] = last_token
+            self.owned_index[last_token] = index
+
+    def _transfer(self, from_address: str, to_address: str, token_id: int):
+        if self._owner_of(token_id) != from_address:
+            raise ChainRevert("ERC721: transfer from incorrect owner")
+        if to_address == ZERO_ADDRESS:
+            raise ChainRevert("ERC721: transfer to the zero address")
+        self.token_approvals.pop(token_id, None)
+        if from_address != to_address:
+            self._remove_from_owner(from_address, token_id)
+            self._add_to_owner(to_address, token_id)
+        self.owners[token_id] = to_address
+
+    def _mine(self, logs: list = ()) -> tuple:
+        """Record a successful transaction in a new block; returns (tx hash, receipt)"""
+        self.block_number += 1
+        tx_hash = f"0x{self.block_number:064x}"
+        receipt = {
+            'transactionHash': tx_hash,
+            'status': '0x1',
+            'blockNumber': hex(self.block_number),
+            'gasUsed': '0x0',
+            'logs': list(logs),
+        }
+        self.receipts[tx_hash] = receipt
+        while len(self.receipts) > CHAIN_SIMULATOR_RECEIPTS:
+            self.receipts.popitem(last=False)
+        return tx_hash, receipt
+
+    @staticmethod
+    def _checksum(address: str) -> str:
+        from web3 import Web3
+        if not Web3.is_address(address):
+            raise ChainRevert(f"Invalid Ethereum address: {address}")
+        return Web3.to_checksum_address(address)
+
+    def _result(self, tx_hash: str, wait_for_receipt: bool, **fields) -> dict:
+        result = {'success': True, 'transaction_hash': tx_hash, **fields}
+        if wait_for_receipt:
+            result.update({'block_number': self.block_number, 'gas_used': 0})
+        else:
+            # Already mined; the transaction tracker picks the receipt up on its next poll
+            result.update({'pending': True, 'nonce': self.block_number - 1})
+        return result
+
+    # Owner-side actions, for tests and seeding (real owners sign these in their wallet)
+
+    def approve(self, owner_address: str, approved_address: str, token_id: int):
+        with self._lock:
+            owner = self._owner_of(token_id)
+            if owner != self._checksum(owner_address) and not self._is_approved_for_all(owner, self._checksum(owner_address)):
+                raise ChainRevert("ERC721: approve caller is not token owner or approved for all")
+            self.token_approvals[token_id] = self._checksum(approved_address)
+            self._mine()
+
+    def set_approval_for_all(self, owner_address: str, operator_address: str, approved: bool):
+        with self._lock:
+            key = (self._checksum(owner_address), self._checksum(operator_address))
+            if approved:
+                self.operator_approvals.add(key)
+            else:
+                self.operator_approvals.discard(key)
+            self._mine()
+
+    # ChainBackend
+
+    def get_backend_address(self):
+        return self.backend_address
+
+    def mint_credit(self, user_address, emission_amount, activity_type="general", wait_for_receipt=True):
+        try:
+            user_address = self._checksum(user_address)
+            if user_address == ZERO_ADDRESS:
+                raise ChainRevert("ERC721: mint to the zero address")
+            co2_grams = int(emission_amount * 1000)
+            if co2_grams > MAX_CO2_GRAMS:
+                raise ChainRevert("CO2 amount too large")
+            if len(activity_type.encode()) > MAX_ACTIVITY_TYPE_BYTES:
+                raise ChainRevert("Activity type longer than 32 bytes")
+            with self._lock:
+                self.last_token_id += 1
+                token_id = self.last_token_id
+                self.owners[token_id] = user_address
+                self._add_to_owner(user_address, token_id)
+                self.credits[token_id] = (co2_grams, int(time.time()), activity_type)
+                tx_hash, _ = self._mine([{
+                    'topics': [
+                        CREDIT_MINTED_TOPIC,
+                        '0x' + user_address[2:].lower().rjust(64, '0'),
+                        f'0x{token_id:064x}',
+                    ],
+                }])
+                return self._result(
+                    tx_hash, wait_for_receipt,
+                    token_id=token_id if wait_for_receipt else None,
+                    co2_grams=co2_grams
+                )
+        except ChainRevert as e:
+            return {'success': False, 'error': str(e), 'token_id': None, 'transaction_hash': None}
+
+    def transfer_nft(self, from_address, to_address, token_id, wait_for_receipt=True):
+        try:
+            from_address, to_address = self._checksum(from_address), self._checksum(to_address)
+            with self._lock:
+                owner = self._owner_of(token_id)
+                if owner != from_address:
+                    raise ChainRevert(f"NFT #{token_id} is not owned by {from_address}. Current owner: {owner}")
+                if not self._is_approved_or_owner(self.backend_address, token_id):
+                    raise ChainRevert(
+                        f"NFT not approved for transfer. Backend wallet {self.backend_address} "
+                        f"is not approved to transfer NFT #{token_id}."
+                    )
+                self._transfer(from_address, to_address, token_id)
+                tx_hash, _ = self._mine()
+                return self._result(tx_hash, wait_for_receipt)
+        except ChainRevert as e:
+            return {'success': False, 'error': str(e), 'transaction_hash': None}
+
+    def batch_transfer_nfts(self, transfers, to_address, wait_for_receipt=True):
+        try:
+            to_address = self._checksum(to_address)
+            transfers = [(self._checksum(f), int(token_id)) for f, token_id in transfers]
+            if not transfers:
+                raise ChainRevert("No transfers given")
+            with self._lock:
+                failed_tokens = []
+                errors = []
+                for from_address, token_id in transfers:
+                    if self.owners.get(token_id) != from_address:
+                        failed_tokens.append(token_id)
+                        errors.append(f"NFT #{token_id} is not owned by {from_address}")
+                    elif not self._is_approved_or_owner(self.backend_address, token_id):
+                        failed_tokens.append(token_id)
+                        errors.append(f"Backend wallet {self.backend_address} is not approved to transfer NFT #{token_id}")
+                if failed_tokens:
+                    return {
+                        'success': False,
+                        'error': '; '.join(errors),
+                        'failed_tokens': failed_tokens,
+                        'transaction_hash': None
+                    }
+                for from_address, token_id in transfers:
+                    self._transfer(from_address, to_address, token_id)
+                tx_hash, _ = self._mine()
+                return self._result(tx_hash, wait_for_receipt)
+        except ChainRevert as e:
+            return {'success': False, 'error': str(e), 'transaction_hash': None}
+
+    def owner_of(self, token_id, fresh=False):
+        with self._lock:
+            return self._owner_of(token_id)
+
+    def get_user_balance(self, user_address):
+        try:
+            user_address = self._checksum(user_address)
+        except ChainRevert:
+            return 0
+        with self._lock:
+            return len(self.owned_tokens.get(user_address, ()))
+
+    def get_user_credits(self, user_address):
+        try:
+            user_address = self._checksum(user_address)
+        except ChainRevert as e:
+            return {'success': False, 'error': str(e), 'credits': []}
+        with self._lock:
+            credits = [(token_id, self.credits[token_id]) for token_id in self.owned_tokens.get(user_address, ())]
+        return {'success': True, 'credits': [
+            {
+                'token_id': token_id,
+                'co2_amount_grams': co2_grams,
+                'co2_amount_kg': co2_grams / 1000,
+                'timestamp': timestamp,
+                'activity_type': activity_type
+            }
+            for token_id, (co2_grams, timestamp, activity_type) in credits
+        ]}
+
+    def check_nft_approval(self, owner_address, token_id, fresh=False):
+        result = self.check_nft_approvals(owner_address, [token_id], fresh=fresh)
+        if not result.get('success'):
+            return {'success': False, 'approved': False, 'error': result.get('error')}
+        approval = result['approvals'][token_id]
+        return {
+            'success': True,
+            'approved': approval['approved'],
+            'approved_address': approval['approved_address'],
+            'is_approved_for_all': result['is_approved_for_all'],
+            'backend_address': self.backend_address
+        }
+
+    def check_nft_approvals(self, owner_address, token_ids, fresh=False):
+        try:
+            owner_address = self._checksum(owner_address)
+        except ChainRevert as e:
+            return {'success': False, 'error': str(e)}
+        with self._lock:
+            is_approved_for_all = self._is_approved_for_all(owner_address, self.backend_address)
+            approvals = {}
+            for token_id in token_ids:
+                approved_address = self.token_approvals.get(token_id, ZERO_ADDRESS) if token_id in self.owners else None
+                approvals[token_id] = {
+                    'approved': is_approved_for_all or approved_address == self.backend_address,
+                    'approved_address': None if is_approved_for_all else approved_address
+                }
+        return {
+            'success': True,
+            'is_approved_for_all': is_approved_for_all,
+            'approvals': approvals,
+            'backend_address': self.backend_address
+        }
+
+    def get_transaction_receipts(self, tx_hashes):
+        with self._lock:
+            return {tx_hash: self.receipts.get(tx_hash) for tx_hash in tx_hashes}
+
+    def get_block_number(self):
+        return self.block_number
+
+    def get_connection_status(self):
+        return {
+            "connected": True,
+            "chain_id": self.chain_id,
+            "contract_address": None,
+            "latest_block": self.block_number,
+            "chain_backend": self.name,
+            "total_supply": self.last_token_id,
+        }
+
+    # Nothing here blocks, so the async variants call straight through
+
+    async def aget_user_credits(self, user_address):
+        return self.get_user_credits(user_address)
+
+    async def acheck_nft_approval(self, owner_address, token_id, fresh=False):
+        return self.check_nft_approval(owner_address, token_id, fresh)
+
+    async def aget_connection_status(self):
+        return self.get_connection_status()
+
+
+CHAIN_BACKENDS = {
+    'web3': Web3ChainBackend,
+    'memory': InMemoryChainBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_chain_backend() -> ChainBackend:
+    """Return the process-wide backend named by settings.CHAIN_BACKEND"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = getattr(settings, 'CHAIN_BACKEND', 'web3')
+                if name not in CHAIN_BACKENDS:
+                    raise Exception(f"Unknown CHAIN_BACKEND {name!r}; expected one of: {', '.join(CHAIN_BACKENDS)}")
+                _backend = CHAIN_BACKENDS[name]()
+                print(f"Using {name} chain backend")
+    return _backend
+
+
+def get_backend_address() -> str:
+    return get_chain_backend().get_backend_address()
+
+
+def parse_wait_for_confirmation(value) -> bool:
+    """
+    A request's wait-for-confirmation flag
+
+    Args:
+        value: JSON boolean, or a form or query string such as "false" or "0";
+            None means not given (wait unless ASYNC_TX_SUBMISSION)
+    """
+    if value is None:
+        return not ASYNC_TX_SUBMISSION
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def mint_credit(user_address: str, emission_amount: float, activity_type: str = "general",
+                wait_for_receipt: bool = True) -> dict:
+    return get_chain_backend().mint_credit(user_address, emission_amount, activity_type, wait_for_receipt)
+
+
+def transfer_nft(from_address: str, to_address: str, token_id: int, wait_for_receipt: bool = True) -> dict:
+    return get_chain_backend().transfer_nft(from_address, to_address, token_id, wait_for_receipt)
+
+
+def batch_transfer_nfts(transfers: list, to_address: str, wait_for_receipt: bool = True) -> dict:
+    return get_chain_backend().batch_transfer_nfts(transfers, to_address, wait_for_receipt)
+
+
+def owner_of(token_id: int, fresh: bool = False) -> str:
+    return get_chain_backend().owner_of(token_id, fresh=fresh)
+
+
+def get_user_balance(user_address: str) -> int:
+    return get_chain_backend().get_user_balance(user_address)
+
+
+def get_user_credits(user_address: str) -> dict:
+    return get_chain_backend().get_user_credits(user_address)
+
+
+def check_nft_approval(owner_address: str, token_id: int, fresh: bool = False) -> dict:
+    return get_chain_backend().check_nft_approval(owner_address, token_id, fresh=fresh)
+
+
+def check_nft_approvals(owner_address: str, token_ids: list, fresh: bool = False) -> dict:
+    return get_chain_backend().check_nft_approvals(owner_address, token_ids, fresh=fresh)
+
+
+def get_transaction_receipts(tx_hashes: list) -> dict:
+    return get_chain_backend().get_transaction_receipts(tx_hashes)
+
+
+def get_minted_token_id(raw_receipt: dict):
+    return get_chain_backend().get_minted_token_id(raw_receipt)
+
+
+def get_block_number():
+    return get_chain_backend().get_block_number()
+
+
+def invalidate_token_cache(token_id: int, *owner_addresses: str):
+    get_chain_backend().invalidate_token_cache(token_id, *owner_addresses)
+
+
+def get_connection_status() -> dict:
+    return get_chain_backend().get_connection_status()
+
+
+def warm_up():
+    get_chain_backend().warm_up()
+
+
+async def aget_user_credits(user_address: str) -> dict:
+    return await get_chain_backend().aget_user_credits(user_address)
+
+
+async def acheck_nft_approval(owner_address: str, token_id: int, fresh: bool = False) -> dict:
+    return await get_chain_backend().acheck_nft_approval(owner_address, token_id, fresh=fresh)
+
+
+async def aget_connection_status() -> dict:
+    return await get_chain_backend().aget_connection_status()
@@ -0,0 +1,218 @@
+# backend/api/chain_cache.py
+"""
+Read-through cache for read-only contract calls.
+
+Credit data never changes after mint, so getCredit results are kept forever.
+Ownership and approval reads change only on transfers and approvals, so they
+get short TTLs and are invalidated explicitly whenever the backend wallet
+sends a transaction that touches them.
+
+Two backends are available, selected with CHAIN_CACHE_BACKEND:
+- "lru": an in-process LRU (default, per worker)
+- "shared": Django's "shared" cache alias (file-based by default), so all
+  worker processes on a host see the same entries
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel for "not in cache" (None is a valid cached value)
+MISSING = object()
+
+CHAIN_CACHE_BACKEND = os.getenv("CHAIN_CACHE_BACKEND", "lru")
+CHAIN_CACHE_MAX_ENTRIES = int(os.getenv("CHAIN_CACHE_MAX_ENTRIES", "10000"))
+
+# TTL in seconds per contract method; None means cache forever
+CACHE_TTLS = {
+    'getCredit': None,
+    'ownerOf': int(os.getenv("CHAIN_CACHE_OWNERSHIP_TTL", "15")),
+    'balanceOf': int(os.getenv("CHAIN_CACHE_OWNERSHIP_TTL", "15")),
+    'getApproved': int(os.getenv("CHAIN_CACHE_APPROVAL_TTL", "10")),
+    'isApprovedForAll': int(os.getenv("CHAIN_CACHE_APPROVAL_TTL", "10")),
+}
+
+
+class LRUCacheBackend:
+    """Thread-safe in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = CHAIN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCacheBackend:
+    """Backend on top of a Django cache alias shared between processes"""
+
+    def __init__(self, alias: str = 'shared'):
+        from django.core.cache import caches
+        self._cache = caches[alias]
+
+    def get(self, key: str):
+        return self._cache.get(key, MISSING)
+
+    def set(self, key: str, value, ttl=None):
+        # Django treats timeout=None as "never expire"
+        self._cache.set(key, value, timeout=ttl)
+
+    def delete(self, key: str):
+        self._cache.delete(key)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class ChainReadCache:
+    """Read-through cache keyed by contract method and arguments, with hit-rate counters"""
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def backend(self):
+        # Created on first use so Django settings are loaded for the shared backend
+        if self._backend is None:
+            if CHAIN_CACHE_BACKEND == 'shared':
+                self._backend = SharedCacheBackend()
+            else:
+                self._backend = LRUCacheBackend()
+        return self._backend
+
+    @staticmethod
+    def make_key(method: str, *args) -> str:
+        return "chain:" + ":".join([method] + [str(arg).lower() for arg in args])
+
+    def get_or_fetch(self, method: str, args: tuple, fetch, fresh: bool = False):
+        """
+        Return the cached result of a contract read, calling fetch() on a miss
+
+        Args:
+            method: Contract method name (selects the TTL)
+            args: Call arguments (part of the key)
+            fetch: Zero-argument callable performing the RPC call
+            fresh: Skip the lookup and refresh the entry from the chain
+        """
+        key = self.make_key(method, *args)
+        if not fresh:
+            value = self.backend.get(key)
+            if value is not MISSING:
+                self._count(method, 'hits')
+                return value
+
+        self._count(method, 'misses')
+        value = fetch()
+        self.backend.set(key, value, CACHE_TTLS.get(method, 0))
+        return value
+
+    async def aget_or_fetch(self, method: str, args: tuple, fetch, fresh: bool = False):
+        """get_or_fetch for async callers; fetch() returns an awaitable"""
+        key = self.make_key(method, *args)
+        if not fresh:
+            value = self.backend.get(key)
+            if value is not MISSING:
+                self._count(method, 'hits')
+                return value
+
+        self._count(method, 'misses')
+        value = await fetch()
+        self.backend.set(key, value, CACHE_TTLS.get(method, 0))
+        return value
+
+    def get_many_or_fetch(self, method: str, args_list: list, fetch_many, fresh: bool = False) -> list:
+        """
+        Batched get_or_fetch: look every key up, then fetch all misses with one call
+
+        Args:
+            method: Contract method name (selects the TTL)
+            args_list: list of argument tuples, one per read
+            fetch_many: callable taking the list of missing argument tuples and
+                returning their results in order; Exception results are
+                returned but not cached
+            fresh: Skip the lookups and refresh every entry from the chain
+
+        Returns:
+            results in the order of args_list
+        """
+        keys = [self.make_key(method, *args) for args in args_list]
+        results = [MISSING] * len(keys)
+        if not fresh:
+            for i, key in enumerate(keys):
+                results[i] = self.backend.get(key)
+
+        missing = [i for i, value in enumerate(results) if value is MISSING]
+        for _ in range(len(keys) - len(missing)):
+            self._count(method, 'hits')
+        if missing:
+            for _ in missing:
+                self._count(method, 'misses')
+            fetched = fetch_many([args_list[i] for i in missing])
+            for i, value in zip(missing, fetched):
+                results[i] = value
+                if not isinstance(value, Exception):
+                    self.backend.set(keys[i], value, CACHE_TTLS.get(method, 0))
+        return results
+
+    def invalidate(self, method: str, *args):
+        self.backend.delete(self.make_key(method, *args))
+
+    def _count(self, method: str, field: str):
+        with self._stats_lock:
+            counters = self._stats.setdefault(method, {'hits': 0, 'misses': 0})
+            counters[field] += 1
+
+    def stats(self) -> dict:
+        """Per-method hit/miss counters and hit rate for this process"""
+        with self._stats_lock:
+            result = {}
+            total_hits = total_misses = 0
+            for method, counters in self._stats.items():
+                hits, misses = counters['hits'], counters['misses']
+                total_hits += hits
+                total_misses += misses
+                result[method] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+                }
+            lookups = total_hits + total_misses
+            return {
+                'backend': CHAIN_CACHE_BACKEND,
+                'hits': total_hits,
+                'misses': total_misses,
+                'hit_rate': round(total_hits / lookups, 4) if lookups else None,
+                'methods': result,
+            }
+
+
+chain_cache = ChainReadCache()
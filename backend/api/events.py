@@ -0,0 +1,264 @@
+# backend/api/events.py
+"""
+Marketplace event log and per-process Server-Sent Events fan-out.
+
+Views write a MarketplaceEvent row in the same transaction as the change
+it describes, so an event exists exactly when its change is committed.
+
+Each worker process runs one EventBroadcaster thread. It polls for new
+event rows (one query per poll interval, however many clients are
+connected), renders each event to SSE text once, and keeps the most recent
+ones in a ring buffer. Connected clients only wait to be notified and copy
+text out of the buffer: under WSGI a client's generator (stream) waits on a
+condition variable in its worker thread; under ASGI its async generator
+(astream) waits on an asyncio.Event that the broadcaster sets through the
+client's event loop, so an idle client holds no thread.
+
+Clients resume with the standard Last-Event-ID header. Recent events come
+from the buffer; older ones are read from the table once for that client,
+and if the gap is too large the client is told to reload instead.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import MarketplaceEvent
+
+SSE_POLL_INTERVAL = float(os.getenv("SSE_POLL_INTERVAL", "0.5"))
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+SSE_BUFFER_SIZE = int(os.getenv("SSE_BUFFER_SIZE", "1000"))
+# Most missed events replayed from the database on reconnect before asking the client to reload
+SSE_MAX_REPLAY = int(os.getenv("SSE_MAX_REPLAY", "1000"))
+MARKETPLACE_EVENT_RETENTION_DAYS = int(os.getenv("MARKETPLACE_EVENT_RETENTION_DAYS", "7"))
+
+# Ids below the newest seen one are re-checked for this many ids, because
+# concurrent transactions can commit their events out of id order
+POLL_LOOKBACK = 100
+
+
+def record_event(event_type: str, listing, payload: dict) -> MarketplaceEvent:
+    """Write an event in the current transaction and wake this process's broadcaster on commit"""
+    event = MarketplaceEvent.objects.create(event_type=event_type, listing=listing, payload=payload)
+    transaction.on_commit(_wake_broadcaster)
+    return event
+
+
+def record_events(events: list):
+    """Write many (event_type, listing, payload) events with one INSERT"""
+    MarketplaceEvent.objects.bulk_create([
+        MarketplaceEvent(event_type=event_type, listing=listing, payload=payload)
+        for event_type, listing, payload in events
+    ])
+    transaction.on_commit(_wake_broadcaster)
+
+
+def render_event(event_id: int, event_type: str, payload: dict) -> str:
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+class EventBroadcaster(threading.Thread):
+    """Daemon thread tailing the event table into an in-memory ring buffer"""
+
+    def __init__(self):
+        super().__init__(name="marketplace-events", daemon=True)
+        self.condition = threading.Condition()
+        # (sequence, event id, rendered text); sequence is this process's arrival order
+        self.buffer = deque(maxlen=SSE_BUFFER_SIZE)
+        self.sequence = 0
+        self._seen = deque(maxlen=SSE_BUFFER_SIZE)
+        self._seen_ids = set()
+        self._wake = threading.Event()
+        # (event loop, asyncio.Event) of each connected async client
+        self._async_waiters = set()
+        self._last_prune = 0.0
+        latest = MarketplaceEvent.objects.order_by('-id').values_list('id', flat=True).first()
+        self.start_id = self.last_id = latest or 0
+
+    def run(self):
+        while True:
+            try:
+                self.poll()
+                self._prune()
+            except Exception as e:
+                print(f"Marketplace event broadcaster error: {e}")
+            finally:
+                close_old_connections()
+            self._wake.wait(SSE_POLL_INTERVAL)
+            self._wake.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def poll(self):
+        recent_ids = MarketplaceEvent.objects.filter(
+            id__gt=max(self.start_id, self.last_id - POLL_LOOKBACK)
+        ).values_list('id', flat=True)
+        unseen = [event_id for event_id in recent_ids if event_id not in self._seen_ids]
+        if not unseen:
+            return
+        fresh = MarketplaceEvent.objects.filter(id__in=unseen).order_by('id').values_list('id', 'event_type', 'payload')
+
+        with self.condition:
+            for event_id, event_type, payload in fresh:
+                self.sequence += 1
+                self.buffer.append((self.sequence, event_id, render_event(event_id, event_type, payload)))
+                if len(self._seen) == self._seen.maxlen:
+                    self._seen_ids.discard(self._seen[0])
+                self._seen.append(event_id)
+                self._seen_ids.add(event_id)
+                self.last_id = max(self.last_id, event_id)
+            self.condition.notify_all()
+            async_waiters = list(self._async_waiters)
+
+        for loop, event in async_waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The client's event loop is closed
+                with self.condition:
+                    self._async_waiters.discard((loop, event))
+
+    def _prune(self):
+        if time.monotonic() - self._last_prune < 3600:
+            return
+        self._last_prune = time.monotonic()
+        cutoff = timezone.now() - timedelta(days=MARKETPLACE_EVENT_RETENTION_DAYS)
+        MarketplaceEvent.objects.filter(created_at__lt=cutoff).delete()
+
+    def _catch_up(self, last_event_id: int = None) -> tuple:
+        """
+        Where a new client starts, and what it missed
+
+        Args:
+            last_event_id: the client's Last-Event-ID, or None to start from now
+
+        Returns:
+            tuple of (buffer sequence to follow from, list of SSE texts to send first)
+        """
+        with self.condition:
+            cursor = self.sequence
+            buffered = list(self.buffer)
+
+        if last_event_id is None:
+            return cursor, []
+
+        covered_from = buffered[0][1] - 1 if buffered else self.start_id
+        if last_event_id >= covered_from:
+            # Everything missed is still in the buffer
+            return cursor, [text for _, event_id, text in buffered if event_id > last_event_id]
+
+        missed = list(MarketplaceEvent.objects.filter(
+            id__gt=last_event_id
+        ).order_by('id').values_list('id', 'event_type', 'payload')[:SSE_MAX_REPLAY + 1])
+        close_old_connections()
+        if len(missed) > SSE_MAX_REPLAY:
+            return cursor, [render_event(self.last_id, 'reset', {'reason': 'Too many missed events, reload listings'})]
+        buffered_ids = {event_id for _, event_id, _ in buffered}
+        texts = [render_event(event_id, event_type, payload)
+                 for event_id, event_type, payload in missed if event_id not in buffered_ids]
+        texts.extend(text for _, event_id, text in buffered if event_id > last_event_id)
+        return cursor, texts
+
+    def _take(self, cursor: int) -> tuple:
+        """
+        Events buffered after cursor; call with self.condition held
+
+        Returns:
+            tuple of (new cursor, list of SSE texts or None if nothing is new)
+        """
+        if self.sequence == cursor:
+            return cursor, None
+        oldest_sequence = self.buffer[0][0]
+        if cursor < oldest_sequence - 1:
+            # This client fell behind the ring buffer
+            pending = [render_event(self.last_id, 'reset', {'reason': 'Client fell behind, reload listings'})]
+        else:
+            pending = [text for sequence, _, text in self.buffer if sequence > cursor]
+        return self.sequence, pending
+
+    def stream(self, last_event_id: int = None):
+        """
+        Generator of SSE text for one client, for WSGI (it holds its worker thread while connected)
+
+        Args:
+            last_event_id: the client's Last-Event-ID, or None to start from now
+        """
+        yield "retry: 3000\n\n"
+
+        cursor, backlog = self._catch_up(last_event_id)
+        if backlog:
+            yield ''.join(backlog)
+
+        while True:
+            with self.condition:
+                if self.sequence == cursor:
+                    self.condition.wait(timeout=SSE_HEARTBEAT_INTERVAL)
+                cursor, pending = self._take(cursor)
+
+            if pending is None:
+                yield ": heartbeat\n\n"
+            else:
+                yield ''.join(pending)
+
+    async def astream(self, last_event_id: int = None):
+        """
+        Async generator of SSE text for one client, for ASGI
+
+        Waits on an asyncio.Event set by the broadcaster thread, so a
+        connected client holds no thread between events.
+
+        Args:
+            last_event_id: the client's Last-Event-ID, or None to start from now
+        """
+        yield "retry: 3000\n\n"
+
+        cursor, backlog = await sync_to_async(self._catch_up)(last_event_id)
+        if backlog:
+            yield ''.join(backlog)
+
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.condition:
+            self._async_waiters.add(waiter)
+        try:
+            while True:
+                # Cleared before looking, so an event added meanwhile sets it again
+                waiter[1].clear()
+                with self.condition:
+                    cursor, pending = self._take(cursor)
+                if pending is not None:
+                    yield ''.join(pending)
+                    continue
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), SSE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+        finally:
+            with self.condition:
+                self._async_waiters.discard(waiter)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster() -> EventBroadcaster:
+    """Return the process-wide broadcaster, starting it on first use"""
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None or not _broadcaster.is_alive():
+            _broadcaster = EventBroadcaster()
+            _broadcaster.start()
+    return _broadcaster
+
+
+def _wake_broadcaster():
+    if _broadcaster is not None:
+        _broadcaster.wake()
@@ -0,0 +1,87 @@
+# backend/api/export_views.py
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from .exports import (
+    EXPORT_FORMATS, HISTORY_EXPORT_FIELDS, activity_export_rows, history_export_rows, export_response
+)
+from .serializers import ACTIVITY_FIELDS
+from .marketplace_views import parse_time_param
+
+
+def _export_options(params) -> dict:
+    """Parse the query parameters every export takes; raises ValueError"""
+    # "format" is taken by DRF's renderer override
+    output = params.get('output', 'csv')
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f"output must be one of: {', '.join(EXPORT_FORMATS)}")
+    start = params.get('start')
+    end = params.get('end')
+    options = {
+        'output': output,
+        'compress': params.get('gzip', '').lower() in ('1', 'true', 'yes'),
+        'start': parse_time_param(start, 'start') if start else None,
+        'end': parse_time_param(end, 'end') if end else None,
+    }
+    if options['start'] and options['end'] and options['start'] >= options['end']:
+        raise ValueError("start must be before end")
+    return options
+
+
+@api_view(['GET'])
+def export_activities(request):
+    """
+    Download every activity of a user or a company over a date range.
+
+    URL: GET /api/exports/activities/?user=alice&start=2026-01-01&end=2026-04-01&output=csv&gzip=1
+
+    Query parameters:
+        user or company: whose activities (company is the "company" field of the logged payload)
+        start, end: ISO dates or datetimes, end exclusive; both optional
+        output: csv (default) or ndjson
+        gzip: 1 to download the file gzip-compressed
+
+    Rows are streamed oldest first, archived activities included, with the
+    same fields as /api/activities/<username>/ (data as JSON in CSV).
+    """
+    try:
+        options = _export_options(request.query_params)
+        user = request.query_params.get('user')
+        company = request.query_params.get('company')
+        if not user and not company:
+            raise ValueError("user or company is required")
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = activity_export_rows(user=user, company=company, start=options['start'], end=options['end'])
+    filename = f"activities-{user or company}"
+    return export_response(rows, ACTIVITY_FIELDS, options['output'], options['compress'], filename,
+                           asgi=isinstance(request._request, ASGIRequest))
+
+
+@api_view(['GET'])
+def export_marketplace_history(request, wallet_address):
+    """
+    Download a wallet's marketplace sales and purchases over a date range.
+
+    URL: GET /api/exports/marketplace-history/<wallet_address>/?start=2026-01-01&output=ndjson
+
+    Takes the same start, end, output and gzip parameters as
+    /api/exports/activities/. Rows are streamed oldest first.
+    """
+    try:
+        options = _export_options(request.query_params)
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = history_export_rows(wallet_address, start=options['start'], end=options['end'])
+    filename = f"marketplace-history-{wallet_address}"
+    return export_response(rows, HISTORY_EXPORT_FIELDS, options['output'], options['compress'], filename,
+                           asgi=isinstance(request._request, ASGIRequest))
@@ -0,0 +1,223 @@
+# backend/api/exports.py
+"""
+Streaming exports of activities and marketplace history.
+
+Rows are read with server-side cursors (QuerySet.iterator) and encoded as
+they are read, so an export of any size holds about one chunk of rows
+and one output buffer in memory. Output is CSV or NDJSON (one JSON object
+per line), optionally gzip-compressed.
+
+Under ASGI the response body is an async iterator that pulls each piece
+from the sync generator on the request's sync thread, so pieces are sent
+as they are produced rather than after the whole export is built.
+"""
+import csv
+import heapq
+import json
+import os
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .archive import ARCHIVE_FIELDS, decompress_data
+from .models import Activity, ActivityArchive, MarketplaceListing
+from .serializers import ACTIVITY_FIELDS, format_datetime
+
+# Rows fetched from the database per round trip
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+# Encoded output is sent in pieces of about this many bytes
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+HISTORY_EXPORT_FIELDS = (
+    'type', 'listing_id', 'token_id', 'activity_type', 'co2_grams', 'price_eth',
+    'seller', 'seller_wallet', 'buyer', 'buyer_wallet', 'sold_at',
+    'mint_transaction_hash', 'transfer_transaction_hash',
+)
+
+
+def _filter_range(queryset, field: str, start=None, end=None):
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lt': end})
+    return queryset
+
+
+def activity_export_rows(user: str = None, company: str = None, start=None, end=None):
+    """
+    Activities of a user or a company, oldest first, including archived ones
+
+    A company is the "company" key of the logged payload. Archived payloads
+    are compressed, so for company exports archived rows in the date range
+    are decompressed and matched here rather than in SQL.
+
+    Args:
+        user: Activity.user
+        company: data["company"]
+        start, end: optional datetimes bounding timestamp (end exclusive)
+
+    Yields:
+        dicts with ACTIVITY_FIELDS keys
+    """
+    hot = _filter_range(Activity.objects.all(), 'timestamp', start, end)
+    cold = _filter_range(ActivityArchive.objects.all(), 'timestamp', start, end)
+    if user:
+        hot, cold = hot.filter(user=user), cold.filter(user=user)
+    if company:
+        hot = hot.filter(data__company=company)
+
+    hot = hot.order_by('timestamp', 'id').values(*ACTIVITY_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    cold = cold.order_by('timestamp', 'id').values(*ARCHIVE_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    tz = timezone.get_current_timezone()
+    for row in heapq.merge(hot, cold, key=lambda row: (row['timestamp'], row['id'])):
+        if 'data_compressed' in row:
+            data = decompress_data(row['data_compressed'])
+            if company and (not isinstance(data, dict) or data.get('company') != company):
+                continue
+            row = {field: data if field == 'data' else row[field] for field in ACTIVITY_FIELDS}
+        row['timestamp'] = format_datetime(row['timestamp'], tz)
+        yield row
+
+
+def history_export_rows(wallet: str, start=None, end=None):
+    """
+    Marketplace sales and purchases of a wallet, oldest first
+
+    A sale between two listings of the same wallet yields both a sale and
+    a purchase row, as /api/marketplace/history/ does.
+
+    Yields:
+        dicts with HISTORY_EXPORT_FIELDS keys
+    """
+    listings = _filter_range(
+        MarketplaceListing.objects.filter(Q(seller_wallet=wallet) | Q(buyer_wallet=wallet), status='sold'),
+        'sold_at', start, end
+    ).order_by('sold_at', 'id').values(
+        'id', 'token_id', 'activity_type', 'co2_grams', 'price_eth', 'seller', 'seller_wallet',
+        'buyer', 'buyer_wallet', 'sold_at', 'transaction_hash', 'purchase_transaction_hash',
+    )
+    tz = timezone.get_current_timezone()
+    for listing in listings.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = {
+            'listing_id': listing['id'],
+            'token_id': listing['token_id'],
+            'activity_type': listing['activity_type'],
+            'co2_grams': listing['co2_grams'],
+            'price_eth': listing['price_eth'],
+            'seller': listing['seller'],
+            'seller_wallet': listing['seller_wallet'],
+            'buyer': listing['buyer'],
+            'buyer_wallet': listing['buyer_wallet'],
+            'sold_at': format_datetime(listing['sold_at'], tz),
+            'mint_transaction_hash': listing['transaction_hash'],
+            'transfer_transaction_hash': listing['purchase_transaction_hash'],
+        }
+        if listing['seller_wallet'] == wallet:
+            yield {'type': 'sale', **row}
+        if listing['buyer_wallet'] == wallet:
+            yield {'type': 'purchase', **row}
+
+
+class _Line:
+    """File-like object whose write() returns what was written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(rows, fields):
+    """CSV lines with a header; dict and list values are written as JSON"""
+    writer = csv.writer(_Line())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([
+            json.dumps(value, separators=(',', ':')) if isinstance(value, (dict, list)) else value
+            for value in (row[field] for field in fields)
+        ])
+
+
+def encode_ndjson(rows, fields):
+    for row in rows:
+        yield json.dumps(row, separators=(',', ':')) + '\n'
+
+
+def buffered(chunks, compress: bool = False):
+    """Join text chunks into ~EXPORT_BUFFER_SIZE byte pieces, gzip-compressed if compress"""
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer, size = [], 0
+    for chunk in chunks:
+        chunk = chunk.encode()
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= EXPORT_BUFFER_SIZE:
+            data = b''.join(buffer)
+            buffer, size = [], 0
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+    data = b''.join(buffer)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+async def pull_async(pieces):
+    """
+    Async iterator over a sync iterator, for ASGI responses
+
+    Django's ASGI handler reads a sync streaming body to the end before
+    sending it. Each piece is instead pulled with sync_to_async on the
+    request's sync thread (where the rows' database cursor lives), so
+    only one piece is held at a time.
+    """
+    pieces = iter(pieces)
+    pull = sync_to_async(next)
+    try:
+        while True:
+            piece = await pull(pieces, None)
+            if piece is None:
+                return
+            yield piece
+    finally:
+        # Release the server-side cursor if the client went away early
+        if hasattr(pieces, 'close'):
+            await sync_to_async(pieces.close)()
+
+
+def export_response(rows, fields, output: str, compress: bool, filename: str,
+                    asgi: bool = False) -> StreamingHttpResponse:
+    """
+    Stream rows as a file download
+
+    Args:
+        rows: iterable of dicts (consumed lazily while the response is sent)
+        fields: column order for CSV
+        output: 'csv' or 'ndjson'
+        compress: gzip the file (served as application/gzip, filename.<ext>.gz)
+        filename: download name without extension
+        asgi: the request is served by ASGI (the body is then an async iterator)
+    """
+    content_type, extension = EXPORT_FORMATS[output]
+    encode = encode_csv if output == 'csv' else encode_ndjson
+    filename = f"{filename}.{extension}"
+    if compress:
+        content_type, filename = 'application/gzip', f"{filename}.gz"
+
+    pieces = buffered(encode(rows, fields), compress)
+    if asgi:
+        pieces = pull_async(pieces)
+    response = StreamingHttpResponse(pieces, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
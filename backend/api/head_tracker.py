@@ -0,0 +1,138 @@
+# backend/api/head_tracker.py
+"""
+Per-process chain-head tracker.
+
+One daemon thread polls the latest block and, when the head moves, the
+recent fee history. Everything that used to ask the node on every request
+(status endpoint, gas pricing, chain ID, the transaction tracker's block
+check) reads the in-memory snapshot instead.
+"""
+import os
+import threading
+import time
+
+from .web3_interact import get_w3
+
+HEAD_POLL_INTERVAL = float(os.getenv("HEAD_POLL_INTERVAL", "2"))
+# Number of blocks of fee history kept for priority-fee estimation
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "10"))
+# Reward percentile used as the suggested priority fee
+PRIORITY_FEE_PERCENTILE = int(os.getenv("PRIORITY_FEE_PERCENTILE", "50"))
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+class ChainHeadTracker(threading.Thread):
+    """Daemon thread keeping the latest head and fee history in memory"""
+
+    def __init__(self, poll_interval: float = HEAD_POLL_INTERVAL):
+        super().__init__(name="chain-head-tracker", daemon=True)
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self.chain_id = None
+        self.block_number = None
+        self.block_timestamp = None
+        self.base_fee = None
+        self.gas_price = None
+        self.priority_fees = []
+        self.base_fee_history = []
+        self.gas_used_ratios = []
+        self.last_poll_at = None
+        self.last_error = None
+        self.connected = False
+
+    def run(self):
+        while True:
+            self.refresh()
+            time.sleep(self.poll_interval)
+
+    def refresh(self):
+        """Poll the head once; fee history is fetched only when the head moves"""
+        try:
+            if self.chain_id is None:
+                self.chain_id = get_w3().eth.chain_id
+
+            block = get_w3().eth.get_block('latest')
+            updates = {
+                'block_number': block['number'],
+                'block_timestamp': block['timestamp'],
+                'base_fee': block.get('baseFeePerGas'),
+            }
+
+            if block['number'] != self.block_number:
+                if updates['base_fee'] is None:
+                    # Pre-London chain: no fee market, use the legacy gas price
+                    updates['gas_price'] = get_w3().eth.gas_price
+                else:
+                    history = get_w3().eth.fee_history(FEE_HISTORY_BLOCKS, 'latest', [PRIORITY_FEE_PERCENTILE])
+                    updates['priority_fees'] = [rewards[0] for rewards in history.get('reward', []) if rewards]
+                    updates['base_fee_history'] = list(history['baseFeePerGas'])
+                    updates['gas_used_ratios'] = list(history['gasUsedRatio'])
+
+            with self._lock:
+                for name, value in updates.items():
+                    setattr(self, name, value)
+                self.last_poll_at = time.time()
+                self.last_error = None
+                self.connected = True
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+                self.connected = False
+            print(f"Chain head tracker error: {e}")
+
+    def snapshot(self) -> dict:
+        """Latest head, fees and lag metrics, without touching the network"""
+        with self._lock:
+            now = time.time()
+            return {
+                'connected': self.connected,
+                'chain_id': self.chain_id,
+                'latest_block': self.block_number,
+                'base_fee_per_gas': self.base_fee,
+                'suggested_priority_fee': self._priority_fee(),
+                'base_fee_history': list(self.base_fee_history),
+                'gas_used_ratios': list(self.gas_used_ratios),
+                # Seconds since the latest block was produced
+                'head_lag_seconds': round(now - self.block_timestamp, 1) if self.block_timestamp else None,
+                # Seconds since we last heard from the node
+                'poll_age_seconds': round(now - self.last_poll_at, 1) if self.last_poll_at else None,
+                'last_error': self.last_error,
+            }
+
+    def _priority_fee(self):
+        if not self.priority_fees:
+            return None
+        return sorted(self.priority_fees)[len(self.priority_fees) // 2]
+
+    def fee_fields(self) -> dict:
+        """
+        Fee parameters for a new transaction
+
+        EIP-1559 chains get maxFeePerGas = 2 * baseFee + tip, which stays valid
+        through several consecutive full blocks; legacy chains get gasPrice.
+        """
+        with self._lock:
+            base_fee = self.base_fee
+            gas_price = self.gas_price
+            priority_fee = self._priority_fee()
+
+        if base_fee is not None:
+            priority_fee = priority_fee if priority_fee is not None else get_w3().to_wei(1, 'gwei')
+            return {
+                'maxFeePerGas': 2 * base_fee + priority_fee,
+                'maxPriorityFeePerGas': priority_fee,
+            }
+        return {'gasPrice': gas_price if gas_price is not None else get_w3().eth.gas_price}
+
+
+def get_head_tracker() -> ChainHeadTracker:
+    """Return the process-wide tracker, polling once synchronously on first use"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None or not _tracker.is_alive():
+            _tracker = ChainHeadTracker()
+            _tracker.refresh()
+            _tracker.start()
+    return _tracker
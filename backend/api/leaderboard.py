@@ -0,0 +1,392 @@
+# backend/api/leaderboard.py
+"""
+Net CO2 offset leaderboards for users and companies.
+
+Scores are kept per subject (a user, or the "company" of a logged
+payload) and period (this week, this month, all time) in
+LeaderboardScore, and updated as each activity is logged and each credit
+sale completes:
+
+- offset activities add their predicted emission, emitting ones subtract it
+- a sold credit moves its CO2 from the seller to the buyer
+
+Each process ranks the boards it serves in indexable skip lists, so
+updates, top-K pages and "my rank" all cost O(log n) instead of an
+aggregate over Activity. A board is loaded from LeaderboardScore the first
+time it is read; after that, changes are picked up by re-reading the rows
+whose updated_at moved since the last sync. Run
+`python manage.py rebuild_leaderboard` once to fill the table from
+existing activities and sales.
+"""
+import os
+import random
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import LeaderboardScore
+
+# Seconds between checks for score changes made by other processes
+LEADERBOARD_SYNC_INTERVAL = float(os.getenv("LEADERBOARD_SYNC_INTERVAL", "1"))
+# Changes are re-read this many seconds back, for transactions that commit
+# after a sync has already passed their updated_at
+LEADERBOARD_SYNC_OVERLAP = float(os.getenv("LEADERBOARD_SYNC_OVERLAP", "10"))
+
+PERIODS = ('week', 'month', 'all')
+SUBJECT_TYPES = ('user', 'company')
+ALL_TIME_START = date(1970, 1, 1)
+
+
+def period_start(period: str, moment=None) -> date:
+    """First day of the period containing moment (weeks start on Monday)"""
+    day = timezone.localdate(moment) if moment else timezone.localdate()
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return ALL_TIME_START
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next = [None] * level
+        # width[i]: positions from this node to next[i] (to one past the end if None)
+        self.width = [1] * level
+
+
+class IndexableSkipList:
+    """
+    Sorted, unique keys with O(log n) insert, remove, rank and positional access
+
+    Every link records how many positions it skips, so the position of a
+    key is the sum of the widths followed to reach it.
+    """
+    MAX_LEVEL = 24
+
+    def __init__(self):
+        self.head = _Node(None, self.MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def _random_level(cls) -> int:
+        level = 1
+        while level < cls.MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    @classmethod
+    def from_sorted(cls, keys):
+        """Build from keys already in ascending order, in O(n)"""
+        skiplist = cls()
+        last = [skiplist.head] * cls.MAX_LEVEL
+        last_positions = [0] * cls.MAX_LEVEL
+        position = 0
+        for position, key in enumerate(keys, 1):
+            level = cls._random_level()
+            node = _Node(key, level)
+            for i in range(level):
+                last[i].next[i] = node
+                last[i].width[i] = position - last_positions[i]
+                last[i] = node
+                last_positions[i] = position
+            skiplist.level = max(skiplist.level, level)
+        for i in range(skiplist.level):
+            last[i].width[i] = position + 1 - last_positions[i]
+        skiplist.size = position
+        return skiplist
+
+    def _find(self, key):
+        """Last node before key on every level in use, and each one's position"""
+        update = [None] * self.level
+        positions = [0] * self.level
+        node, position = self.head, 0
+        for level in reversed(range(self.level)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            positions[level] = position
+        return update, positions
+
+    def insert(self, key):
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                self.head.width[i] = self.size + 1
+            self.level = level
+        update, positions = self._find(key)
+        node = _Node(key, level)
+        position = positions[0] + 1
+        for i in range(self.level):
+            prev = update[i]
+            if i < level:
+                node.next[i] = prev.next[i]
+                node.width[i] = prev.width[i] - (position - 1 - positions[i])
+                prev.next[i] = node
+                prev.width[i] = position - positions[i]
+            else:
+                prev.width[i] += 1
+        self.size += 1
+
+    def remove(self, key):
+        update, _ = self._find(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for i in range(self.level):
+            prev = update[i]
+            if prev.next[i] is node:
+                prev.width[i] += node.width[i] - 1
+                prev.next[i] = node.next[i]
+            else:
+                prev.width[i] -= 1
+        self.size -= 1
+
+    def rank(self, key) -> int:
+        """Number of keys smaller than key"""
+        _, positions = self._find(key)
+        return positions[0]
+
+    def slice(self, start: int, count: int) -> list:
+        """Up to count keys from position start (0-based)"""
+        node, position = self.head, 0
+        for level in reversed(range(self.level)):
+            while node.next[level] is not None and position + node.width[level] <= start:
+                position += node.width[level]
+                node = node.next[level]
+        keys = []
+        node = node.next[0]
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class Board:
+    """One ranking: subjects ordered by score, highest first, ties by name"""
+
+    def __init__(self):
+        self.ranking = IndexableSkipList()
+        self.scores = {}
+
+    def __len__(self):
+        return len(self.scores)
+
+    def load(self, scores):
+        """Replace the ranking with (subject, score) pairs"""
+        self.scores = dict(scores)
+        self.ranking = IndexableSkipList.from_sorted(
+            sorted((-score, subject) for subject, score in self.scores.items())
+        )
+
+    def set(self, subject: str, score: int):
+        old = self.scores.get(subject)
+        if old == score:
+            return
+        if old is not None:
+            self.ranking.remove((-old, subject))
+        self.ranking.insert((-score, subject))
+        self.scores[subject] = score
+
+    def rank_of_score(self, score: int) -> int:
+        """1 + the number of subjects with a higher score (tied subjects share a rank)"""
+        return self.ranking.rank((-score, '')) + 1
+
+    def top(self, limit: int, offset: int = 0) -> list:
+        """Entries ranked offset+1 .. offset+limit as (rank, subject, score)"""
+        entries = []
+        previous = None
+        for position, (negative_score, subject) in enumerate(self.ranking.slice(offset, limit), offset + 1):
+            score = -negative_score
+            if previous is None:
+                rank = self.rank_of_score(score)
+            elif score != previous[1]:
+                rank = position
+            else:
+                rank = previous[0]
+            entries.append((rank, subject, score))
+            previous = (rank, score)
+        return entries
+
+
+class Leaderboard:
+    """The boards this process has served, kept in step with LeaderboardScore"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boards = {}
+        self._synced_at = None
+        self._changed = False
+
+    def _sync(self):
+        now = timezone.now()
+        if (self._synced_at is not None and not self._changed
+                and (now - self._synced_at).total_seconds() < LEADERBOARD_SYNC_INTERVAL):
+            return
+        self._changed = False
+        if self._boards:
+            changed = LeaderboardScore.objects.filter(
+                updated_at__gte=self._synced_at - timedelta(seconds=LEADERBOARD_SYNC_OVERLAP)
+            ).values_list('subject_type', 'period', 'period_start', 'subject', 'net_grams')
+            for subject_type, period, start, subject, net_grams in changed.iterator(chunk_size=2000):
+                board = self._boards.get((subject_type, period, start))
+                if board is not None:
+                    board.set(subject, net_grams)
+        self._synced_at = now
+
+    def mark_changed(self):
+        """Scores were changed by this process: sync on the next read"""
+        self._changed = True
+
+    def _board(self, subject_type: str, period: str, start: date) -> Board:
+        key = (subject_type, period, start)
+        board = self._boards.get(key)
+        if board is None:
+            # A new week or month replaces the previous one
+            for loaded in [k for k in self._boards if k[:2] == key[:2]]:
+                del self._boards[loaded]
+            board = Board()
+            board.load(LeaderboardScore.objects.filter(
+                subject_type=subject_type, period=period, period_start=start
+            ).values_list('subject', 'net_grams').iterator(chunk_size=2000))
+            self._boards[key] = board
+        return board
+
+    def top(self, subject_type: str, period: str, limit: int, offset: int = 0) -> dict:
+        """
+        One page of the current period's ranking
+
+        Returns:
+            dict with period_start, total (subjects ranked) and entries,
+            a list of (rank, subject, net grams)
+        """
+        start = period_start(period)
+        with self._lock:
+            self._sync()
+            board = self._board(subject_type, period, start)
+            return {'period_start': start, 'total': len(board), 'entries': board.top(limit, offset)}
+
+    def rank(self, subject_type: str, period: str, subject: str) -> dict:
+        """
+        A subject's place in the current period's ranking
+
+        Returns:
+            dict with period_start, total, rank and net_grams; rank and
+            net_grams are None if the subject has no score this period
+        """
+        start = period_start(period)
+        with self._lock:
+            self._sync()
+            board = self._board(subject_type, period, start)
+            score = board.scores.get(subject)
+            return {
+                'period_start': start,
+                'total': len(board),
+                'rank': board.rank_of_score(score) if score is not None else None,
+                'net_grams': score,
+            }
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard() -> Leaderboard:
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                _leaderboard = Leaderboard()
+    return _leaderboard
+
+
+def apply_score_changes(changes):
+    """
+    Add score changes to every period they fall in
+
+    Args:
+        changes: iterable of (user, company or None, grams, moment or None for now)
+    """
+    deltas = defaultdict(int)
+    companies = {}
+    for user, company, grams, moment in changes:
+        for period in PERIODS:
+            start = period_start(period, moment)
+            deltas[('user', user, period, start)] += grams
+            if company:
+                deltas[('company', company, period, start)] += grams
+        if company:
+            companies[user] = company
+
+    now = timezone.now()
+    with transaction.atomic():
+        for (subject_type, subject, period, start), delta in deltas.items():
+            key = {'subject_type': subject_type, 'subject': subject, 'period': period, 'period_start': start}
+            fields = {'net_grams': F('net_grams') + delta, 'updated_at': now}
+            if subject_type == 'user' and subject in companies:
+                fields['company'] = companies[subject]
+            if LeaderboardScore.objects.filter(**key).update(**fields):
+                continue
+            try:
+                with transaction.atomic():
+                    LeaderboardScore.objects.create(
+                        **key, net_grams=delta, updated_at=now, company=fields.get('company')
+                    )
+            except IntegrityError:
+                # Created by a concurrent request since the update above
+                LeaderboardScore.objects.filter(**key).update(**fields)
+        transaction.on_commit(get_leaderboard().mark_changed)
+
+
+def user_companies(users) -> dict:
+    """Company each user last logged an activity for, where known"""
+    return dict(
+        LeaderboardScore.objects.filter(
+            subject_type='user', period='all', period_start=ALL_TIME_START,
+            subject__in=set(users), company__isnull=False
+        ).values_list('subject', 'company')
+    )
+
+
+def record_activity(activity, is_offset: bool):
+    """Score a logged activity: offsets add its CO2, emissions subtract it"""
+    data = activity.data if isinstance(activity.data, dict) else {}
+    grams = round((activity.predicted_emission or 0) * 1000)
+    apply_score_changes([
+        (activity.user, data.get('company') or None, grams if is_offset else -grams, activity.timestamp)
+    ])
+
+
+def record_credit_transfers(transfers):
+    """
+    Move the CO2 of sold credits from their sellers to their buyers
+
+    Args:
+        transfers: iterable of (buyer, seller, co2 grams, sold_at or None for now)
+    """
+    transfers = list(transfers)
+    companies = user_companies([user for buyer, seller, _, _ in transfers for user in (buyer, seller)])
+    changes = []
+    for buyer, seller, grams, sold_at in transfers:
+        changes.append((buyer, companies.get(buyer), grams, sold_at))
+        changes.append((seller, companies.get(seller), -grams, sold_at))
+    apply_score_changes(changes)
+
+
+def record_listing_transfers(listings, sold_at=None):
+    """Score sold MarketplaceListings"""
+    record_credit_transfers(
+        (listing.buyer, listing.seller, listing.co2_grams, sold_at or listing.sold_at)
+        for listing in listings
+    )
@@ -0,0 +1,74 @@
+# backend/api/listing_cache.py
+"""
+Versioned cache for marketplace listing pages.
+
+The listings version lives in Django's "shared" cache, so every worker
+process sees it. Anything that changes which listings are on the market
+calls invalidate_listings(), which bumps the version once the surrounding
+database transaction commits. Rendered pages are cached per
+(version, query string), and the version doubles as the ETag, so clients
+polling an unchanged market get a 304 without touching the database.
+"""
+import hashlib
+import os
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+LISTINGS_CACHE_TTL = int(os.getenv("LISTINGS_CACHE_TTL", "300"))
+
+VERSION_KEY = 'marketplace:listings:version'
+
+
+def _cache():
+    return caches['shared']
+
+
+def get_listings_version() -> int:
+    """Current listings version, initialised from the clock if the cache was cleared"""
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # A restarted cache must not reuse a version a client may still hold
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_listings_version():
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def invalidate_listings():
+    """Bump the listings version when the current transaction commits (immediately outside one)"""
+    transaction.on_commit(bump_listings_version)
+
+
+def query_key(query_params) -> str:
+    """Stable digest of a query string, independent of parameter order"""
+    items = sorted((key, value) for key in query_params for value in query_params.getlist(key))
+    return hashlib.sha1(repr(items).encode()).hexdigest()[:16]
+
+
+def make_etag(version: int, query_digest: str) -> str:
+    return f'"listings-{version}-{query_digest}"'
+
+
+def get_cached_page(version: int, query_digest: str):
+    return _cache().get(f'marketplace:listings:{version}:{query_digest}')
+
+
+def set_cached_page(version: int, query_digest: str, payload: dict):
+    _cache().set(f'marketplace:listings:{version}:{query_digest}', payload, timeout=LISTINGS_CACHE_TTL)
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True if the request's If-None-Match already names this ETag"""
+    if_none_match = request.headers.get('If-None-Match', '')
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag in candidates or '*' in candidates
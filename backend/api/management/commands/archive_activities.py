@@ -0,0 +1,41 @@
+"""
+Move old activities into compressed cold storage.
+
+Activities older than --older-than-days (ACTIVITY_ARCHIVE_AFTER_DAYS,
+default 180) that no longer take part in the marketplace are moved to
+ActivityArchive in batches; see api/archive.py for which rows qualify.
+User history keeps returning them. Run it from cron; on SQLite, VACUUM
+afterwards to return the freed pages to the filesystem.
+
+Usage: python manage.py archive_activities [--older-than-days 180] [--batch-size 1000] [--dry-run]
+"""
+from django.core.management.base import BaseCommand
+
+from api.archive import (
+    ACTIVITY_ARCHIVE_AFTER_DAYS, ACTIVITY_ARCHIVE_BATCH_SIZE,
+    archive_activities, archivable_activities, archive_cutoff
+)
+
+
+class Command(BaseCommand):
+    help = "Move old activities into the compressed archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=ACTIVITY_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=ACTIVITY_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would move")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['older_than_days'])
+
+        if options['dry_run']:
+            count = archivable_activities(cutoff).count()
+            self.stdout.write(f"{count} activities logged before {cutoff:%Y-%m-%d %H:%M} would be archived")
+            return
+
+        stats = archive_activities(cutoff, options['batch_size'])
+        ratio = stats['data_bytes'] / stats['compressed_bytes'] if stats['compressed_bytes'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {stats['archived']} activities logged before {cutoff:%Y-%m-%d %H:%M}; "
+            f"data {stats['data_bytes']:,} -> {stats['compressed_bytes']:,} bytes ({ratio:.1f}x)"
+        ))
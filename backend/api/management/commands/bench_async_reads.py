@@ -0,0 +1,206 @@
+"""
+Measure how many concurrent chain reads one worker process can carry.
+
+Starts a stub JSON-RPC node in its own process that answers the
+CarbonCredit reads after a fixed --rpc-delay (standing in for a remote
+provider's latency), then, at
+each --levels concurrency, fires that many simultaneous credit lookups
+(balanceOf, getUserCreditsPaged, getCredit per token) through:
+
+- the async client used by the ASGI views, on one event loop;
+- the sync web3 reads from a --threads thread pool, like a threaded
+  WSGI worker.
+
+The read cache is cleared before every run so each lookup reaches the
+node. Reports throughput, latency and the peak number of RPC calls the
+stub saw in flight at once.
+
+Usage: python manage.py bench_async_reads [--rpc-delay 0.1] [--levels 1,10,100,500] [--threads 8]
+"""
+import asyncio
+import json
+import multiprocessing
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+from django.core.management.base import BaseCommand
+from eth_abi import decode, encode
+from web3 import Web3
+
+from api.async_web3 import AsyncChainClient
+from api.chain_cache import chain_cache
+from api.rpc_pool import RPCProviderPool
+from api.web3_interact import load_contract_abi
+
+STUB_CONTRACT = '0x000000000000000000000000000000000000c0de'
+
+
+def selector(signature: str) -> str:
+    return Web3.keccak(text=signature)[:4].hex().removeprefix('0x')
+
+
+class StubNode:
+    """JSON-RPC server answering CarbonCredit reads after a fixed delay"""
+
+    def __init__(self, delay: float, credits_per_wallet: int):
+        self.delay = delay
+        self.credits_per_wallet = credits_per_wallet
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.handlers = {
+            selector('balanceOf(address)'): self.balance_of,
+            selector('getUserCreditsPaged(address,uint256,uint256)'): self.credits_paged,
+            selector('getCredit(uint256)'): self.get_credit,
+            selector('getApproved(uint256)'): lambda args: encode(['address'], [STUB_CONTRACT]),
+            selector('isApprovedForAll(address,address)'): lambda args: encode(['bool'], [False]),
+        }
+
+    def balance_of(self, args: bytes) -> bytes:
+        return encode(['uint256'], [self.credits_per_wallet])
+
+    def credits_paged(self, args: bytes) -> bytes:
+        _, offset, limit = decode(['address', 'uint256', 'uint256'], args)
+        end = min(offset + limit, self.credits_per_wallet)
+        return encode(['uint256[]'], [list(range(offset + 1, end + 1))])
+
+    def get_credit(self, args: bytes) -> bytes:
+        (token_id,) = decode(['uint256'], args)
+        return encode(['(uint128,uint64,bytes32)'], [(1000 + token_id, 1700000000, b'tree_planting'.ljust(32, b'\0'))])
+
+    def answer(self, request: dict) -> dict:
+        result = None
+        if request['method'] == 'eth_chainId':
+            result = hex(31337)
+        elif request['method'] == 'eth_call':
+            data = request['params'][0]['data'].removeprefix('0x')
+            handler = self.handlers.get(data[:8])
+            if handler:
+                result = '0x' + handler(bytes.fromhex(data[8:])).hex()
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+    async def handle(self, http_request):
+        payload = await http_request.json()
+        requests = payload if isinstance(payload, list) else [payload]
+        self.calls += len(requests)
+        self.in_flight += len(requests)
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= len(requests)
+        responses = [self.answer(request) for request in requests]
+        return web.json_response(responses if isinstance(payload, list) else responses[0])
+
+    async def stats(self, http_request):
+        """Peak in-flight calls since the last stats request"""
+        stats = {'calls': self.calls, 'peakInFlight': self.peak_in_flight}
+        self.calls = 0
+        self.peak_in_flight = 0
+        return web.json_response(stats)
+
+    def serve(self, port_queue):
+        async def start():
+            app = web.Application()
+            app.router.add_post('/', self.handle)
+            app.router.add_get('/stats', self.stats)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0, backlog=4096)
+            await site.start()
+            port_queue.put(site._server.sockets[0].getsockname()[1])
+            await asyncio.Event().wait()
+
+        asyncio.run(start())
+
+    def start(self) -> str:
+        """Serve from a separate process, so the node doesn't compete with the client for the GIL"""
+        port_queue = multiprocessing.Queue()
+        multiprocessing.Process(target=self.serve, args=(port_queue,), daemon=True).start()
+        return f'http://127.0.0.1:{port_queue.get(timeout=30)}'
+
+
+def read_stats(url: str) -> dict:
+    with urllib.request.urlopen(f'{url}/stats') as response:
+        return json.loads(response.read())
+
+
+def wallet(i: int) -> str:
+    return Web3.to_checksum_address(f'0x{i + 1:040x}')
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent chain reads on the async client against a threaded sync worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rpc-delay', type=float, default=0.1, help="seconds the stub node takes per request")
+        parser.add_argument('--levels', default='1,10,100,500,1000')
+        parser.add_argument('--threads', type=int, default=8, help="threads of the sync worker")
+        parser.add_argument('--credits', type=int, default=5, help="credits per wallet (getCredit calls per lookup)")
+
+    def handle(self, *args, **options):
+        node = StubNode(options['rpc_delay'], options['credits'])
+        url = node.start()
+        levels = [int(level) for level in options['levels'].split(',')]
+        self.stdout.write(
+            f"Stub node at {url}, {options['rpc_delay'] * 1000:.0f} ms per request, "
+            f"{options['credits']} credits per wallet"
+        )
+
+        # Same provider setup as web3_interact's sync reads
+        sync_contract = Web3(RPCProviderPool.from_urls([url])).eth.contract(
+            address=Web3.to_checksum_address(STUB_CONTRACT), abi=load_contract_abi()
+        )
+
+        def sync_lookup(address):
+            balance = sync_contract.functions.balanceOf(address).call()
+            token_ids = sync_contract.functions.getUserCreditsPaged(address, 0, 100).call() if balance else []
+            return [sync_contract.functions.getCredit(token_id).call() for token_id in token_ids]
+
+        self.stdout.write(f"{'mode':<14}{'concurrent':>11}{'wall s':>9}{'lookups/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'peak RPC':>10}")
+        for level in levels:
+            for mode in ('async', f'sync x{options["threads"]}'):
+                chain_cache.backend.clear()
+                read_stats(url)
+                if mode == 'async':
+                    latencies, wall = asyncio.run(self.run_async(url, level))
+                else:
+                    latencies, wall = self.run_sync(sync_lookup, level, options['threads'])
+                latencies.sort()
+                stats = read_stats(url)
+                self.stdout.write(
+                    f"{mode:<14}{level:>11}{wall:>9.2f}{level / wall:>11.1f}"
+                    f"{statistics.median(latencies) * 1000:>9.0f}{latencies[int(len(latencies) * 0.99)] * 1000:>9.0f}"
+                    f"{stats['peakInFlight']:>10}"
+                )
+
+    @staticmethod
+    async def run_async(url: str, level: int):
+        client = await AsyncChainClient(url, STUB_CONTRACT, max_connections=max(level * 2, 10)).connect()
+        try:
+            async def lookup(i):
+                start = time.perf_counter()
+                result = await client.get_user_credits(wallet(i))
+                assert result['success'], result
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*[lookup(i) for i in range(level)])
+            return list(latencies), time.perf_counter() - start
+        finally:
+            await client.close()
+
+    @staticmethod
+    def run_sync(lookup, level: int, threads: int):
+        def timed(i):
+            # Latency as the client sees it includes the wait for a free thread
+            lookup(wallet(i))
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(timed, range(level)))
+        return latencies, time.perf_counter() - start
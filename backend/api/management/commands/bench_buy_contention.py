@@ -0,0 +1,123 @@
+"""
+Fire many concurrent buyers at one marketplace listing.
+
+A temporary listing is created and every buyer thread calls buy_listing for
+it at the same moment. The chain transfer is replaced by a stand-in that
+sleeps for --transfer-delay seconds, so the run needs no node and shows how
+long losing buyers wait compared to the winner. The listing and the rows the
+run creates are deleted afterwards.
+
+Usage: python manage.py bench_buy_contention [--buyers 50] [--transfer-delay 0.5]
+"""
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIClient
+
+from api import marketplace_views
+from api.models import Activity, MarketplaceListing
+
+
+class StandInTransfer:
+    """Counts transfer attempts and succeeds after a fixed delay"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, from_address, to_address, token_id, wait_for_receipt=True):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return {
+            'success': True,
+            'transaction_hash': f'0xbench{token_id:060x}',
+            'block_number': 1,
+        }
+
+
+class Command(BaseCommand):
+    help = "Check that concurrent buyers of one listing produce one sale and fast 409s"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=50)
+        parser.add_argument('--transfer-delay', type=float, default=0.5)
+
+    def handle(self, *args, **options):
+        buyers = options['buyers']
+        activity = Activity.objects.create(
+            user='bench-seller',
+            activity_type='bench',
+            data={},
+            predicted_emission=1.0,
+            user_wallet='0x' + '5' * 40,
+            token_id=10**9,
+            transaction_hash='0xbench',
+        )
+        listing = MarketplaceListing.objects.create(
+            activity=activity,
+            token_id=activity.token_id,
+            seller=activity.user,
+            seller_wallet=activity.user_wallet,
+            price_eth=0.01,
+            co2_grams=1000,
+            activity_type=activity.activity_type,
+            transaction_hash=activity.transaction_hash,
+        )
+
+        stand_in = StandInTransfer(options['transfer_delay'])
+        original_transfer = marketplace_views.transfer_nft
+        marketplace_views.transfer_nft = stand_in
+
+        barrier = threading.Barrier(buyers)
+        results = []
+        results_lock = threading.Lock()
+
+        def buy(index):
+            client = APIClient()
+            barrier.wait()
+            start = time.monotonic()
+            response = client.post(
+                f'/api/marketplace/buy/{listing.id}/',
+                {'buyerWallet': '0x' + f'{index:040x}', 'buyer': f'bench-buyer-{index}', 'waitForConfirmation': True},
+                format='json'
+            )
+            with results_lock:
+                results.append((response.status_code, time.monotonic() - start))
+            connection.close()
+
+        threads = [threading.Thread(target=buy, args=(i,)) for i in range(buyers)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            marketplace_views.transfer_nft = original_transfer
+            listing.refresh_from_db()
+            final_status = listing.status
+            Activity.objects.filter(pk=listing.purchase_activity_id).delete()
+            activity.delete()
+
+        winners = [elapsed for code, elapsed in results if code == 200]
+        conflicts = [elapsed for code, elapsed in results if code == 409]
+        others = [code for code, _ in results if code not in (200, 409)]
+
+        self.stdout.write(f"{buyers} buyers, transfer delay {options['transfer_delay']}s")
+        self.stdout.write(f"  winners:   {len(winners)}" + (f" in {winners[0] * 1000:.0f} ms" if winners else ""))
+        if conflicts:
+            self.stdout.write(
+                f"  409s:      {len(conflicts)} (median {statistics.median(conflicts) * 1000:.1f} ms, "
+                f"max {max(conflicts) * 1000:.1f} ms)"
+            )
+        self.stdout.write(f"  other:     {others}")
+        self.stdout.write(f"  transfers attempted: {stand_in.calls}, final listing status: {final_status}")
+
+        if len(winners) == 1 and stand_in.calls == 1 and not others and final_status == 'sold':
+            self.stdout.write(self.style.SUCCESS("Exactly one buyer won; every other buyer was rejected before any chain call"))
+        else:
+            self.stderr.write(self.style.ERROR("Contention check failed"))
@@ -0,0 +1,148 @@
+"""
+Check that exports stream in flat memory when served by ASGI.
+
+Creates --rows activities for a bench user (deleted again at the end),
+then, for each size in --sizes, downloads /api/exports/activities/
+through the ASGI application, discarding the body as it is sent, and
+reports the peak Python memory (tracemalloc) during the request, the
+time to the first body message and the number of body messages.
+
+--compare also consumes the same export with a sync body, the way
+Django's ASGI handler reads one (the whole body is built first), to
+show the difference.
+
+Usage: python manage.py bench_export_memory [--sizes 5000,20000,80000] [--compare]
+"""
+import asyncio
+import time
+import tracemalloc
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.exports import activity_export_rows, export_response
+from api.models import Activity
+from api.serializers import ACTIVITY_FIELDS
+
+BENCH_USER = 'bench-export-user'
+
+
+async def download(application, path: str, query: str) -> dict:
+    """GET path through the ASGI application; returns timing and size of the body"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'headers': [(b'host', b'localhost')], 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+    }
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    result = {'status': None, 'bytes': 0, 'messages': 0, 'first_body': None}
+    start = time.perf_counter()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            result['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            if message.get('body'):
+                if result['first_body'] is None:
+                    result['first_body'] = time.perf_counter() - start
+                result['bytes'] += len(message['body'])
+                result['messages'] += 1
+
+    await application(scope, receive, send)
+    disconnected.set()
+    result['total'] = time.perf_counter() - start
+    return result
+
+
+async def consume_sync_body(rows) -> dict:
+    """Read a sync-bodied export response the way the ASGI handler does"""
+    response = export_response(rows, ACTIVITY_FIELDS, 'csv', False, 'bench', asgi=False)
+    result = {'status': response.status_code, 'bytes': 0, 'messages': 0, 'first_body': None}
+    start = time.perf_counter()
+    async for part in response:
+        if result['first_body'] is None:
+            result['first_body'] = time.perf_counter() - start
+        result['bytes'] += len(part)
+        result['messages'] += 1
+    result['total'] = time.perf_counter() - start
+    return result
+
+
+def measure(run) -> tuple:
+    """Run a coroutine factory under tracemalloc; returns (result, peak bytes above the start)"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        result = asyncio.run(run())
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+class Command(BaseCommand):
+    help = "Check that activity exports served by ASGI stream in flat memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='5000,20000,80000', help="export sizes in rows, ascending")
+        parser.add_argument('--compare', action='store_true', help="also consume the export as a sync body")
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        application = get_asgi_application()
+        if Activity.objects.filter(user=BENCH_USER).exists():
+            raise CommandError(f"Activities of {BENCH_USER} already exist; delete them first")
+
+        # Committed, because the ASGI request reads them on its own connection
+        created = 0
+        try:
+            self.stdout.write(f"{'body':<8}{'rows':>8}{'MB sent':>10}{'pieces':>8}{'first ms':>10}{'total s':>9}{'peak MB':>9}")
+            peaks = []
+            for size in sizes:
+                with transaction.atomic():
+                    Activity.objects.bulk_create([
+                        Activity(
+                            user=BENCH_USER, activity_type='tree_planting', predicted_emission=-i,
+                            data={'trees': i % 50, 'company': 'bench', 'note': 'x' * 120},
+                        )
+                        for i in range(created, size)
+                    ], batch_size=5000)
+                created = size
+
+                result, peak = measure(lambda: download(
+                    application, '/api/exports/activities/', f'user={BENCH_USER}&output=csv'
+                ))
+                if result['status'] != 200:
+                    raise CommandError(f"Export returned {result['status']}")
+                peaks.append(peak)
+                self.report('async', size, result, peak)
+
+                if options['compare']:
+                    result, peak = measure(lambda: consume_sync_body(activity_export_rows(user=BENCH_USER)))
+                    self.report('sync', size, result, peak)
+
+            growth = peaks[-1] / peaks[0] if peaks[0] else float('inf')
+            verdict = 'flat' if growth < 2 else 'GROWING'
+            self.stdout.write(
+                f"ASGI peak memory x{growth:.2f} from {sizes[0]} to {sizes[-1]} rows "
+                f"(x{sizes[-1] / sizes[0]:.0f} rows): {verdict}"
+            )
+        finally:
+            Activity.objects.filter(user=BENCH_USER).delete()
+
+    def report(self, body: str, rows: int, result: dict, peak: int):
+        self.stdout.write(
+            f"{body:<8}{rows:>8}{result['bytes'] / 1e6:>10.1f}{result['messages']:>8}"
+            f"{(result['first_body'] or 0) * 1000:>10.0f}{result['total']:>9.2f}{peak / 1e6:>9.1f}"
+        )
@@ -0,0 +1,411 @@
+"""
+Full-stack HTTP benchmark of the backend against a local chain.
+
+Boots everything the API talks to on this machine:
+
+- a Hardhat node (started with --start-node, or already running at
+  --rpc-url) with CarbonCredit deployed from the Hardhat artifact by the
+  node's first account, which becomes the backend wallet;
+- a stub AI engine answering /predict instantly with a deterministic value;
+- the Django API itself (manage.py runserver in a subprocess) on a
+  throwaway SQLite database, cache directory and order book journal.
+
+Seller wallets are the node's other funded accounts; each approves the
+backend as operator so purchases can transfer. The run seeds some minted
+and listed credits, then --concurrency clients send a weighted mix of
+log/, marketplace/listings/, marketplace/create/ and marketplace/buy/
+requests for --duration seconds. Throughput and latency percentiles per
+endpoint are written to --output as JSON, so runs can be diffed between
+releases.
+
+Compile the contract first (cd blockchain && npm run compile).
+
+Usage: python manage.py bench_http --start-node [--duration 60] [--concurrency 8]
+           [--mix listings=60,log=20,create=10,buy=10] [--output bench-http.json]
+"""
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from eth_account import Account
+from web3 import Web3
+
+BLOCKCHAIN_DIR = Path(settings.BASE_DIR).parent / 'blockchain'
+ARTIFACT_PATH = BLOCKCHAIN_DIR / 'artifacts' / 'contracts' / 'CarbonCredit.sol' / 'CarbonCredit.json'
+
+# Hardhat's default development mnemonic; its accounts are pre-funded on every local node
+HARDHAT_MNEMONIC = 'test test test test test test test test test test test junk'
+
+ENDPOINTS = ('listings', 'log', 'create', 'buy')
+OFFSET_ACTIVITY_TYPES = ('tree_planting', 'renewable_energy', 'recycling', 'carbon_offset')
+
+
+def hardhat_account(index: int):
+    Account.enable_unaudited_hdwallet_features()
+    return Account.from_mnemonic(HARDHAT_MNEMONIC, account_path=f"m/44'/60'/0'/0/{index}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(check, timeout: float, what: str):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except Exception:
+            pass
+        time.sleep(0.25)
+    raise CommandError(f"Timed out waiting for {what}")
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class StubAIHandler(BaseHTTPRequestHandler):
+    """Answers POST /predict with an emission derived from the activity text"""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        emission = 0.5 + (sum(payload.get('activity', '').encode()) % 500) / 100
+        body = json.dumps({'predicted_emission': emission}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Workload:
+    """Shared state of one run: wallets, minted and listed credits, and timings"""
+
+    def __init__(self, base_url: str, wallets: list):
+        self.base_url = base_url
+        self.wallets = wallets
+        self.lock = threading.Lock()
+        self.unlisted = []  # (token_id, wallet address)
+        self.listed = []  # (listing id, seller wallet address)
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.failures = defaultdict(int)
+
+    def request(self, session, endpoint: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, self.base_url + path, timeout=60, **kwargs)
+        except requests.RequestException:
+            with self.lock:
+                self.failures[endpoint] += 1
+            return None
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies[endpoint].append(elapsed)
+            self.statuses[endpoint][response.status_code] += 1
+        return response
+
+    def log(self, session, rng):
+        wallet = rng.choice(self.wallets)
+        response = self.request(session, 'log', 'POST', '/api/log/', json={
+            'user': f'bench-{wallet[-6:]}',
+            'activity_type': rng.choice(OFFSET_ACTIVITY_TYPES),
+            'activity': f'planted {rng.randint(1, 50)} trees',
+            'user_wallet': wallet,
+            'wait_for_confirmation': True,
+        })
+        if response is not None and response.status_code == 201 and response.json().get('token_id'):
+            with self.lock:
+                self.unlisted.append((response.json()['token_id'], wallet))
+
+    def listings(self, session, rng):
+        params = {'sort': rng.choice(['recent', 'price', '-co2', 'price_per_tonne']), 'limit': 50}
+        self.request(session, 'listings', 'GET', '/api/marketplace/listings/', params=params)
+
+    def create(self, session, rng):
+        with self.lock:
+            if not self.unlisted:
+                return False
+            token_id, wallet = self.unlisted.pop(rng.randrange(len(self.unlisted)))
+        response = self.request(session, 'create', 'POST', '/api/marketplace/create/', json={
+            'tokenId': token_id,
+            'sellerWallet': wallet,
+            'priceEth': round(rng.uniform(0.001, 0.05), 4),
+            'seller': f'bench-{wallet[-6:]}',
+        })
+        if response is not None and response.status_code == 201:
+            with self.lock:
+                self.listed.append((response.json()['listingId'], wallet))
+        return True
+
+    def buy(self, session, rng):
+        with self.lock:
+            if not self.listed:
+                return False
+            listing_id, seller_wallet = self.listed.pop(rng.randrange(len(self.listed)))
+        buyer_wallet = rng.choice([w for w in self.wallets if w != seller_wallet])
+        response = self.request(session, 'buy', 'POST', f'/api/marketplace/buy/{listing_id}/', json={
+            'buyerWallet': buyer_wallet,
+            'buyer': f'bench-{buyer_wallet[-6:]}',
+            'waitForConfirmation': True,
+        })
+        if response is not None and response.status_code in (200, 202):
+            with self.lock:
+                # The credit can be relisted by its new owner
+                token_id = response.json().get('tokenId')
+                if token_id is not None:
+                    self.unlisted.append((token_id, buyer_wallet))
+        return True
+
+    def summary(self, duration: float) -> dict:
+        endpoints = {}
+        for endpoint in ENDPOINTS:
+            latencies = sorted(self.latencies.get(endpoint, []))
+            statuses = dict(self.statuses.get(endpoint, {}))
+            ok = sum(count for code, count in statuses.items() if code < 400)
+            endpoints[endpoint] = {
+                'requests': len(latencies),
+                'ok': ok,
+                'statusCodes': {str(code): count for code, count in sorted(statuses.items())},
+                'connectionErrors': self.failures.get(endpoint, 0),
+                'throughputRps': round(len(latencies) / duration, 2) if duration else None,
+                'latencyMs': {
+                    'mean': round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+                    'p50': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+                    'p90': round(percentile(latencies, 90) * 1000, 2) if latencies else None,
+                    'p99': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+                    'max': round(latencies[-1] * 1000, 2) if latencies else None,
+                },
+            }
+        return endpoints
+
+
+class Command(BaseCommand):
+    help = "Benchmark the HTTP API end to end against a local Hardhat node and a stub AI engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rpc-url', default='http://127.0.0.1:8545')
+        parser.add_argument('--start-node', action='store_true', help="start `npx hardhat node` for the run")
+        parser.add_argument('--duration', type=float, default=60)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--wallets', type=int, default=8, help="seller/buyer wallets (Hardhat accounts 1..N)")
+        parser.add_argument('--seed-credits', type=int, default=40, help="credits minted (half listed) before the run")
+        parser.add_argument('--mix', default='listings=60,log=20,create=10,buy=10')
+        parser.add_argument('--output', default='bench-http.json')
+        parser.add_argument('--keep-workdir', action='store_true')
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        workdir = tempfile.mkdtemp(prefix='bench-http-')
+        processes = []
+        ai_server = None
+        try:
+            if options['start_node']:
+                processes.append(self.start_node(options['rpc_url'], workdir))
+            w3 = Web3(Web3.HTTPProvider(options['rpc_url']))
+            wait_for(w3.is_connected, 60, f"chain node at {options['rpc_url']}")
+
+            deployer = hardhat_account(0)
+            contract_address = self.deploy_contract(w3, deployer)
+            self.stdout.write(f"Deployed CarbonCredit at {contract_address}")
+
+            ai_port = free_port()
+            ai_server = ThreadingHTTPServer(('127.0.0.1', ai_port), StubAIHandler)
+            threading.Thread(target=ai_server.serve_forever, daemon=True).start()
+
+            api_port = free_port()
+            processes.append(self.start_api(api_port, workdir, {
+                'RPC_URL': options['rpc_url'],
+                'RPC_URLS': options['rpc_url'],
+                'CONTRACT_ADDRESS': contract_address,
+                'PRIVATE_KEY': deployer.key.hex(),
+                'AI_ENGINE_URL': f'http://127.0.0.1:{ai_port}/predict',
+                'ASYNC_TX_SUBMISSION': 'false',
+            }))
+            base_url = f'http://127.0.0.1:{api_port}'
+            wait_for(lambda: requests.get(f'{base_url}/api/blockchain/status/', timeout=2).ok, 60, "the API server")
+
+            wallets = [hardhat_account(i) for i in range(1, options['wallets'] + 1)]
+            self.approve_backend(w3, contract_address, wallets, deployer.address)
+            workload = Workload(base_url, [wallet.address for wallet in wallets])
+
+            self.stdout.write(f"Seeding {options['seed_credits']} credits...")
+            self.seed(workload, options['seed_credits'])
+
+            self.stdout.write(
+                f"Running {options['duration']:.0f}s with {options['concurrency']} clients, mix {mix}"
+            )
+            elapsed = self.run_load(workload, mix, options['concurrency'], options['duration'])
+
+            report = {
+                'startedAt': datetime.now(timezone.utc).isoformat(),
+                'gitCommit': self.git_commit(),
+                'durationSeconds': round(elapsed, 2),
+                'concurrency': options['concurrency'],
+                'wallets': options['wallets'],
+                'mix': mix,
+                'endpoints': workload.summary(elapsed),
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.print_report(report)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        finally:
+            if ai_server:
+                ai_server.shutdown()
+            for process in reversed(processes):
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if options['keep_workdir']:
+                self.stdout.write(f"Logs and database kept in {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    @staticmethod
+    def parse_mix(value: str) -> dict:
+        mix = {}
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            if name.strip() not in ENDPOINTS:
+                raise CommandError(f"Unknown endpoint in --mix: {name} (expected {', '.join(ENDPOINTS)})")
+            mix[name.strip()] = float(weight or 1)
+        return mix
+
+    def start_node(self, rpc_url: str, workdir: str):
+        port = rpc_url.rsplit(':', 1)[-1].strip('/')
+        log = open(os.path.join(workdir, 'hardhat-node.log'), 'w')
+        self.stdout.write(f"Starting Hardhat node on port {port}")
+        return subprocess.Popen(
+            ['npx', 'hardhat', 'node', '--port', port],
+            cwd=BLOCKCHAIN_DIR, stdout=log, stderr=subprocess.STDOUT
+        )
+
+    def start_api(self, port: int, workdir: str, chain_env: dict):
+        env = dict(os.environ)
+        env.update(chain_env)
+        # The benchmark measures the API, not the per-wallet write limits
+        for name in ('CHAIN_MINTS_PER_MINUTE', 'CHAIN_TRANSFERS_PER_MINUTE', 'CHAIN_SIGNER_WRITES_PER_SECOND'):
+            env.setdefault(name, '1000000')
+        for name in ('CHAIN_MINT_BURST', 'CHAIN_TRANSFER_BURST', 'CHAIN_SIGNER_BURST'):
+            env.setdefault(name, '1000')
+        env.update({
+            'DATABASE_PATH': os.path.join(workdir, 'db.sqlite3'),
+            'SHARED_CACHE_LOCATION': os.path.join(workdir, 'cache'),
+            'ORDERBOOK_JOURNAL_PATH': os.path.join(workdir, 'orderbook.journal'),
+        })
+        manage = str(Path(settings.BASE_DIR) / 'manage.py')
+        subprocess.run([sys.executable, manage, 'migrate', '-v0'], env=env, check=True)
+        log = open(os.path.join(workdir, 'api.log'), 'w')
+        self.stdout.write(f"Starting API on port {port}")
+        return subprocess.Popen(
+            [sys.executable, manage, 'runserver', f'127.0.0.1:{port}', '--noreload'],
+            env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+
+    def deploy_contract(self, w3: Web3, deployer) -> str:
+        if not ARTIFACT_PATH.exists():
+            raise CommandError(f"{ARTIFACT_PATH} not found; run `npm run compile` in blockchain/")
+        with open(ARTIFACT_PATH) as f:
+            artifact = json.load(f)
+        factory = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+        receipt = self.send(w3, deployer, factory.constructor())
+        return receipt['contractAddress']
+
+    def approve_backend(self, w3: Web3, contract_address: str, wallets: list, backend_address: str):
+        with open(ARTIFACT_PATH) as f:
+            contract = w3.eth.contract(address=contract_address, abi=json.load(f)['abi'])
+        for wallet in wallets:
+            self.send(w3, wallet, contract.functions.setApprovalForAll(backend_address, True))
+
+    @staticmethod
+    def send(w3: Web3, account, contract_function):
+        tx = contract_function.build_transaction({
+            'from': account.address,
+            'nonce': w3.eth.get_transaction_count(account.address),
+        })
+        signed = account.sign_transaction(tx)
+        tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+        return w3.eth.wait_for_transaction_receipt(tx_hash)
+
+    def seed(self, workload: Workload, count: int):
+        rng = random.Random(7)
+        session = requests.Session()
+        for _ in range(count):
+            workload.log(session, rng)
+        for _ in range(count // 2):
+            workload.create(session, rng)
+        # Seeding is setup, not part of the measurement
+        workload.latencies.clear()
+        workload.statuses.clear()
+        workload.failures.clear()
+
+    def run_load(self, workload: Workload, mix: dict, concurrency: int, duration: float) -> float:
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        deadline = time.monotonic() + duration
+
+        def client(seed: int):
+            rng = random.Random(seed)
+            session = requests.Session()
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                if name == 'log':
+                    workload.log(session, rng)
+                elif name == 'listings' or not getattr(workload, name)(session, rng):
+                    # create/buy fall back to browsing when there is nothing to act on
+                    workload.listings(session, rng)
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=client, args=(seed,)) for seed in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - start
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except Exception:
+            return None
+
+    def print_report(self, report: dict):
+        self.stdout.write(f"{'endpoint':<10}{'requests':>10}{'ok':>8}{'rps':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+        for endpoint, stats in report['endpoints'].items():
+            latency = stats['latencyMs']
+            self.stdout.write(
+                f"{endpoint:<10}{stats['requests']:>10}{stats['ok']:>8}{stats['throughputRps'] or 0:>9.1f}"
+                f"{latency['p50'] or 0:>10.1f}{latency['p90'] or 0:>10.1f}{latency['p99'] or 0:>10.1f}"
+            )
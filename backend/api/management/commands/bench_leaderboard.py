@@ -0,0 +1,86 @@
+"""
+Leaderboard operation costs against the equivalent SQL.
+
+Creates --subjects all-time user scores inside a transaction that is
+rolled back at the end, then times, per operation:
+
+- load:   building the in-memory board from LeaderboardScore
+- update: changing one score (Board.set)
+- rank:   one subject's rank, in memory and as a COUNT(*) of higher scores
+- top:    a page of 100 from a random offset, in memory and as ORDER BY ... OFFSET
+
+Usage: python manage.py bench_leaderboard [--subjects 100000] [--ops 5000]
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.leaderboard import ALL_TIME_START, Board
+from api.models import LeaderboardScore
+
+
+class Command(BaseCommand):
+    help = "Benchmark leaderboard updates, ranks and top-K pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subjects', type=int, default=100000)
+        parser.add_argument('--ops', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        subjects, ops = options['subjects'], options['ops']
+        rng = random.Random(11)
+        with transaction.atomic():
+            LeaderboardScore.objects.bulk_create([
+                LeaderboardScore(
+                    subject_type='user', subject=f'bench-user-{i}', period='all',
+                    period_start=ALL_TIME_START, net_grams=rng.randint(-10 ** 7, 10 ** 7)
+                )
+                for i in range(subjects)
+            ], batch_size=5000)
+            try:
+                self.run(subjects, ops, rng)
+            finally:
+                transaction.set_rollback(True)
+
+    def run(self, subjects: int, ops: int, rng: random.Random):
+        board_rows = LeaderboardScore.objects.filter(subject_type='user', period='all', period_start=ALL_TIME_START)
+        names = [f'bench-user-{rng.randrange(subjects)}' for _ in range(ops)]
+
+        start = time.perf_counter()
+        board = Board()
+        board.load(board_rows.values_list('subject', 'net_grams').iterator(chunk_size=2000))
+        self.stdout.write(f"{subjects} subjects; load {(time.perf_counter() - start) * 1000:.0f} ms")
+        self.stdout.write(f"{'operation':<10}{'memory us':>12}{'sql us':>12}")
+
+        start = time.perf_counter()
+        for name in names:
+            board.set(name, rng.randint(-10 ** 7, 10 ** 7))
+        self.report('update', start, ops)
+
+        start = time.perf_counter()
+        for name in names:
+            board.rank_of_score(board.scores[name])
+        memory = time.perf_counter() - start
+        start = time.perf_counter()
+        for name in names[:ops // 10]:
+            board_rows.filter(net_grams__gt=board.scores[name]).count()
+        self.report('rank', start, ops // 10, memory / ops)
+
+        offsets = [rng.randrange(subjects) for _ in range(ops // 10)]
+        start = time.perf_counter()
+        for offset in offsets:
+            board.top(100, offset)
+        memory = time.perf_counter() - start
+        start = time.perf_counter()
+        for offset in offsets:
+            list(board_rows.order_by('-net_grams', 'subject').values_list('subject', 'net_grams')[offset:offset + 100])
+        self.report('top 100', start, len(offsets), memory / len(offsets))
+
+    def report(self, operation: str, start: float, count: int, memory: float = None):
+        elapsed = (time.perf_counter() - start) / count
+        if memory is None:
+            self.stdout.write(f"{operation:<10}{elapsed * 1e6:>12.1f}{'-':>12}")
+        else:
+            self.stdout.write(f"{operation:<10}{memory * 1e6:>12.1f}{elapsed * 1e6:>12.1f}")
@@ -0,0 +1,104 @@
+"""
+Measure order book match latency with a deep book.
+
+Builds one market with --resting resting orders (half bids, half asks, on
+non-crossing price ladders), then times --orders incoming orders of which
+about half cross the spread. Each order is journaled to a temporary file as
+in production. Finally the journal is replayed into a fresh book to time
+crash recovery and check that it reproduces the same trades.
+
+Usage: python manage.py bench_orderbook [--resting 100000] [--orders 20000]
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.orderbook import OrderBook
+
+
+class Command(BaseCommand):
+    help = "Benchmark order book matching latency with 100k resting orders and journal replay"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resting', type=int, default=100000)
+        parser.add_argument('--orders', type=int, default=20000)
+        parser.add_argument('--levels', type=int, default=500, help="distinct price levels per side")
+
+    def handle(self, *args, **options):
+        random.seed(11)
+        levels = options['levels']
+        journal_path = os.path.join(tempfile.mkdtemp(prefix='orderbook-bench-'), 'orderbook.journal')
+        book = OrderBook(journal_path)
+        book.open_journal()
+
+        # Bids at 0.0100..0.0149 ETH, asks at 0.0150..0.0199 ETH: nothing crosses yet
+        tick = 0.005 / levels
+        next_token = 1
+        start = time.monotonic()
+        for i in range(options['resting']):
+            wallet = f'0x{random.randrange(1000):040x}'
+            if i % 2:
+                price = round(0.0150 + tick * random.randrange(levels), 8)
+                book.place('ask', 'car', 2025, price, wallet, 'bench', token_id=next_token)
+                next_token += 1
+            else:
+                price = round(0.0100 + tick * random.randrange(levels), 8)
+                book.place('bid', 'car', 2025, price, wallet, 'bench', quantity=random.randint(1, 3))
+        build_seconds = time.monotonic() - start
+        self.stdout.write(f"Built book: {len(book.orders)} resting orders in {build_seconds:.2f}s")
+
+        latencies = []
+        trade_count = 0
+        for i in range(options['orders']):
+            wallet = f'0x{1000 + random.randrange(1000):040x}'
+            crossing = random.random() < 0.5
+            if i % 2:
+                price = round((0.0120 if crossing else 0.0155) + tick * random.randrange(levels // 2), 8)
+                order_start = time.perf_counter()
+                _, trades = book.place('ask', 'car', 2025, price, wallet, 'bench', token_id=next_token)
+                next_token += 1
+            else:
+                price = round((0.0180 if crossing else 0.0120) + tick * random.randrange(levels // 2), 8)
+                order_start = time.perf_counter()
+                _, trades = book.place('bid', 'car', 2025, price, wallet, 'bench', quantity=random.randint(1, 3))
+            latencies.append(time.perf_counter() - order_start)
+            trade_count += len(trades)
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        self.stdout.write(
+            f"{len(latencies)} incoming orders, {trade_count} trades: "
+            f"mean {statistics.mean(latencies) * 1e6:.1f} us, p50 {p50:.1f} us, "
+            f"p99 {p99:.1f} us, max {latencies[-1] * 1e6:.1f} us"
+        )
+
+        depth = book.depth('car', 2025, levels=1)
+        self.stdout.write(f"Best bid {depth['bids']}, best ask {depth['asks']}")
+
+        book.close()
+        start = time.monotonic()
+        recovered = OrderBook(journal_path)
+        recovered.open_journal()
+        replay_seconds = time.monotonic() - start
+        recovered.close()
+
+        same = (
+            len(recovered.trades) == len(book.trades)
+            and all(recovered.trades[t].token_id == book.trades[t].token_id for t in book.trades)
+            and recovered.orders.keys() == book.orders.keys()
+        )
+        self.stdout.write(
+            f"Replayed {os.path.getsize(journal_path) / 1e6:.1f} MB journal in {replay_seconds:.2f}s, "
+            f"{len(recovered.trades)} trades, book identical: {same}"
+        )
+        os.remove(journal_path)
+
+        if p99 < 1000 and same:
+            self.stdout.write(self.style.SUCCESS("p99 match latency under 1 ms and recovery reproduced the book"))
+        else:
+            self.stderr.write(self.style.WARNING("Latency target missed or replay diverged"))
@@ -0,0 +1,110 @@
+"""
+Exercise RPCProviderPool against local stand-in providers.
+
+Three stand-ins are created: a fast one, a slow one and a flaky one. The
+command drives reads through the pool, takes the fast provider down halfway
+through, broadcasts transactions while the first choice times out, and
+reports where traffic went and how the pool scored each member.
+
+Usage: python manage.py bench_rpc_pool [--reads 2000]
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from web3 import Web3
+
+from api.rpc_pool import RPCProviderPool, NonceManager
+
+
+class StandInProvider:
+    """In-process provider with injectable latency and failures"""
+
+    def __init__(self, name: str, delay: float, failure_rate: float = 0.0):
+        self.name = name
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.down = False
+        self.calls = 0
+        self.sent_transactions = []
+        self.block_number = 1000
+        self.pending_nonce = 0
+
+    def make_request(self, method, params):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.down or random.random() < self.failure_rate:
+            raise ConnectionError(f"{self.name} unavailable")
+
+        if method == 'eth_blockNumber':
+            result = hex(self.block_number)
+        elif method == 'eth_getTransactionCount':
+            result = hex(self.pending_nonce)
+        elif method == 'eth_sendRawTransaction':
+            self.sent_transactions.append(params[0])
+            result = Web3.to_hex(Web3.keccak(hexstr=params[0]))
+        else:
+            result = None
+        return {'jsonrpc': '2.0', 'id': 1, 'result': result}
+
+    def make_batch_request(self, batch_requests):
+        return [self.make_request(method, params) for method, params in batch_requests]
+
+
+class Command(BaseCommand):
+    help = "Check RPC pool routing and failover against stand-in providers with injected delays and failures"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reads', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        random.seed(7)
+        fast = StandInProvider('fast', delay=0.001)
+        slow = StandInProvider('slow', delay=0.02)
+        flaky = StandInProvider('flaky', delay=0.001, failure_rate=0.3)
+        pool = RPCProviderPool([('fast', fast), ('slow', slow), ('flaky', flaky)])
+        w3 = Web3(pool)
+
+        reads = options['reads']
+        failed_reads = 0
+        start = time.monotonic()
+        for i in range(reads):
+            if i == reads // 2:
+                fast.down = True
+                self.stdout.write("-- fast provider taken down --")
+            try:
+                w3.eth.block_number
+            except Exception:
+                failed_reads += 1
+        elapsed = time.monotonic() - start
+
+        self.stdout.write(f"\n{reads} reads in {elapsed:.2f}s, {failed_reads} failed after failover")
+        for provider in (fast, slow, flaky):
+            self.stdout.write(f"  {provider.name:6s} calls={provider.calls}")
+        for row in pool.stats():
+            self.stdout.write(f"  {row}")
+
+        # Writes: the fast provider is still down, so every broadcast fails over
+        nonce_manager = NonceManager(w3)
+        account = w3.eth.account.create()
+        hashes = []
+        for _ in range(5):
+            with nonce_manager.lock:
+                nonce = nonce_manager.next_nonce(account.address)
+                signed = account.sign_transaction({
+                    'to': account.address, 'value': 0, 'gas': 21000,
+                    'gasPrice': 1, 'nonce': nonce, 'chainId': 1,
+                })
+                hashes.append((nonce, w3.eth.send_raw_transaction(signed.raw_transaction)))
+
+        nonces = [nonce for nonce, _ in hashes]
+        self.stdout.write(f"\nBroadcast {len(hashes)} transactions with nonces {nonces}")
+        for provider in (fast, slow, flaky):
+            self.stdout.write(f"  {provider.name:6s} accepted={len(provider.sent_transactions)}")
+
+        if nonces != list(range(len(hashes))):
+            self.stderr.write(self.style.ERROR("Nonces were not sequential"))
+        elif failed_reads:
+            self.stderr.write(self.style.WARNING("Some reads failed on every provider"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All reads and writes succeeded through failover"))
@@ -0,0 +1,107 @@
+"""
+Rows serialized per second on the activity history path.
+
+Creates --rows Activity rows for one user inside a transaction that is
+rolled back at the end, then times three ways of turning them into the
+JSON body of GET /api/activities/<user>/:
+
+- drf:   ActivitySerializer(many=True) + JSONRenderer (the old path)
+- lean:  serialize_activities (.values()) + JSONRenderer
+- fast:  serialize_activities + FastJSONRenderer (orjson when installed)
+
+Every variant, and the endpoint itself, must produce the same bytes as
+drf; the command fails otherwise.
+
+Usage: python manage.py bench_serialization [--rows 5000] [--repeat 5]
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Activity
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import ActivitySerializer, serialize_activities
+
+BENCH_USER = 'bench-serialization'
+
+ACTIVITY_TYPES = ['tree_planting', 'solar_energy', 'recycling', 'driving', 'flight', 'home_energy']
+
+
+class Command(BaseCommand):
+    help = "Benchmark activity serialization and rendering (rows per second)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.create_rows(options['rows'])
+            try:
+                self.run(options['rows'], options['repeat'])
+            finally:
+                transaction.set_rollback(True)
+
+    def create_rows(self, count: int):
+        rng = random.Random(7)
+        wallet = '0x' + 'ab' * 20
+        Activity.objects.bulk_create([
+            Activity(
+                user=BENCH_USER,
+                activity_type=(activity_type := rng.choice(ACTIVITY_TYPES)),
+                data={
+                    'activity': f"{activity_type} {rng.randint(1, 500)} units – ünïcode",
+                    'activity_type': activity_type,
+                    'wallet_address': wallet,
+                    'is_offset': activity_type in ACTIVITY_TYPES[:3],
+                    'quantity': round(rng.uniform(0, 100), 2),
+                },
+                predicted_emission=rng.uniform(0, 500),
+                transaction_hash='0x' + rng.randbytes(32).hex(),
+                token_id=i if i % 3 else None,
+                user_wallet=wallet,
+                marketplace_status=rng.choice(['not_listed', 'listed', 'sold']),
+                listing_price=round(rng.uniform(0.001, 1), 4) if i % 4 == 0 else None,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+
+    def run(self, rows: int, repeat: int):
+        queryset = Activity.objects.filter(user=BENCH_USER).order_by('-timestamp')
+        variants = {
+            'drf': (lambda: ActivitySerializer(queryset, many=True).data, JSONRenderer()),
+            'lean': (lambda: serialize_activities(queryset), JSONRenderer()),
+            'fast': (lambda: serialize_activities(queryset), FastJSONRenderer()),
+        }
+
+        self.stdout.write(f"{rows} rows, best of {repeat}; orjson {'installed' if orjson else 'not installed'}")
+        self.stdout.write(f"{'variant':<8}{'serialize ms':>14}{'render ms':>11}{'total ms':>10}{'rows/s':>11}")
+        expected = None
+        for name, (serialize, renderer) in variants.items():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                data = serialize()
+                serialized = time.perf_counter()
+                body = renderer.render(data)
+                rendered = time.perf_counter()
+                timing = (serialized - start, rendered - serialized)
+                if best is None or sum(timing) < sum(best):
+                    best = timing
+            if expected is None:
+                expected = body
+            elif body != expected:
+                raise CommandError(f"{name} output differs from the DRF serializer's")
+            total = sum(best)
+            self.stdout.write(
+                f"{name:<8}{best[0] * 1000:>14.1f}{best[1] * 1000:>11.1f}{total * 1000:>10.1f}{rows / total:>11,.0f}"
+            )
+
+        response = Client().get(f'/api/activities/{BENCH_USER}/', HTTP_ACCEPT='application/json')
+        if response.content != expected:
+            raise CommandError("GET /api/activities/<user>/ output differs from the DRF serializer's")
+        self.stdout.write(self.style.SUCCESS("All variants and the endpoint produce identical bytes"))
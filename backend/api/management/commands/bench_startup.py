@@ -0,0 +1,110 @@
+"""
+Cold-start time budget for the backend and the AI engine.
+
+Each target is started --runs times in a fresh interpreter under
+`python -X importtime`. The median wall time is checked against the
+budget, and the slowest imports from the median run are listed so a
+regression shows what caused it. Exits non-zero when a target is over
+budget or fails to start, so it can gate CI.
+
+Targets:
+- backend: django.setup() plus the URLconf, i.e. what every worker,
+  manage.py command and test run imports before doing any work
+- ai-engine: importing ai_engine/ai_predict.py (the FastAPI app)
+
+Usage: python manage.py bench_startup [--budget-ms 1000] [--runs 5] [--targets backend,ai-engine]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+TARGETS = {
+    'backend': (
+        settings.BASE_DIR,
+        "import os, django; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings'); "
+        "django.setup(); import backend.urls",
+    ),
+    'ai-engine': (
+        settings.BASE_DIR.parent / 'ai_engine',
+        "import ai_predict",
+    ),
+}
+
+
+def parse_importtime(stderr: str) -> list:
+    """(cumulative µs, depth, module) for each line of -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(cumulative), depth, name.strip()))
+    return imports
+
+
+class Command(BaseCommand):
+    help = "Fail when the backend or AI engine cold start goes over its time budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--targets', default=','.join(TARGETS))
+        parser.add_argument('--top', type=int, default=15, help="slowest imports to list per target")
+
+    def handle(self, *args, **options):
+        failures = []
+        for target in options['targets'].split(','):
+            if target not in TARGETS:
+                raise CommandError(f"Unknown target {target!r}; expected one of: {', '.join(TARGETS)}")
+            cwd, code = TARGETS[target]
+
+            # One untimed start so every run below finds compiled bytecode
+            self.start(cwd, code)
+            runs = []
+            for _ in range(options['runs']):
+                elapsed, result = self.start(cwd, code)
+                if result.returncode != 0:
+                    break
+                runs.append((elapsed, result.stderr))
+            if len(runs) < options['runs']:
+                error = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+                self.stdout.write(self.style.ERROR(f"{target}: failed to start: {error[-1] if error else result.returncode}"))
+                failures.append(f"{target} failed to start")
+                continue
+
+            runs.sort(key=lambda run: run[0])
+            median_ms = statistics.median(elapsed for elapsed, _ in runs) * 1000
+            imports = parse_importtime(runs[len(runs) // 2][1])
+            import_ms = sum(cumulative for cumulative, depth, _ in imports if depth == 0) / 1000
+            over = median_ms > options['budget_ms']
+
+            self.stdout.write(
+                (self.style.ERROR if over else self.style.SUCCESS)(
+                    f"{target}: {median_ms:.0f} ms median over {len(runs)} runs "
+                    f"(imports {import_ms:.0f} ms, budget {options['budget_ms']:.0f} ms)"
+                )
+            )
+            for cumulative, depth, name in sorted(imports, reverse=True)[:options['top']]:
+                self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {'  ' * depth}{name}")
+            if over:
+                failures.append(f"{target} {median_ms:.0f} ms > {options['budget_ms']:.0f} ms")
+
+        if failures:
+            raise CommandError(f"Cold start check failed: {'; '.join(failures)}")
+
+    @staticmethod
+    def start(cwd, code: str):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=cwd, capture_output=True, text=True
+        )
+        return time.perf_counter() - start, result
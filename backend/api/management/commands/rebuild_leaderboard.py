@@ -0,0 +1,81 @@
+"""
+Rebuild the net CO2 offset leaderboards from activities and completed sales.
+
+Scores are updated as activities are logged and sales complete; run this
+once after deploying the leaderboard table (or after any manual data fix)
+to recompute them from the activity log, archived activities included.
+Restart the server processes afterwards so their in-memory rankings are
+reloaded.
+
+Usage: python manage.py rebuild_leaderboard
+"""
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.archive import decompress_data
+from api.leaderboard import apply_score_changes, record_credit_transfers
+from api.models import Activity, ActivityArchive, LeaderboardScore, MarketplaceListing
+from api.views import OFFSET_ACTIVITY_TYPES
+
+BATCH_SIZE = 2000
+
+
+def _batches(iterable):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, BATCH_SIZE)):
+        yield batch
+
+
+def _activity_change(user, activity_type, data, predicted_emission, timestamp):
+    """Score change of a logged activity, as log_activity records it"""
+    data = data if isinstance(data, dict) else {}
+    is_offset = data.get('is_offset', False) or activity_type in OFFSET_ACTIVITY_TYPES
+    grams = round((predicted_emission or 0) * 1000)
+    return user, data.get('company') or None, grams if is_offset else -grams, timestamp
+
+
+class Command(BaseCommand):
+    help = "Recompute the net CO2 offset leaderboards"
+
+    def handle(self, *args, **options):
+        columns = ('user', 'activity_type', 'data', 'predicted_emission', 'timestamp')
+        # Purchases are scored as transfers below
+        logged = Activity.objects.exclude(activity_type='marketplace_purchase').values_list(*columns)
+        archived = ActivityArchive.objects.exclude(activity_type='marketplace_purchase').values_list(
+            'user', 'activity_type', 'data_compressed', 'predicted_emission', 'timestamp'
+        )
+        listing_sales = MarketplaceListing.objects.filter(status='sold').values_list(
+            'buyer', 'seller', 'co2_grams', 'sold_at'
+        )
+        # Order book trades have no listing; their purchase activity names the seller
+        trade_purchases = Activity.objects.filter(
+            activity_type='marketplace_purchase',
+            data__has_key='order_book_trade_id'
+        ).exclude(transaction_hash__startswith='Error').exclude(
+            # Still being confirmed: scored by the tracker once it is
+            pending_transactions__status='pending'
+        ).values_list('user', 'data', 'predicted_emission', 'timestamp')
+
+        with transaction.atomic():
+            LeaderboardScore.objects.all().delete()
+            for batch in _batches(logged.iterator(chunk_size=BATCH_SIZE)):
+                apply_score_changes(_activity_change(*row) for row in batch)
+            for batch in _batches(archived.iterator(chunk_size=BATCH_SIZE)):
+                apply_score_changes(
+                    _activity_change(user, activity_type, decompress_data(blob), emission, timestamp)
+                    for user, activity_type, blob, emission, timestamp in batch
+                )
+            for batch in _batches(listing_sales.iterator(chunk_size=BATCH_SIZE)):
+                record_credit_transfers(batch)
+            for batch in _batches(trade_purchases.iterator(chunk_size=BATCH_SIZE)):
+                record_credit_transfers(
+                    (buyer, data.get('seller'), int(emission * 1000), timestamp)
+                    for buyer, data, emission, timestamp in batch
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {LeaderboardScore.objects.filter(period='all', subject_type='user').count()} user and "
+            f"{LeaderboardScore.objects.filter(period='all', subject_type='company').count()} company scores"
+        ))
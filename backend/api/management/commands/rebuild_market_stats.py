@@ -0,0 +1,43 @@
+"""
+Rebuild the marketplace price aggregates from completed sales.
+
+Sales are folded into MarketPriceBucket as they complete; run this once
+after deploying the analytics tables (or after any manual data fix) to
+recompute the buckets from sold listings and settled order book trades.
+
+Usage: python manage.py rebuild_market_stats
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.analytics import record_sales
+from api.models import Activity, MarketPriceBucket, MarketplaceListing
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly marketplace price aggregates from completed sales"
+
+    def handle(self, *args, **options):
+        listing_sales = MarketplaceListing.objects.filter(status='sold').values_list(
+            'activity_type', 'price_eth', 'co2_grams', 'sold_at'
+        )
+        # Order book trades have no listing; their purchase activity carries the price
+        trade_purchases = Activity.objects.filter(
+            activity_type='marketplace_purchase',
+            data__has_key='order_book_trade_id'
+        ).exclude(transaction_hash__startswith='Error').exclude(
+            # Still being confirmed: scored by the tracker once it is
+            pending_transactions__status='pending'
+        ).values_list('data', 'predicted_emission', 'timestamp')
+
+        with transaction.atomic():
+            MarketPriceBucket.objects.all().delete()
+            record_sales(listing_sales.iterator(chunk_size=2000))
+            record_sales(
+                (data.get('original_activity_type'), data.get('price_paid', 0), int(emission * 1000), timestamp)
+                for data, emission, timestamp in trade_purchases.iterator(chunk_size=2000)
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {MarketPriceBucket.objects.count()} hourly buckets"
+        ))
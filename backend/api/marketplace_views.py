@@ -1,66 +1,316 @@
 # backend/api/marketplace_views.py
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Activity
-from .web3_interact import get_user_credits, transfer_nft, check_nft_approval, get_connection_status
+from .models import Activity, MarketplaceListing
+from .blockchain_utils import (
+    transfer_nft, batch_transfer_nfts, check_nft_approvals,
+    get_connection_status, get_backend_address, parse_wait_for_confirmation
+)
+from .tx_tracker import track_transaction
+from .orderbook import has_open_ask
+from .events import record_event, record_events, get_broadcaster
+from .analytics import ANALYTICS_INTERVALS, compute_market_stats, record_listing_sales
+from .leaderboard import record_listing_transfers
+from .admission import AdmissionRejected, admit_chain_write
+from .renderers import FAST_RENDERERS
+from .pagination import (
+    InvalidCursor, paginate_keyset, parse_page_size, encode_cursor, decode_cursor, keyset_filter
+)
+from .listing_cache import (
+    get_listings_version, query_key, make_etag, etag_matches,
+    get_cached_page, set_cached_page, invalidate_listings
+)
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.db.models import F, Q, Value
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
 import json
-from datetime import datetime
+import math
+import os
+import time
+from datetime import datetime, timedelta
+
+# Seconds a buyer's reservation holds a listing (longer than a transfer receipt wait)
+LISTING_RESERVATION_TTL = int(os.getenv('LISTING_RESERVATION_TTL', '180'))
+# Seconds between checks for expired reservations on the listings endpoint
+RESERVATION_RELEASE_INTERVAL = float(os.getenv('RESERVATION_RELEASE_INTERVAL', '5'))
+# Most listings one checkout may contain (bounded by the batch transfer's gas)
+CHECKOUT_MAX_ITEMS = int(os.getenv('CHECKOUT_MAX_ITEMS', '50'))
+
+# Most tokens one bulk approval check may ask about
+APPROVAL_CHECK_MAX_TOKENS = int(os.getenv('APPROVAL_CHECK_MAX_TOKENS', '500'))
+# Longest range /api/marketplace/analytics/ will aggregate
+ANALYTICS_MAX_DAYS = 366
+
+# Columns needed to render a listing
+LISTING_FIELDS = (
+    'id', 'token_id', 'seller', 'seller_wallet', 'price_eth', 'co2_grams',
+    'price_per_tonne', 'activity_type', 'status', 'created_at', 'transaction_hash',
+)
+
+# ?sort= value -> (column, descending); every column has a (status, column, id) index
+LISTING_SORTS = {
+    'recent': ('created_at', True),
+    'oldest': ('created_at', False),
+    'price': ('price_eth', False),
+    '-price': ('price_eth', True),
+    'co2': ('co2_grams', False),
+    '-co2': ('co2_grams', True),
+    'price_per_tonne': ('price_per_tonne', False),
+    '-price_per_tonne': ('price_per_tonne', True),
+}
+
+# ?param= -> ORM lookup, with the type the value is parsed as
+LISTING_FILTERS = {
+    'activity_type': ('activity_type', str),
+    'min_price': ('price_eth__gte', float),
+    'max_price': ('price_eth__lte', float),
+    'min_co2': ('co2_grams__gte', int),
+    'max_co2': ('co2_grams__lte', int),
+}
+
+
+def serialize_listing(listing: MarketplaceListing) -> dict:
+    """Render a listing in the shape the marketplace frontend expects"""
+    return {
+        'id': str(listing.id),
+        'tokenId': listing.token_id,
+        'seller': listing.seller,
+        'sellerWallet': listing.seller_wallet or '0x0000...0000',
+        'priceEth': listing.price_eth,
+        'co2Amount': listing.co2_grams,
+        'pricePerTonne': listing.price_per_tonne,
+        'activityType': listing.activity_type,
+        'createdAt': listing.created_at.strftime('%Y-%m-%d'),
+        'isActive': listing.status == 'listed',
+        'transactionHash': listing.transaction_hash,
+    }
+
+
+def filter_listings(queryset, params):
+    """
+    Apply the LISTING_FILTERS and seller query parameters to a listings queryset
+
+    Raises:
+        ValueError: if a numeric filter is not a number
+    """
+    for param, (lookup, cast) in LISTING_FILTERS.items():
+        value = params.get(param)
+        if value in (None, ''):
+            continue
+        try:
+            queryset = queryset.filter(**{lookup: cast(value)})
+        except ValueError:
+            raise ValueError(f"Invalid value for {param}: {value!r}")
+
+    seller = params.get('seller')
+    if seller:
+        if seller.startswith('0x'):
+            queryset = queryset.filter(seller_wallet=seller)
+        else:
+            queryset = queryset.filter(seller=seller)
+    return queryset
+
+
+def rate_limited_response(rejected: AdmissionRejected) -> Response:
+    """429 for a transfer that was not admitted, with a Retry-After hint"""
+    retry_after = math.ceil(rejected.retry_after)
+    response = Response({
+        'success': False,
+        'error': str(rejected),
+        'retryAfter': retry_after
+    }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def reserve_listing(listing_id, buyer_wallet: str) -> bool:
+    """
+    Atomically reserve a listing for one buyer
+
+    Moves the listing from 'listed' to 'pending' in a single conditional
+    UPDATE. A reservation whose holder never submitted a transfer can be
+    taken over once it has expired.
+
+    Returns:
+        True if this buyer now holds the reservation
+    """
+    now = timezone.now()
+    reserved = MarketplaceListing.objects.filter(
+        Q(status='listed') | Q(status='pending', reserved_until__lt=now, purchase_transaction_hash__isnull=True),
+        pk=listing_id,
+    ).update(
+        status='pending',
+        reserved_by=buyer_wallet,
+        reserved_until=now + timedelta(seconds=LISTING_RESERVATION_TTL),
+    )
+    return reserved == 1
+
+
+def release_reservation(listing_id, buyer_wallet: str):
+    """Put a reserved listing back on the market after its transfer failed"""
+    released = MarketplaceListing.objects.filter(
+        pk=listing_id,
+        status='pending',
+        reserved_by=buyer_wallet,
+        purchase_transaction_hash__isnull=True,
+    ).update(status='listed', reserved_by=None, reserved_until=None)
+    if released:
+        invalidate_listings()
+
+
+def reserve_listings(listing_ids: list, buyer_wallet: str):
+    """
+    Reserve several listings for one buyer, all or nothing
+
+    Returns:
+        the reservation expiry if every listing was reserved, else None
+        (any listings reserved by this call are released again)
+    """
+    now = timezone.now()
+    reserved_until = now + timedelta(seconds=LISTING_RESERVATION_TTL)
+    reserved = MarketplaceListing.objects.filter(
+        Q(status='listed') | Q(status='pending', reserved_until__lt=now, purchase_transaction_hash__isnull=True),
+        pk__in=listing_ids,
+    ).update(status='pending', reserved_by=buyer_wallet, reserved_until=reserved_until)
+
+    if reserved != len(listing_ids):
+        release_reservations(listing_ids, buyer_wallet, reserved_until)
+        return None
+    return reserved_until
+
+
+def release_reservations(listing_ids: list, buyer_wallet: str, reserved_until):
+    """Release the listings one reserve_listings() call reserved"""
+    released = MarketplaceListing.objects.filter(
+        pk__in=listing_ids,
+        status='pending',
+        reserved_by=buyer_wallet,
+        reserved_until=reserved_until,
+        purchase_transaction_hash__isnull=True,
+    ).update(status='listed', reserved_by=None, reserved_until=None)
+    if released:
+        invalidate_listings()
+
+
+def release_expired_reservations() -> int:
+    """Relist listings whose reservation expired before a transfer was submitted"""
+    released = MarketplaceListing.objects.filter(
+        status='pending',
+        reserved_until__lt=timezone.now(),
+        purchase_transaction_hash__isnull=True,
+    ).update(status='listed', reserved_by=None, reserved_until=None)
+    if released:
+        invalidate_listings()
+    return released
+
+
+_reservations_checked_at = 0.0
+
+
+def release_expired_reservations_if_due() -> int:
+    """release_expired_reservations at most once per RESERVATION_RELEASE_INTERVAL in this process"""
+    global _reservations_checked_at
+    now = time.monotonic()
+    if now - _reservations_checked_at < RESERVATION_RELEASE_INTERVAL:
+        return 0
+    _reservations_checked_at = now
+    return release_expired_reservations()
+
+
+def get_activity_wallet(activity: Activity) -> str:
+    """Wallet of an activity, falling back to the user_wallet in its request payload"""
+    user_wallet = activity.user_wallet
+    if not user_wallet and activity.data:
+        try:
+            if isinstance(activity.data, str):
+                data = json.loads(activity.data)
+            else:
+                data = activity.data
+            user_wallet = data.get('user_wallet', '')
+        except:
+            user_wallet = ''
+    return user_wallet or ''
 
 
 @api_view(['GET'])
+@renderer_classes(FAST_RENDERERS)
 def get_marketplace_listings(request):
     """
-    Get all active marketplace listings.
+    Get active marketplace listings, filtered, sorted and paginated.
 
-    For now, we'll generate listings from activities that have NFTs.
-    In a full implementation, you'd have a separate MarketplaceListing table.
+    URL: GET /api/marketplace/listings/?activity_type=car&min_price=0.01&sort=price&limit=50&cursor=...
+
+    Query parameters (all optional):
+        activity_type: exact activity type
+        min_price, max_price: price range in ETH
+        min_co2, max_co2: CO2 range in grams
+        seller: seller wallet (0x...) or username
+        sort: one of LISTING_SORTS, defaults to 'recent'
+        limit: page size, defaults to 50, at most 200
+        cursor: nextCursor from the previous page
+
+    Pages are cached per listings version; send the returned ETag back as
+    If-None-Match to get a 304 while the market is unchanged.
     """
     try:
-        # Get all activities that are listed for sale in the marketplace
-        activities_with_nfts = Activity.objects.filter(
-            token_id__isnull=False,
-            transaction_hash__isnull=False,
-            marketplace_status='listed'  # Only show listed items
-        ).exclude(
-            transaction_hash__startswith='Error'
-        ).exclude(
-            transaction_hash__startswith='Emission'
-        ).order_by('-timestamp')
-
-        listings = []
-        for activity in activities_with_nfts:
-            # Parse user_wallet from data if available
-            user_wallet = activity.user_wallet
-            if not user_wallet and activity.data:
-                try:
-                    if isinstance(activity.data, str):
-                        data = json.loads(activity.data)
-                    else:
-                        data = activity.data
-                    user_wallet = data.get('user_wallet', '')
-                except:
-                    user_wallet = ''
-
-            listing = {
-                'id': str(activity.id),
-                'tokenId': activity.token_id,
-                'seller': activity.user,
-                'sellerWallet': user_wallet or '0x0000...0000',
-                'priceEth': activity.listing_price or 0.01,  # Use stored price or default
-                'co2Amount': int(activity.predicted_emission * 1000),  # Convert to grams
-                'activityType': activity.activity_type,
-                'createdAt': activity.timestamp.strftime('%Y-%m-%d'),
-                'isActive': activity.marketplace_status == 'listed',
-                'transactionHash': activity.transaction_hash,
-            }
-            listings.append(listing)
+        params = request.query_params
+        # Before the version is read, so a relisted reservation changes the ETag and the cached pages
+        release_expired_reservations_if_due()
+        version = get_listings_version()
+        query_digest = query_key(params)
+        etag = make_etag(version, query_digest)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
 
-        return Response({
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        payload = get_cached_page(version, query_digest)
+        if payload is not None:
+            return Response(payload, status=status.HTTP_200_OK, headers=headers)
+
+        sort = params.get('sort', 'recent')
+        if sort not in LISTING_SORTS:
+            return Response({
+                'success': False,
+                'error': f"Invalid sort '{sort}', expected one of: {', '.join(LISTING_SORTS)}",
+                'listings': []
+            }, status=status.HTTP_400_BAD_REQUEST)
+        sort_field, descending = LISTING_SORTS[sort]
+
+        try:
+            limit = parse_page_size(params.get('limit'))
+            active_listings = filter_listings(
+                MarketplaceListing.objects.filter(status='listed'), params
+            )
+            if sort_field == 'price_per_tonne':
+                active_listings = active_listings.filter(price_per_tonne__isnull=False)
+            page, next_cursor = paginate_keyset(
+                active_listings.only(*LISTING_FIELDS),
+                sort_field, descending, limit, params.get('cursor')
+            )
+        except (ValueError, InvalidCursor) as e:
+            return Response({
+                'success': False,
+                'error': str(e),
+                'listings': []
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        listings = [serialize_listing(listing) for listing in page]
+        payload = {
             'success': True,
             'listings': listings,
-            'count': len(listings)
-        }, status=status.HTTP_200_OK)
+            'count': len(listings),
+            'nextCursor': next_cursor,
+            'hasMore': next_cursor is not None
+        }
+        set_cached_page(version, query_digest, payload)
+
+        return Response(payload, status=status.HTTP_200_OK, headers=headers)
 
     except Exception as e:
         print(f"Error fetching marketplace listings: {e}")
@@ -71,36 +321,40 @@ def get_marketplace_listings(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
-def get_user_nft_credits(request, wallet_address):
+@require_GET
+def stream_marketplace_events(request):
     """
-    Get all NFT credits owned by a user's wallet address.
-    This fetches directly from the blockchain.
+    Stream marketplace changes as Server-Sent Events.
+
+    URL: GET /api/marketplace/events/
+
+    Events: listing_created, listing_sold and price_changed, each carrying
+    the listing in the same shape as /api/marketplace/listings/. Reconnecting
+    clients send Last-Event-ID (browsers do this automatically; ?lastEventId=
+    also works) to receive what they missed. A 'reset' event means too much
+    was missed and the listings should be reloaded.
+
+    A plain Django view: DRF content negotiation would answer an
+    EventSource's "Accept: text/event-stream" with 406.
     """
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('lastEventId')
     try:
-        result = get_user_credits(wallet_address)
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
 
-        if result.get('success'):
-            credits = result.get('credits', [])
-            return Response({
-                'success': True,
-                'credits': credits,
-                'count': len(credits)
-            }, status=status.HTTP_200_OK)
-        else:
-            return Response({
-                'success': False,
-                'error': result.get('error', 'Failed to fetch credits'),
-                'credits': []
-            }, status=status.HTTP_400_BAD_REQUEST)
+    broadcaster = get_broadcaster()
+    if isinstance(request, ASGIRequest):
+        # Served from the event loop; a sync generator would be read to the end before sending
+        events = broadcaster.astream(last_event_id)
+    else:
+        events = broadcaster.stream(last_event_id)
 
-    except Exception as e:
-        print(f"Error fetching user NFT credits: {e}")
-        return Response({
-            'success': False,
-            'error': str(e),
-            'credits': []
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @api_view(['POST'])
@@ -129,29 +383,72 @@ def create_listing(request):
                 'error': 'Missing required fields'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Find the activity with this token_id owned by the seller
-        try:
-            activity = Activity.objects.get(
-                token_id=token_id,
-                user_wallet=seller_wallet
-            )
+        # Find the latest activity with this token_id owned by the seller
+        activity = Activity.objects.filter(
+            token_id=token_id,
+            user_wallet=seller_wallet
+        ).order_by('-timestamp').first()
 
-            # Mark as listed and store the price
-            activity.marketplace_status = 'listed'
-            activity.listing_price = float(price_eth)
-            activity.save()
+        if activity is None:
+            return Response({
+                'success': False,
+                'error': 'NFT not found or you don\'t own it'
+            }, status=status.HTTP_404_NOT_FOUND)
 
+        if not activity.transaction_hash or activity.transaction_hash.startswith(('Error', 'Emission')):
             return Response({
-                'success': True,
-                'message': 'Listing created successfully',
-                'listingId': str(activity.id)
-            }, status=status.HTTP_201_CREATED)
+                'success': False,
+                'error': 'Invalid listing - no NFT token found'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        except Activity.DoesNotExist:
+        if has_open_ask(int(token_id)):
             return Response({
                 'success': False,
-                'error': 'NFT not found or you don\'t own it'
-            }, status=status.HTTP_404_NOT_FOUND)
+                'error': 'This NFT has an open ask on the order book'
+            }, status=status.HTTP_409_CONFLICT)
+
+        with transaction.atomic():
+            # Relisting an already listed token just updates its price
+            listing = MarketplaceListing.objects.filter(
+                token_id=token_id,
+                status__in=['listed', 'pending']
+            ).first()
+
+            if listing and listing.status == 'pending':
+                return Response({
+                    'success': False,
+                    'error': 'A sale of this NFT is already in progress'
+                }, status=status.HTTP_409_CONFLICT)
+
+            if listing:
+                listing.price_eth = float(price_eth)
+                listing.save(update_fields=['price_eth', 'updated_at'])
+                event_type = 'price_changed'
+            else:
+                listing = MarketplaceListing.objects.create(
+                    activity=activity,
+                    token_id=activity.token_id,
+                    seller=seller,
+                    seller_wallet=seller_wallet,
+                    price_eth=float(price_eth),
+                    co2_grams=int(activity.predicted_emission * 1000),
+                    activity_type=activity.activity_type,
+                    transaction_hash=activity.transaction_hash,
+                )
+                event_type = 'listing_created'
+            record_event(event_type, listing, serialize_listing(listing))
+
+            # Keep the activity log's marketplace columns in step
+            activity.marketplace_status = 'listed'
+            activity.listing_price = float(price_eth)
+            activity.save(update_fields=['marketplace_status', 'listing_price'])
+            invalidate_listings()
+
+        return Response({
+            'success': True,
+            'message': 'Listing created successfully',
+            'listingId': str(listing.id)
+        }, status=status.HTTP_201_CREATED)
 
     except Exception as e:
         print(f"Error creating listing: {e}")
@@ -169,13 +466,24 @@ def buy_listing(request, listing_id):
     Request body:
     {
         "buyerWallet": "0x...",
-        "buyer": "username"
+        "buyer": "username",
+        "waitForConfirmation": true/false (optional, defaults to not ASYNC_TX_SUBMISSION)
     }
+
+    The listing is reserved (listed -> pending) in one conditional UPDATE
+    before queueing for the signer, so only one concurrent buyer proceeds;
+    the others get 409 without waiting. A failed transfer releases the reservation, and a reservation
+    whose holder died expires after LISTING_RESERVATION_TTL seconds.
+
+    Without waiting, the listing stays 'pending' and the response (202)
+    carries the transfer hash; the background tracker marks it sold, or
+    relists it if the transfer fails.
     """
     try:
         data = request.data
         buyer_wallet = data.get('buyerWallet')
         buyer = data.get('buyer')
+        wait_for_confirmation = parse_wait_for_confirmation(data.get('waitForConfirmation'))
 
         if not all([buyer_wallet, buyer]):
             return Response({
@@ -183,78 +491,121 @@ def buy_listing(request, listing_id):
                 'error': 'Missing required fields'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get the listing (Activity with NFT)
         try:
-            listing = Activity.objects.get(id=listing_id)
-        except Activity.DoesNotExist:
+            listing = MarketplaceListing.objects.select_related('activity').get(id=listing_id)
+        except (MarketplaceListing.DoesNotExist, ValueError):
             return Response({
                 'success': False,
                 'error': 'Listing not found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Verify the listing has an NFT token
-        if not listing.token_id or not listing.transaction_hash:
+        seller_wallet = listing.seller_wallet or get_activity_wallet(listing.activity)
+        if not seller_wallet:
             return Response({
                 'success': False,
-                'error': 'Invalid listing - no NFT token found'
+                'error': 'Seller wallet not found'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get seller wallet from activity data
-        seller_wallet = listing.user_wallet
-        if not seller_wallet and listing.data:
-            try:
-                if isinstance(listing.data, str):
-                    data_obj = json.loads(listing.data)
-                else:
-                    data_obj = listing.data
-                seller_wallet = data_obj.get('user_wallet', '')
-            except:
-                seller_wallet = ''
-
-        if not seller_wallet:
+        # Claim the listing before queueing for the signer, so a buyer who
+        # already lost gets 409 at once; concurrent buyers lose here
+        if not reserve_listing(listing.id, buyer_wallet):
             return Response({
                 'success': False,
-                'error': 'Seller wallet not found'
-            }, status=status.HTTP_400_BAD_REQUEST)
+                'error': 'Listing is no longer available'
+            }, status=status.HTTP_409_CONFLICT)
+        invalidate_listings()
+
+        # Wait for this buyer's turn at the signer (the reservation outlasts the wait)
+        try:
+            admit_chain_write('transfer', wallet=buyer_wallet, user=buyer)
+        except AdmissionRejected as e:
+            release_reservation(listing.id, buyer_wallet)
+            return rate_limited_response(e)
+
+        # The reservation freezes the listing; re-read what may have changed before it
+        listing = MarketplaceListing.objects.select_related('activity').get(id=listing.id)
 
         # Perform blockchain NFT transfer
         print(f"Processing marketplace purchase: NFT #{listing.token_id} from {seller_wallet} to {buyer_wallet}")
-        transfer_result = transfer_nft(
-            from_address=seller_wallet,
-            to_address=buyer_wallet,
-            token_id=listing.token_id
-        )
+        try:
+            transfer_result = transfer_nft(
+                from_address=seller_wallet,
+                to_address=buyer_wallet,
+                token_id=listing.token_id,
+                wait_for_receipt=wait_for_confirmation
+            )
+        except Exception:
+            release_reservation(listing.id, buyer_wallet)
+            raise
 
         if not transfer_result.get('success'):
+            release_reservation(listing.id, buyer_wallet)
             return Response({
                 'success': False,
                 'error': f"Blockchain transfer failed: {transfer_result.get('error')}"
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Mark the original listing as sold
-        listing.marketplace_status = 'sold'
-        listing.save()
-
-        # Create a new activity record for the purchase
-        purchase_activity = Activity.objects.create(
-            user=buyer,
-            activity_type='marketplace_purchase',
-            data={
-                'listing_id': listing_id,
-                'seller': listing.user,
-                'seller_wallet': seller_wallet,
-                'buyer_wallet': buyer_wallet,
-                'token_id': listing.token_id,
-                'co2_amount': listing.predicted_emission,
-                'original_activity_type': listing.activity_type,
-                'price_paid': listing.listing_price,
-            },
-            predicted_emission=listing.predicted_emission,
-            user_wallet=buyer_wallet,
-            token_id=listing.token_id,
-            transaction_hash=transfer_result.get('transaction_hash'),
-            marketplace_status='not_listed'  # Purchased items are not listed
-        )
+        is_pending = transfer_result.get('pending', False)
+        # Sold now, or pending until the tracker sees the transfer confirm
+        new_status = 'pending' if is_pending else 'sold'
+
+        with transaction.atomic():
+            # Create a new activity record for the purchase
+            purchase_activity = Activity.objects.create(
+                user=buyer,
+                activity_type='marketplace_purchase',
+                data={
+                    'listing_id': str(listing.id),
+                    'seller': listing.seller,
+                    'seller_wallet': seller_wallet,
+                    'buyer_wallet': buyer_wallet,
+                    'token_id': listing.token_id,
+                    'co2_amount': listing.activity.predicted_emission,
+                    'original_activity_type': listing.activity_type,
+                    'price_paid': listing.price_eth,
+                },
+                predicted_emission=listing.activity.predicted_emission,
+                user_wallet=buyer_wallet,
+                token_id=listing.token_id,
+                transaction_hash=transfer_result.get('transaction_hash'),
+                marketplace_status='not_listed'  # Purchased items are not listed
+            )
+
+            listing.status = new_status
+            listing.reserved_by = None
+            listing.reserved_until = None
+            listing.buyer = buyer
+            listing.buyer_wallet = buyer_wallet
+            listing.purchase_activity = purchase_activity
+            listing.purchase_transaction_hash = transfer_result.get('transaction_hash')
+            listing.sold_at = None if is_pending else timezone.now()
+            listing.save(update_fields=[
+                'status', 'reserved_by', 'reserved_until', 'buyer', 'buyer_wallet',
+                'purchase_activity', 'purchase_transaction_hash', 'sold_at', 'updated_at'
+            ])
+            record_event('listing_sold', listing, serialize_listing(listing))
+            if not is_pending:
+                record_listing_sales([listing])
+                record_listing_transfers([listing])
+
+            Activity.objects.filter(pk=listing.activity_id).update(marketplace_status=new_status)
+            invalidate_listings()
+
+        if is_pending:
+            track_transaction(
+                transfer_result.get('transaction_hash'),
+                'transfer',
+                activity=purchase_activity,
+                listing=listing,
+                nonce=transfer_result.get('nonce')
+            )
+            return Response({
+                'success': True,
+                'pending': True,
+                'message': 'Purchase submitted, awaiting blockchain confirmation',
+                'transactionHash': transfer_result.get('transaction_hash'),
+                'tokenId': listing.token_id
+            }, status=status.HTTP_202_ACCEPTED)
 
         return Response({
             'success': True,
@@ -272,36 +623,226 @@ def buy_listing(request, listing_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
-def check_approval_status(request, token_id, owner_address):
+@api_view(['POST'])
+def checkout(request):
+    """
+    Buy several marketplace listings with one batched NFT transfer.
+
+    Request body:
+    {
+        "listingIds": ["1", "2", "3"],
+        "buyerWallet": "0x...",
+        "buyer": "username",
+        "waitForConfirmation": true/false (optional, defaults to not ASYNC_TX_SUBMISSION)
+    }
+
+    All listings are reserved in one UPDATE, ownership and approvals for all
+    tokens are checked in one batched chain read, and the tokens move in a
+    single batchTransferFrom transaction. If any listing is unavailable (409)
+    or any check or the transfer fails (400), every reservation is released.
+    """
+    try:
+        data = request.data
+        buyer_wallet = data.get('buyerWallet')
+        buyer = data.get('buyer')
+        wait_for_confirmation = parse_wait_for_confirmation(data.get('waitForConfirmation'))
+
+        try:
+            listing_ids = list(dict.fromkeys(int(listing_id) for listing_id in data.get('listingIds') or []))
+        except (TypeError, ValueError):
+            listing_ids = []
+
+        if not all([buyer_wallet, buyer, listing_ids]):
+            return Response({
+                'success': False,
+                'error': 'Missing required fields'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(listing_ids) > CHECKOUT_MAX_ITEMS:
+            return Response({
+                'success': False,
+                'error': f'A checkout can contain at most {CHECKOUT_MAX_ITEMS} listings'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Reserve before queueing for the signer, as buy_listing does
+        reserved_until = reserve_listings(listing_ids, buyer_wallet)
+        if reserved_until is None:
+            available = set(MarketplaceListing.objects.filter(
+                pk__in=listing_ids, status='listed'
+            ).values_list('id', flat=True))
+            return Response({
+                'success': False,
+                'error': 'Some listings are no longer available',
+                'unavailableListingIds': [str(i) for i in listing_ids if i not in available]
+            }, status=status.HTTP_409_CONFLICT)
+        invalidate_listings()
+
+        # One batched transfer: one write for admission
+        try:
+            admit_chain_write('transfer', wallet=buyer_wallet, user=buyer)
+        except AdmissionRejected as e:
+            release_reservations(listing_ids, buyer_wallet, reserved_until)
+            return rate_limited_response(e)
+
+        try:
+            listings = sorted(
+                MarketplaceListing.objects.select_related('activity').filter(pk__in=listing_ids),
+                key=lambda listing: listing_ids.index(listing.id)
+            )
+            transfers = [
+                (listing.seller_wallet or get_activity_wallet(listing.activity), listing.token_id)
+                for listing in listings
+            ]
+            print(f"Processing checkout of {len(listings)} NFTs to {buyer_wallet}")
+            transfer_result = batch_transfer_nfts(transfers, buyer_wallet, wait_for_receipt=wait_for_confirmation)
+        except Exception:
+            release_reservations(listing_ids, buyer_wallet, reserved_until)
+            raise
+
+        if not transfer_result.get('success'):
+            release_reservations(listing_ids, buyer_wallet, reserved_until)
+            failed_tokens = set(transfer_result.get('failed_tokens', []))
+            return Response({
+                'success': False,
+                'error': f"Blockchain transfer failed: {transfer_result.get('error')}",
+                'failedListingIds': [str(l.id) for l in listings if l.token_id in failed_tokens]
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        tx_hash = transfer_result.get('transaction_hash')
+        is_pending = transfer_result.get('pending', False)
+        new_status = 'pending' if is_pending else 'sold'
+        sold_at = None if is_pending else timezone.now()
+
+        with transaction.atomic():
+            purchases = Activity.objects.bulk_create([
+                Activity(
+                    user=buyer,
+                    activity_type='marketplace_purchase',
+                    data={
+                        'listing_id': str(listing.id),
+                        'seller': listing.seller,
+                        'seller_wallet': seller_wallet,
+                        'buyer_wallet': buyer_wallet,
+                        'token_id': listing.token_id,
+                        'co2_amount': listing.activity.predicted_emission,
+                        'original_activity_type': listing.activity_type,
+                        'price_paid': listing.price_eth,
+                    },
+                    predicted_emission=listing.activity.predicted_emission,
+                    user_wallet=buyer_wallet,
+                    token_id=listing.token_id,
+                    transaction_hash=tx_hash,
+                    marketplace_status='not_listed'
+                )
+                for listing, (seller_wallet, _) in zip(listings, transfers)
+            ])
+
+            for listing, purchase in zip(listings, purchases):
+                listing.status = new_status
+                listing.reserved_by = None
+                listing.reserved_until = None
+                listing.buyer = buyer
+                listing.buyer_wallet = buyer_wallet
+                listing.purchase_activity = purchase
+                listing.purchase_transaction_hash = tx_hash
+                listing.sold_at = sold_at
+                listing.updated_at = timezone.now()
+            MarketplaceListing.objects.bulk_update(listings, [
+                'status', 'reserved_by', 'reserved_until', 'buyer', 'buyer_wallet',
+                'purchase_activity', 'purchase_transaction_hash', 'sold_at', 'updated_at'
+            ])
+
+            Activity.objects.filter(pk__in=[l.activity_id for l in listings]).update(marketplace_status=new_status)
+            record_events([('listing_sold', listing, serialize_listing(listing)) for listing in listings])
+            if not is_pending:
+                record_listing_sales(listings)
+                record_listing_transfers(listings)
+            invalidate_listings()
+
+        if is_pending:
+            track_transaction(tx_hash, 'batch_transfer', nonce=transfer_result.get('nonce'))
+            return Response({
+                'success': True,
+                'pending': True,
+                'message': 'Checkout submitted, awaiting blockchain confirmation',
+                'transactionHash': tx_hash,
+                'tokenIds': [l.token_id for l in listings]
+            }, status=status.HTTP_202_ACCEPTED)
+
+        return Response({
+            'success': True,
+            'message': f'Purchased {len(listings)} credits in one transaction',
+            'transactionHash': tx_hash,
+            'blockNumber': transfer_result.get('block_number'),
+            'gasUsed': transfer_result.get('gas_used'),
+            'tokenIds': [l.token_id for l in listings]
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        print(f"Error processing checkout: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+def check_approval_status_bulk(request):
     """
-    Check if the backend contract is approved to transfer a specific NFT
+    Check which of an owner's NFTs the backend wallet may transfer, in one request
+
+    URL: POST /api/marketplace/check-approvals/
+    Body: {"ownerAddress": "0x...", "tokenIds": [1, 2, 3], "refresh": false}
 
-    URL: GET /api/marketplace/check-approval/<token_id>/<owner_address>/
+    Costs one isApprovedForAll read plus, unless the owner approved the
+    backend for all tokens, one batched getApproved request for the tokens
+    not already cached. Pass refresh=true right after approving.
     """
     try:
-        approval_result = check_nft_approval(owner_address, int(token_id))
+        owner_address = request.data.get('ownerAddress')
+        token_ids = request.data.get('tokenIds')
+        if not owner_address or not isinstance(token_ids, list) or not token_ids:
+            return Response({
+                'success': False,
+                'error': 'Missing required fields: ownerAddress, tokenIds'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            token_ids = list(dict.fromkeys(int(token_id) for token_id in token_ids))
+        except (TypeError, ValueError):
+            return Response({
+                'success': False,
+                'error': 'tokenIds must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(token_ids) > APPROVAL_CHECK_MAX_TOKENS:
+            return Response({
+                'success': False,
+                'error': f'At most {APPROVAL_CHECK_MAX_TOKENS} tokens per request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fresh = str(request.data.get('refresh', '')).lower() in ('1', 'true', 'yes')
+        approval_result = check_nft_approvals(owner_address, token_ids, fresh=fresh)
 
         if approval_result.get('success'):
             return Response({
                 'success': True,
-                'approved': approval_result.get('approved'),
                 'backend_address': approval_result.get('backend_address'),
-                'is_approved_for_all': approval_result.get('is_approved_for_all')
+                'is_approved_for_all': approval_result.get('is_approved_for_all'),
+                'approvals': {
+                    str(token_id): approval['approved']
+                    for token_id, approval in approval_result['approvals'].items()
+                }
             }, status=status.HTTP_200_OK)
         else:
             return Response({
                 'success': False,
-                'error': approval_result.get('error'),
-                'approved': False
+                'error': approval_result.get('error')
             }, status=status.HTTP_400_BAD_REQUEST)
 
     except Exception as e:
-        print(f"Error checking approval: {e}")
+        print(f"Error checking approvals: {e}")
         return Response({
             'success': False,
-            'error': str(e),
-            'approved': False
+            'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -315,16 +856,9 @@ def get_marketplace_contract_address(request):
     try:
         connection_status = get_connection_status()
 
-        # Get the backend wallet address from the private key
-        import os
-        from web3 import Web3
-        private_key = os.getenv('PRIVATE_KEY', '')
-        if private_key:
-            private_key = private_key if private_key.startswith('0x') else f'0x{private_key}'
-            w3 = Web3()
-            account = w3.eth.account.from_key(private_key)
-            backend_address = account.address
-        else:
+        try:
+            backend_address = get_backend_address()
+        except Exception:
             backend_address = None
 
         return Response({
@@ -343,68 +877,91 @@ def get_marketplace_contract_address(request):
 
 
 @api_view(['GET'])
+@renderer_classes(FAST_RENDERERS)
 def get_marketplace_history(request, wallet_address):
     """
     Get marketplace transaction history for a wallet (both purchases and sales)
 
-    URL: GET /api/marketplace/history/<wallet_address>/
+    URL: GET /api/marketplace/history/<wallet_address>/?limit=50&cursor=...
+
+    Sales and purchases are read as one UNION query ordered by sale time,
+    newest first, and paginated with a (sold_at, activity id) cursor.
     """
     try:
-        # Get items sold by this wallet
-        sold_items = Activity.objects.filter(
-            user_wallet=wallet_address,
-            marketplace_status='sold',
-            token_id__isnull=False
-        ).order_by('-timestamp')
-
-        # Get items purchased by this wallet
-        purchased_items = Activity.objects.filter(
-            user_wallet=wallet_address,
-            activity_type='marketplace_purchase',
-            token_id__isnull=False
-        ).order_by('-timestamp')
+        try:
+            limit = parse_page_size(request.query_params.get('limit'))
+            cursor = request.query_params.get('cursor')
+            after = decode_cursor(cursor) if cursor else None
+        except (ValueError, InvalidCursor) as e:
+            return Response({
+                'success': False,
+                'error': str(e),
+                'history': []
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        history = []
+        # Both sides select the same columns: history_id is the seller's listed
+        # activity for a sale and the buyer's purchase activity for a purchase
+        sales = MarketplaceListing.objects.filter(
+            seller_wallet=wallet_address,
+            status='sold'
+        ).annotate(
+            entry_type=Value('sale'),
+            history_id=F('activity_id'),
+            tx_hash=F('transaction_hash'),
+        )
+        purchases = MarketplaceListing.objects.filter(
+            buyer_wallet=wallet_address,
+            status='sold',
+            purchase_activity__isnull=False
+        ).annotate(
+            entry_type=Value('purchase'),
+            history_id=F('purchase_activity_id'),
+            tx_hash=F('purchase_transaction_hash'),
+        )
+
+        if after:
+            sold_at, history_id = after
+            sales = sales.filter(keyset_filter('sold_at', True, sold_at, history_id, 'activity_id'))
+            purchases = purchases.filter(keyset_filter('sold_at', True, sold_at, history_id, 'purchase_activity_id'))
 
-        # Add sold items to history
-        for item in sold_items:
-            history.append({
-                'id': str(item.id),
-                'type': 'sale',
-                'tokenId': item.token_id,
-                'activityType': item.activity_type,
-                'co2Amount': int(item.predicted_emission * 1000),
-                'priceEth': item.listing_price or 0.01,
-                'timestamp': item.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'transactionHash': item.transaction_hash,
-                'status': 'sold'
-            })
-
-        # Add purchased items to history
-        for item in purchased_items:
-            seller_info = item.data.get('seller', 'Unknown') if isinstance(item.data, dict) else 'Unknown'
-            price_paid = item.data.get('price_paid', 0.01) if isinstance(item.data, dict) else 0.01
-
-            history.append({
-                'id': str(item.id),
-                'type': 'purchase',
-                'tokenId': item.token_id,
-                'activityType': item.data.get('original_activity_type', 'unknown') if isinstance(item.data, dict) else 'unknown',
-                'co2Amount': int(item.predicted_emission * 1000),
-                'priceEth': price_paid,
-                'timestamp': item.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'transactionHash': item.transaction_hash,
-                'seller': seller_info,
-                'status': 'purchased'
-            })
-
-        # Sort by timestamp descending
-        history.sort(key=lambda x: x['timestamp'], reverse=True)
+        columns = (
+            'token_id', 'activity_type', 'co2_grams', 'price_eth', 'seller', 'sold_at',
+            'entry_type', 'history_id', 'tx_hash',
+        )
+        rows = list(
+            sales.order_by().values(*columns)
+            .union(purchases.order_by().values(*columns), all=True)
+            .order_by('-sold_at', '-history_id')[:limit + 1]
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['sold_at'], rows[-1]['history_id'])
+
+        history = []
+        for row in rows:
+            entry = {
+                'id': str(row['history_id']),
+                'type': row['entry_type'],
+                'tokenId': row['token_id'],
+                'activityType': row['activity_type'],
+                'co2Amount': row['co2_grams'],
+                'priceEth': row['price_eth'],
+                'timestamp': row['sold_at'].strftime('%Y-%m-%d %H:%M:%S'),
+                'transactionHash': row['tx_hash'],
+                'status': 'sold' if row['entry_type'] == 'sale' else 'purchased'
+            }
+            if row['entry_type'] == 'purchase':
+                entry['seller'] = row['seller']
+            history.append(entry)
 
         return Response({
             'success': True,
             'history': history,
-            'count': len(history)
+            'count': len(history),
+            'nextCursor': next_cursor,
+            'hasMore': next_cursor is not None
         }, status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -414,3 +971,63 @@ def get_marketplace_history(request, wallet_address):
             'error': str(e),
             'history': []
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def parse_time_param(value: str, name: str):
+    """Parse an ISO date or datetime query parameter into an aware datetime"""
+    parsed = parse_datetime(value) or parse_datetime(f"{value}T00:00:00")
+    if parsed is None:
+        raise ValueError(f"{name} must be an ISO date or datetime")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@api_view(['GET'])
+def get_marketplace_analytics(request):
+    """
+    Price discovery for marketplace credits
+
+    URL: GET /api/marketplace/analytics/?activity_type=car&interval=day&start=2026-01-01&end=2026-02-01
+
+    Returns, per activity type and interval (hour, day or week), the trade
+    count, ETH and CO2 volume, VWAP per tonne, min/max and percentiles of
+    price per tonne, plus a summary per activity type over the whole range.
+    Defaults to the last 7 days by day. Built from hourly aggregates that
+    are updated as each sale completes.
+    """
+    try:
+        interval = request.query_params.get('interval', 'day')
+        if interval not in ANALYTICS_INTERVALS:
+            raise ValueError(f"interval must be one of: {', '.join(ANALYTICS_INTERVALS)}")
+        end = request.query_params.get('end')
+        end = parse_time_param(end, 'end') if end else timezone.now()
+        start = request.query_params.get('start')
+        start = parse_time_param(start, 'start') if start else end - timedelta(days=7)
+        if start >= end:
+            raise ValueError("start must be before end")
+        if end - start > timedelta(days=ANALYTICS_MAX_DAYS):
+            raise ValueError(f"Range is limited to {ANALYTICS_MAX_DAYS} days")
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        stats = compute_market_stats(start, end, interval, request.query_params.get('activity_type'))
+        return Response({
+            'success': True,
+            'interval': interval,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'series': stats['series'],
+            'summary': stats['summary']
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        print(f"Error computing marketplace analytics: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 02:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_activity_listing_price_activity_marketplace_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activity',
+            name='marketplace_status',
+            field=models.CharField(choices=[('not_listed', 'Not Listed'), ('listed', 'Listed for Sale'), ('pending', 'Sale Pending'), ('sold', 'Sold')], default='not_listed', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PendingTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tx_hash', models.CharField(max_length=66, unique=True)),
+                ('kind', models.CharField(choices=[('mint', 'Mint'), ('transfer', 'Transfer')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('nonce', models.IntegerField(blank=True, null=True)),
+                ('block_number', models.IntegerField(blank=True, null=True)),
+                ('gas_used', models.IntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
+                ('activity', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pending_transactions', to='api.activity')),
+                ('listing', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pending_sales', to='api.activity')),
+            ],
+            options={
+                'ordering': ['submitted_at'],
+            },
+        ),
+    ]
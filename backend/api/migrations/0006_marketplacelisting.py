@@ -0,0 +1,121 @@
+# Generated by Django 4.2 on 2026-10-19 02:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def copy_listings_from_activities(apps, schema_editor):
+    """Create a MarketplaceListing for every Activity that was listed, pending or sold"""
+    Activity = apps.get_model('api', 'Activity')
+    MarketplaceListing = apps.get_model('api', 'MarketplaceListing')
+    PendingTransaction = apps.get_model('api', 'PendingTransaction')
+
+    # Purchase records point back at the listed activity through data['listing_id']
+    purchases = {}
+    for purchase in Activity.objects.filter(activity_type='marketplace_purchase').iterator():
+        if isinstance(purchase.data, dict) and purchase.data.get('listing_id') is not None:
+            purchases[str(purchase.data['listing_id'])] = purchase
+
+    listings = []
+    for activity in Activity.objects.filter(
+        marketplace_status__in=['listed', 'pending', 'sold'],
+        token_id__isnull=False
+    ).iterator():
+        seller_wallet = activity.user_wallet
+        if not seller_wallet and isinstance(activity.data, dict):
+            seller_wallet = activity.data.get('user_wallet', '')
+
+        listing_status = activity.marketplace_status
+        tx_hash = activity.transaction_hash or ''
+        if listing_status == 'listed' and (not tx_hash or tx_hash.startswith(('Error', 'Emission'))):
+            # These were never shown on the marketplace
+            listing_status = 'cancelled'
+
+        purchase = purchases.get(str(activity.id))
+        listings.append(MarketplaceListing(
+            activity_id=activity.id,
+            token_id=activity.token_id,
+            seller=activity.user,
+            seller_wallet=seller_wallet or '',
+            price_eth=activity.listing_price or 0.01,
+            co2_grams=int(activity.predicted_emission * 1000),
+            activity_type=activity.activity_type,
+            status=listing_status,
+            transaction_hash=activity.transaction_hash,
+            buyer=purchase.user if purchase else None,
+            buyer_wallet=purchase.user_wallet if purchase else None,
+            purchase_activity_id=purchase.id if purchase else None,
+            purchase_transaction_hash=purchase.transaction_hash if purchase else None,
+            created_at=activity.timestamp,
+            sold_at=purchase.timestamp if purchase and listing_status == 'sold' else None,
+        ))
+    MarketplaceListing.objects.bulk_create(listings, batch_size=500)
+
+    # Re-point in-flight marketplace transfers at the new listing rows
+    listing_ids = dict(MarketplaceListing.objects.values_list('activity_id', 'id'))
+    for pending in PendingTransaction.objects.filter(listing__isnull=False):
+        pending.marketplace_listing_id = listing_ids.get(pending.listing_id)
+        pending.save(update_fields=['marketplace_listing'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_pendingtransaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketplaceListing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token_id', models.IntegerField()),
+                ('seller', models.CharField(max_length=100)),
+                ('seller_wallet', models.CharField(max_length=42)),
+                ('price_eth', models.FloatField()),
+                ('co2_grams', models.BigIntegerField()),
+                ('activity_type', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('listed', 'Listed for Sale'), ('pending', 'Sale Pending'), ('sold', 'Sold'), ('cancelled', 'Cancelled')], default='listed', max_length=20)),
+                ('transaction_hash', models.CharField(blank=True, max_length=255, null=True)),
+                ('buyer', models.CharField(blank=True, max_length=100, null=True)),
+                ('buyer_wallet', models.CharField(blank=True, max_length=42, null=True)),
+                ('purchase_transaction_hash', models.CharField(blank=True, max_length=255, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sold_at', models.DateTimeField(blank=True, null=True)),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listings', to='api.activity')),
+                ('purchase_activity', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchased_listings', to='api.activity')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['status', '-created_at'], name='listing_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['token_id', 'status'], name='listing_token_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['seller_wallet', 'status'], name='listing_seller_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='pendingtransaction',
+            name='marketplace_listing',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pending_transactions', to='api.marketplacelisting'),
+        ),
+        migrations.RunPython(copy_listings_from_activities, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='pendingtransaction',
+            name='listing',
+        ),
+        migrations.RenameField(
+            model_name='pendingtransaction',
+            old_name='marketplace_listing',
+            new_name='listing',
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+def backfill_price_per_tonne(apps, schema_editor):
+    MarketplaceListing = apps.get_model('api', 'MarketplaceListing')
+    MarketplaceListing.objects.filter(co2_grams__gt=0).update(
+        price_per_tonne=models.F('price_eth') * 1000000.0 / models.F('co2_grams')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_marketplacelisting'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='marketplacelisting',
+            name='listing_status_created_idx',
+        ),
+        migrations.AddField(
+            model_name='marketplacelisting',
+            name='price_per_tonne',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_price_per_tonne, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='listing_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['status', 'price_eth', 'id'], name='listing_status_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['status', 'co2_grams', 'id'], name='listing_status_co2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['status', 'price_per_tonne', 'id'], name='listing_status_ppt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['status', 'activity_type', 'created_at', 'id'], name='listing_status_type_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 02:30
+
+from django.db import migrations, models
+
+
+def backfill_sold_at(apps, schema_editor):
+    """Sales copied from activities without a purchase record have no sold_at; use their last update"""
+    MarketplaceListing = apps.get_model('api', 'MarketplaceListing')
+    MarketplaceListing.objects.filter(status='sold', sold_at__isnull=True).update(sold_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_listing_browse_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sold_at, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='marketplacelisting',
+            name='listing_seller_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['seller_wallet', 'status', 'sold_at', 'activity'], name='listing_seller_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketplacelisting',
+            index=models.Index(fields=['buyer_wallet', 'status', 'sold_at', 'purchase_activity'], name='listing_buyer_history_idx'),
+        ),
+    ]
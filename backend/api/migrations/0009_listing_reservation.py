@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_listing_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='marketplacelisting',
+            name='reserved_by',
+            field=models.CharField(blank=True, max_length=42, null=True),
+        ),
+        migrations.AddField(
+            model_name='marketplacelisting',
+            name='reserved_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_listing_reservation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pendingtransaction',
+            name='kind',
+            field=models.CharField(choices=[('mint', 'Mint'), ('transfer', 'Transfer'), ('batch_transfer', 'Batch transfer')], max_length=20),
+        ),
+    ]
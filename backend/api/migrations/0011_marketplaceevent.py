@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-19 02:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_pendingtransaction_batch_transfer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketplaceEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('listing_created', 'Listing Created'), ('listing_sold', 'Listing Sold'), ('price_changed', 'Price Changed')], max_length=30)),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('listing', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='api.marketplacelisting')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
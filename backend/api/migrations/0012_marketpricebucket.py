@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_marketplaceevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketPriceBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity_type', models.CharField(max_length=100)),
+                ('bucket_start', models.DateTimeField()),
+                ('trade_count', models.IntegerField(default=0)),
+                ('volume_eth', models.FloatField(default=0)),
+                ('volume_grams', models.BigIntegerField(default=0)),
+                ('min_price_per_tonne', models.FloatField(blank=True, null=True)),
+                ('max_price_per_tonne', models.FloatField(blank=True, null=True)),
+                ('price_per_tonne_histogram', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['bucket_start'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='marketpricebucket',
+            index=models.Index(fields=['bucket_start', 'activity_type'], name='price_bucket_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='marketpricebucket',
+            constraint=models.UniqueConstraint(fields=('activity_type', 'bucket_start'), name='price_bucket_type_start_uniq'),
+        ),
+    ]
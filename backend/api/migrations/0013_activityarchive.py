@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-19 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_marketpricebucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('user', models.CharField(max_length=100)),
+                ('activity_type', models.CharField(max_length=100)),
+                ('data_compressed', models.BinaryField()),
+                ('predicted_emission', models.FloatField(default=0)),
+                ('timestamp', models.DateTimeField()),
+                ('transaction_hash', models.CharField(blank=True, max_length=255, null=True)),
+                ('token_id', models.IntegerField(blank=True, null=True)),
+                ('user_wallet', models.CharField(blank=True, max_length=42, null=True)),
+                ('marketplace_status', models.CharField(default='not_listed', max_length=20)),
+                ('listing_price', models.FloatField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['user', 'timestamp', 'id'], name='activity_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activityarchive',
+            index=models.Index(fields=['user', 'timestamp', 'id'], name='archive_user_time_idx'),
+        ),
+    ]
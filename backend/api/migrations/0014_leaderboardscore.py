@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-19 03:26
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_activityarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject_type', models.CharField(choices=[('user', 'User'), ('company', 'Company')], max_length=10)),
+                ('subject', models.CharField(max_length=100)),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month'), ('all', 'All time')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('net_grams', models.BigIntegerField(default=0)),
+                ('company', models.CharField(blank=True, max_length=100, null=True)),
+                ('updated_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-net_grams'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardscore',
+            constraint=models.UniqueConstraint(fields=('subject_type', 'period', 'period_start', 'subject'), name='leaderboard_subject_period_uniq'),
+        ),
+    ]
@@ -1,10 +1,12 @@
 # backend/api/models.py
 from django.db import models
+from django.utils import timezone
 
 class Activity(models.Model):
     MARKETPLACE_STATUS_CHOICES = [
         ('not_listed', 'Not Listed'),
         ('listed', 'Listed for Sale'),
+        ('pending', 'Sale Pending'),
         ('sold', 'Sold'),
     ]
 
@@ -22,6 +24,246 @@ class Activity(models.Model):
     class Meta:
         ordering = ['-timestamp']
         verbose_name_plural = 'Activities'
+        indexes = [
+            # User history, newest first, keyset paginated on (timestamp, id)
+            models.Index(fields=['user', 'timestamp', 'id'], name='activity_user_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.activity_type} (Token #{self.token_id})"
+
+
+class ActivityArchive(models.Model):
+    """
+    An Activity moved out of the hot table by `manage.py archive_activities`.
+
+    Rows keep their Activity id and columns; the request payload is stored
+    as zlib-compressed JSON (see api/archive.py). Only rows that no longer
+    take part in the marketplace (no token, no listing, no pending
+    transaction) are archived.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.CharField(max_length=100)
+    activity_type = models.CharField(max_length=100)
+    data_compressed = models.BinaryField()
+    predicted_emission = models.FloatField(default=0)
+    timestamp = models.DateTimeField()
+    transaction_hash = models.CharField(max_length=255, null=True, blank=True)
+    token_id = models.IntegerField(null=True, blank=True)
+    user_wallet = models.CharField(max_length=42, null=True, blank=True)
+    marketplace_status = models.CharField(max_length=20, default='not_listed')
+    listing_price = models.FloatField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-timestamp']
+        indexes = [
+            # User history pages continue into the archive on (timestamp, id)
+            models.Index(fields=['user', 'timestamp', 'id'], name='archive_user_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.activity_type} (archived)"
+
+
+class MarketplaceListing(models.Model):
+    """
+    A credit NFT offered on the marketplace.
+
+    Listing fields are copied from the minted Activity when the listing is
+    created, so browsing the market never touches the activity log.
+    """
+    STATUS_CHOICES = [
+        ('listed', 'Listed for Sale'),
+        ('pending', 'Sale Pending'),
+        ('sold', 'Sold'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='listings')
+    token_id = models.IntegerField()
+    seller = models.CharField(max_length=100)
+    seller_wallet = models.CharField(max_length=42)
+    price_eth = models.FloatField()
+    co2_grams = models.BigIntegerField()
+    # price_eth per tonne of CO2, kept in step by save() so it can be indexed and sorted on
+    price_per_tonne = models.FloatField(null=True, blank=True)
+    activity_type = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='listed')
+    transaction_hash = models.CharField(max_length=255, null=True, blank=True)  # Mint transaction
+    buyer = models.CharField(max_length=100, null=True, blank=True)
+    buyer_wallet = models.CharField(max_length=42, null=True, blank=True)
+    purchase_activity = models.ForeignKey(Activity, null=True, blank=True, on_delete=models.SET_NULL, related_name='purchased_listings')
+    purchase_transaction_hash = models.CharField(max_length=255, null=True, blank=True)
+    # Buyer holding the listing while their transfer is attempted; expires at reserved_until
+    reserved_by = models.CharField(max_length=42, null=True, blank=True)
+    reserved_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    sold_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        # Each browse sort is (status, sort column, id) so keyset pages are index range scans
+        indexes = [
+            models.Index(fields=['status', 'created_at', 'id'], name='listing_status_created_idx'),
+            models.Index(fields=['status', 'price_eth', 'id'], name='listing_status_price_idx'),
+            models.Index(fields=['status', 'co2_grams', 'id'], name='listing_status_co2_idx'),
+            models.Index(fields=['status', 'price_per_tonne', 'id'], name='listing_status_ppt_idx'),
+            models.Index(fields=['status', 'activity_type', 'created_at', 'id'], name='listing_status_type_idx'),
+            models.Index(fields=['token_id', 'status'], name='listing_token_status_idx'),
+            # Wallet trade history: keyset pages over sold_at on each side of the trade
+            models.Index(fields=['seller_wallet', 'status', 'sold_at', 'activity'], name='listing_seller_history_idx'),
+            models.Index(fields=['buyer_wallet', 'status', 'sold_at', 'purchase_activity'], name='listing_buyer_history_idx'),
+        ]
+
+    def __str__(self):
+        return f"Listing #{self.id} - Token #{self.token_id} ({self.status})"
+
+    @staticmethod
+    def compute_price_per_tonne(price_eth: float, co2_grams: int):
+        if not co2_grams:
+            return None
+        return price_eth / (co2_grams / 1_000_000)
+
+    def save(self, *args, **kwargs):
+        self.price_per_tonne = self.compute_price_per_tonne(self.price_eth, self.co2_grams)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'price_eth' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'price_per_tonne'}
+        super().save(*args, **kwargs)
+
+
+class PendingTransaction(models.Model):
+    """
+    A transaction submitted by the backend wallet whose receipt has not been
+    processed yet. The background tracker moves rows to confirmed or failed
+    and updates the linked activities.
+    """
+    KIND_CHOICES = [
+        ('mint', 'Mint'),
+        ('transfer', 'Transfer'),
+        # Cart checkout; its listings are found by purchase_transaction_hash
+        ('batch_transfer', 'Batch transfer'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('confirmed', 'Confirmed'),
+        ('failed', 'Failed'),
+    ]
+
+    tx_hash = models.CharField(max_length=66, unique=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    # Activity updated on confirmation (the minted activity or the purchase record)
+    activity = models.ForeignKey(Activity, null=True, blank=True, on_delete=models.SET_NULL, related_name='pending_transactions')
+    # Listing being sold, for marketplace transfers
+    listing = models.ForeignKey(MarketplaceListing, null=True, blank=True, on_delete=models.SET_NULL, related_name='pending_transactions')
+    nonce = models.IntegerField(null=True, blank=True)
+    block_number = models.IntegerField(null=True, blank=True)
+    gas_used = models.IntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['submitted_at']
+
+    def __str__(self):
+        return f"{self.kind} {self.tx_hash} ({self.status})"
+
+
+class MarketplaceEvent(models.Model):
+    """
+    A committed marketplace change, streamed to clients over SSE.
+
+    The id is the event's resume token (SSE Last-Event-ID).
+    """
+    EVENT_TYPE_CHOICES = [
+        ('listing_created', 'Listing Created'),
+        ('listing_sold', 'Listing Sold'),
+        ('price_changed', 'Price Changed'),
+    ]
+
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPE_CHOICES)
+    listing = models.ForeignKey(MarketplaceListing, null=True, blank=True, on_delete=models.SET_NULL, related_name='events')
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.event_type}"
+
+
+class MarketPriceBucket(models.Model):
+    """
+    Sales of one activity type within one hour, updated as each sale completes.
+
+    Price per tonne is kept as a sparse histogram of log-spaced bins
+    ({bin index: trades}), so percentiles over any range of buckets can be
+    read off merged histograms without touching individual sales.
+    """
+    activity_type = models.CharField(max_length=100)
+    bucket_start = models.DateTimeField()
+    trade_count = models.IntegerField(default=0)
+    volume_eth = models.FloatField(default=0)
+    volume_grams = models.BigIntegerField(default=0)
+    min_price_per_tonne = models.FloatField(null=True, blank=True)
+    max_price_per_tonne = models.FloatField(null=True, blank=True)
+    price_per_tonne_histogram = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['bucket_start']
+        constraints = [
+            models.UniqueConstraint(fields=['activity_type', 'bucket_start'], name='price_bucket_type_start_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket_start', 'activity_type'], name='price_bucket_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.activity_type} @ {self.bucket_start:%Y-%m-%d %H:00}: {self.trade_count} trades"
+
+
+class LeaderboardScore(models.Model):
+    """
+    Net CO2 offset of a user or company over one period, kept up to date as
+    activities are logged and credits change hands (see api/leaderboard.py).
+
+    Offset activities and bought credits add grams, emitting activities and
+    sold credits subtract them. updated_at is set on every change so each
+    process's in-memory ranking can pick up changes made by the others.
+    """
+    SUBJECT_TYPE_CHOICES = [
+        ('user', 'User'),
+        ('company', 'Company'),
+    ]
+    PERIOD_CHOICES = [
+        ('week', 'Week'),
+        ('month', 'Month'),
+        ('all', 'All time'),
+    ]
+
+    subject_type = models.CharField(max_length=10, choices=SUBJECT_TYPE_CHOICES)
+    subject = models.CharField(max_length=100)
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    net_grams = models.BigIntegerField(default=0)
+    # Company the user last logged an activity for (user rows only)
+    company = models.CharField(max_length=100, null=True, blank=True)
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-net_grams']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['subject_type', 'period', 'period_start', 'subject'],
+                name='leaderboard_subject_period_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject_type} {self.subject} ({self.period} from {self.period_start}): {self.net_grams} g"
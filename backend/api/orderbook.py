@@ -0,0 +1,595 @@
+# backend/api/orderbook.py
+"""
+In-memory order book for carbon credit NFTs.
+
+Each (activity type, vintage) market has two sides. A side keeps one FIFO
+deque of orders per price level and a heap of level prices, so the best
+level is found in O(1), placing an order costs O(log levels) and a fill
+costs O(1). Cancelled orders are removed lazily when they reach the front
+of their level.
+
+- An ask offers one credit token at a price.
+- A bid asks for `quantity` credits of that market at up to a price.
+
+Incoming orders match against the opposite side in price-time priority and
+trade at the resting order's price; the remainder rests on the book.
+
+Every accepted order and cancel is appended to a JSONL journal before it
+is applied. Replaying the journal rebuilds the book and regenerates the
+same trades (matching is deterministic); 'settled'/'settle_failed' records
+then mark the trades that were already handed to the chain.
+
+The book lives in one process. The first process to use it takes an
+exclusive lock on the journal; in any other worker the order book
+endpoints answer 503 (OrderBookLocked), so route /api/orderbook/ to a
+single worker when running several. Other workers still see open asks
+(has_open_ask) by replaying the journal read-only as it grows.
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from collections import deque
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ORDERBOOK_JOURNAL_PATH = os.getenv("ORDERBOOK_JOURNAL_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "orderbook.journal"
+)
+# fsync every journal write (slower; survives power loss, not just process crashes)
+ORDERBOOK_JOURNAL_FSYNC = os.getenv("ORDERBOOK_JOURNAL_FSYNC", "false").lower() == "true"
+ORDERBOOK_SETTLE_INTERVAL = float(os.getenv("ORDERBOOK_SETTLE_INTERVAL", "2"))
+ORDERBOOK_SETTLE_BATCH = int(os.getenv("ORDERBOOK_SETTLE_BATCH", "25"))
+
+WEI_PER_ETH = Decimal(10) ** 18
+
+
+def eth_to_wei(price_eth) -> int:
+    """Prices are kept as integer wei so equal prices share a level exactly"""
+    try:
+        price = Decimal(str(price_eth))
+    except InvalidOperation:
+        raise ValueError(f"Invalid price: {price_eth}")
+    if not price.is_finite():
+        raise ValueError(f"Invalid price: {price_eth}")
+    return int(price * WEI_PER_ETH)
+
+
+class OrderBookLocked(Exception):
+    """Another process owns the order book journal"""
+
+
+def _lock_journal(journal):
+    """Take an exclusive lock on an open journal file without waiting; it is released when the file is closed"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(journal.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        raise OrderBookLocked(
+            "The order book is served by another worker process; route /api/orderbook/ to a single worker"
+        )
+
+
+class Order:
+    __slots__ = ('order_id', 'side', 'market', 'price', 'quantity', 'remaining',
+                 'wallet', 'user', 'token_id', 'created_at', 'status')
+
+    def __init__(self, order_id, side, market, price, quantity, wallet, user, token_id=None, created_at=None):
+        self.order_id = order_id
+        self.side = side
+        self.market = market
+        self.price = price
+        self.quantity = quantity
+        self.remaining = quantity
+        self.wallet = wallet
+        self.user = user
+        self.token_id = token_id
+        self.created_at = created_at if created_at is not None else time.time()
+        self.status = 'open'
+
+    def to_dict(self) -> dict:
+        return {
+            'orderId': self.order_id,
+            'side': self.side,
+            'activityType': self.market[0],
+            'vintage': self.market[1],
+            'priceEth': float(Decimal(self.price) / WEI_PER_ETH),
+            'quantity': self.quantity,
+            'remaining': self.remaining,
+            'wallet': self.wallet,
+            'tokenId': self.token_id,
+            'status': self.status,
+        }
+
+
+class Trade:
+    __slots__ = ('trade_id', 'market', 'price', 'token_id', 'bid_id', 'ask_id',
+                 'buyer_wallet', 'buyer', 'seller_wallet', 'seller', 'status', 'transaction_hash', 'error')
+
+    def __init__(self, trade_id, market, price, bid, ask):
+        self.trade_id = trade_id
+        self.market = market
+        self.price = price
+        self.token_id = ask.token_id
+        self.bid_id = bid.order_id
+        self.ask_id = ask.order_id
+        self.buyer_wallet = bid.wallet
+        self.buyer = bid.user
+        self.seller_wallet = ask.wallet
+        self.seller = ask.user
+        self.status = 'pending'  # pending -> submitted | failed
+        self.transaction_hash = None
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {
+            'tradeId': self.trade_id,
+            'activityType': self.market[0],
+            'vintage': self.market[1],
+            'priceEth': float(Decimal(self.price) / WEI_PER_ETH),
+            'tokenId': self.token_id,
+            'bidId': self.bid_id,
+            'askId': self.ask_id,
+            'buyerWallet': self.buyer_wallet,
+            'sellerWallet': self.seller_wallet,
+            'status': self.status,
+            'transactionHash': self.transaction_hash,
+            'error': self.error,
+        }
+
+
+class BookSide:
+    """Price levels of one side: a heap of prices plus a FIFO deque per price"""
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self._heap = []    # prices, negated for bids so the best level is always heap[0]
+        self.levels = {}   # price -> deque of orders
+        self.volume = {}   # price -> open quantity at that level
+
+    def add(self, order: Order):
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = deque()
+            self.volume[order.price] = 0
+            heapq.heappush(self._heap, -order.price if self.is_bid else order.price)
+        level.append(order)
+        self.volume[order.price] += order.remaining
+
+    def best_price(self):
+        while self._heap:
+            price = -self._heap[0] if self.is_bid else self._heap[0]
+            level = self.levels.get(price)
+            while level and level[0].status != 'open':
+                level.popleft()
+            if level:
+                return price
+            # Empty or duplicate heap entry
+            heapq.heappop(self._heap)
+            if level is not None:
+                del self.levels[price]
+                del self.volume[price]
+        return None
+
+    def front(self, price: int) -> Order:
+        return self.levels[price][0]
+
+    def fill(self, order: Order, quantity: int):
+        order.remaining -= quantity
+        self.volume[order.price] -= quantity
+        if order.remaining == 0:
+            order.status = 'filled'
+            self.levels[order.price].popleft()
+
+    def cancel(self, order: Order):
+        """Mark cancelled; the order leaves its deque when it reaches the front"""
+        self.volume[order.price] -= order.remaining
+        order.status = 'cancelled'
+
+    def depth(self, levels: int) -> list:
+        """Best `levels` (price, open quantity) pairs, best first"""
+        live = (price for price, quantity in self.volume.items() if quantity > 0)
+        best = heapq.nlargest(levels, live) if self.is_bid else heapq.nsmallest(levels, live)
+        return [(price, self.volume[price]) for price in best]
+
+
+class OrderBook:
+    """All markets, their orders and the trades they produced"""
+
+    def __init__(self, journal_path: str = None):
+        self.journal_path = journal_path
+        self._journal = None
+        self.lock = threading.RLock()
+        self.markets = {}          # (activity_type, vintage) -> (bids, asks)
+        self.orders = {}           # order_id -> open order
+        self.asks_by_token = {}    # token_id -> open ask
+        self.trades = {}           # trade_id -> trade
+        self.unsettled = {}        # trade ids waiting for settlement, in match order
+        self.next_order_id = 1
+        self.next_trade_id = 1
+
+    # Journal
+
+    def open_journal(self):
+        """
+        Lock the journal, replay it and keep it open for appends
+
+        Raises:
+            OrderBookLocked: another process has the journal open
+        """
+        if not self.journal_path:
+            return
+        journal = open(self.journal_path, 'a', encoding='utf-8')
+        try:
+            _lock_journal(journal)
+        except OrderBookLocked:
+            journal.close()
+            raise
+        self.replay(self.journal_path)
+        self._journal = journal
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def replay(self, path: str):
+        with open(path, encoding='utf-8') as journal:
+            self.replay_lines(journal)
+
+    def replay_lines(self, lines):
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write
+                print(f"Skipping unreadable order book journal line: {line[:80]!r}")
+                continue
+            self._apply(record)
+
+    def _write(self, record: dict):
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._journal.flush()
+        if ORDERBOOK_JOURNAL_FSYNC:
+            os.fsync(self._journal.fileno())
+
+    def _apply(self, record: dict):
+        op = record['op']
+        if op == 'place':
+            order = Order(
+                record['id'], record['side'], (record['type'], record['vintage']), record['price'],
+                record['qty'], record['wallet'], record['user'], record.get('token'), record['ts']
+            )
+            self.next_order_id = max(self.next_order_id, order.order_id + 1)
+            return self._match(order)
+        elif op == 'cancel':
+            return self._cancel(record['id'])
+        elif op == 'settled':
+            self._mark_trade(record['trade'], 'submitted', transaction_hash=record.get('tx'))
+        elif op == 'settle_failed':
+            self._mark_trade(record['trade'], 'failed', error=record.get('error'))
+
+    # Orders
+
+    def place(self, side: str, activity_type: str, vintage: int, price_eth, wallet: str,
+              user: str, quantity: int = 1, token_id: int = None) -> tuple:
+        """
+        Add an order and match it
+
+        Args:
+            side: 'bid' or 'ask'
+            price_eth: limit price per credit in ETH
+            quantity: credits wanted (bids); asks are always one token
+            token_id: token offered (asks only)
+
+        Returns:
+            tuple of (order, list of trades it produced)
+
+        Raises:
+            ValueError: for malformed orders or a token already offered
+        """
+        if side not in ('bid', 'ask'):
+            raise ValueError("side must be 'bid' or 'ask'")
+        price = eth_to_wei(price_eth)
+        if price <= 0:
+            raise ValueError("price must be positive")
+        if side == 'ask':
+            if token_id is None:
+                raise ValueError("asks need a tokenId")
+            quantity = 1
+        elif quantity < 1:
+            raise ValueError("quantity must be at least 1")
+
+        with self.lock:
+            if side == 'ask' and token_id in self.asks_by_token:
+                raise ValueError(f"Token #{token_id} is already offered")
+            record = {
+                'op': 'place', 'id': self.next_order_id, 'side': side, 'type': activity_type,
+                'vintage': vintage, 'price': price, 'qty': quantity, 'wallet': wallet,
+                'user': user, 'token': token_id, 'ts': time.time(),
+            }
+            self._write(record)
+            first_trade = self.next_trade_id
+            order = self._apply(record)
+            trades = [self.trades[i] for i in range(first_trade, self.next_trade_id)]
+            return order, trades
+
+    def cancel(self, order_id: int) -> Order:
+        """Cancel an open order; returns None if it is not open"""
+        with self.lock:
+            if order_id not in self.orders:
+                return None
+            self._write({'op': 'cancel', 'id': order_id})
+            return self._cancel(order_id)
+
+    def _cancel(self, order_id: int):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        bids, asks = self.markets[order.market]
+        (bids if order.side == 'bid' else asks).cancel(order)
+        if order.side == 'ask':
+            self.asks_by_token.pop(order.token_id, None)
+        return order
+
+    def _match(self, order: Order) -> Order:
+        """Match against the opposite side in price-time priority, then rest the remainder"""
+        bids, asks = self.markets.setdefault(order.market, (BookSide(is_bid=True), BookSide(is_bid=False)))
+        own, opposite = (bids, asks) if order.side == 'bid' else (asks, bids)
+
+        while order.remaining > 0:
+            best = opposite.best_price()
+            if best is None or (best > order.price if order.side == 'bid' else best < order.price):
+                break
+            resting = opposite.front(best)
+            if resting.wallet.lower() == order.wallet.lower():
+                # Never trade with yourself: the older order gives way
+                self._cancel(resting.order_id)
+                continue
+
+            bid, ask = (order, resting) if order.side == 'bid' else (resting, order)
+            trade = Trade(self.next_trade_id, order.market, resting.price, bid, ask)
+            self.next_trade_id += 1
+            self.trades[trade.trade_id] = trade
+            self.unsettled[trade.trade_id] = None
+
+            opposite.fill(resting, 1)
+            order.remaining -= 1
+            if resting.status == 'filled':
+                self.orders.pop(resting.order_id, None)
+                if resting.side == 'ask':
+                    self.asks_by_token.pop(resting.token_id, None)
+
+        if order.remaining > 0:
+            own.add(order)
+            self.orders[order.order_id] = order
+            if order.side == 'ask':
+                self.asks_by_token[order.token_id] = order
+        else:
+            order.status = 'filled'
+        return order
+
+    # Trades
+
+    def _mark_trade(self, trade_id: int, status: str, transaction_hash: str = None, error: str = None):
+        trade = self.trades.get(trade_id)
+        if trade is None:
+            return
+        trade.status = status
+        trade.transaction_hash = transaction_hash
+        trade.error = error
+        self.unsettled.pop(trade_id, None)
+
+    def take_unsettled(self, limit: int) -> list:
+        """Trades waiting for settlement, oldest first (they stay queued until marked)"""
+        with self.lock:
+            return [self.trades[trade_id] for trade_id in islice(self.unsettled, limit)]
+
+    def record_settlement(self, trade: Trade, transaction_hash: str = None, error: str = None):
+        with self.lock:
+            if error:
+                self._write({'op': 'settle_failed', 'trade': trade.trade_id, 'error': error})
+                self._mark_trade(trade.trade_id, 'failed', error=error)
+            else:
+                self._write({'op': 'settled', 'trade': trade.trade_id, 'tx': transaction_hash})
+                self._mark_trade(trade.trade_id, 'submitted', transaction_hash=transaction_hash)
+
+    def depth(self, activity_type: str, vintage: int, levels: int = 10) -> dict:
+        with self.lock:
+            sides = self.markets.get((activity_type, vintage))
+            if sides is None:
+                return {'bids': [], 'asks': []}
+            bids, asks = sides
+
+            def render(rows):
+                return [{'priceEth': float(Decimal(price) / WEI_PER_ETH), 'quantity': quantity} for price, quantity in rows]
+
+            return {'bids': render(bids.depth(levels)), 'asks': render(asks.depth(levels))}
+
+
+def settle_trades(book: OrderBook, batch_size: int = ORDERBOOK_SETTLE_BATCH) -> int:
+    """
+    Submit one batch of matched trades through transfer_nft
+
+    Transfers are submitted without waiting for receipts; each gets a
+    purchase Activity, and the transaction tracker confirms them and then
+    scores the trade (record_trade_purchases).
+
+    Returns:
+        number of trades handled
+    """
+    from .models import Activity
+    from .tx_tracker import track_transaction
+    from .blockchain_utils import transfer_nft
+
+    trades = book.take_unsettled(batch_size)
+    if not trades:
+        return 0
+
+    submitted = []
+    for trade in trades:
+        result = transfer_nft(
+            from_address=trade.seller_wallet,
+            to_address=trade.buyer_wallet,
+            token_id=trade.token_id,
+            wait_for_receipt=False
+        )
+        if result.get('success'):
+            book.record_settlement(trade, transaction_hash=result.get('transaction_hash'))
+            submitted.append((trade, result))
+        else:
+            print(f"Order book trade #{trade.trade_id} failed to settle: {result.get('error')}")
+            book.record_settlement(trade, error=result.get('error', 'Transfer failed'))
+
+    # CO2 of each traded token, from the activity that minted it
+    emissions = dict(
+        Activity.objects.filter(token_id__in=[trade.token_id for trade, _ in submitted])
+        .exclude(activity_type='marketplace_purchase')
+        .values_list('token_id', 'predicted_emission')
+    )
+    purchases = Activity.objects.bulk_create([
+        Activity(
+            user=trade.buyer,
+            activity_type='marketplace_purchase',
+            data={
+                'order_book_trade_id': trade.trade_id,
+                'seller': trade.seller,
+                'seller_wallet': trade.seller_wallet,
+                'buyer_wallet': trade.buyer_wallet,
+                'token_id': trade.token_id,
+                'original_activity_type': trade.market[0],
+                'vintage': trade.market[1],
+                'price_paid': float(Decimal(trade.price) / WEI_PER_ETH),
+            },
+            predicted_emission=emissions.get(trade.token_id, 0),
+            user_wallet=trade.buyer_wallet,
+            token_id=trade.token_id,
+            transaction_hash=result.get('transaction_hash'),
+            marketplace_status='not_listed',
+        )
+        for trade, result in submitted
+    ])
+    for purchase, (trade, result) in zip(purchases, submitted):
+        track_transaction(result['transaction_hash'], 'transfer', activity=purchase, nonce=result.get('nonce'))
+    return len(trades)
+
+
+def record_trade_purchases(purchases):
+    """
+    Fold confirmed order book trades into the price aggregates and leaderboards
+
+    Args:
+        purchases: marketplace_purchase Activities written by settle_trades
+    """
+    from .analytics import record_sales
+    from .leaderboard import record_credit_transfers
+
+    purchases = list(purchases)
+    record_sales(
+        (p.data.get('original_activity_type'), p.data.get('price_paid', 0),
+         int((p.predicted_emission or 0) * 1000), p.timestamp)
+        for p in purchases
+    )
+    record_credit_transfers(
+        (p.user, p.data.get('seller'), int((p.predicted_emission or 0) * 1000), p.timestamp)
+        for p in purchases
+    )
+
+
+class OrderBookSettler(threading.Thread):
+    """Daemon thread settling matched trades in batches"""
+
+    def __init__(self, book: OrderBook):
+        super().__init__(name="orderbook-settler", daemon=True)
+        self.book = book
+
+    def run(self):
+        from django.db import close_old_connections
+
+        while True:
+            try:
+                settle_trades(self.book)
+            except Exception as e:
+                print(f"Order book settlement error: {e}")
+            finally:
+                close_old_connections()
+            time.sleep(ORDERBOOK_SETTLE_INTERVAL)
+
+
+class JournalReplica:
+    """Read-only copy of a book owned by another process, kept current by replaying its journal's new lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.book = OrderBook()
+        self.offset = 0
+
+    def refresh(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self.offset:
+            # The journal was replaced: start over
+            self.book, self.offset = OrderBook(), 0
+        if size == self.offset:
+            return
+        with open(self.path, 'rb') as journal:
+            journal.seek(self.offset)
+            data = journal.read(size - self.offset)
+        # Leave a line that is still being written for the next refresh
+        end = data.rfind(b'\n') + 1
+        self.book.replay_lines(data[:end].decode('utf-8').splitlines())
+        self.offset += end
+
+
+_book = None
+_settler = None
+_replica = None
+_book_lock = threading.Lock()
+
+
+def has_open_ask(token_id: int) -> bool:
+    """True if the order book has an open ask for the token, whichever process owns the book"""
+    global _replica
+    if _book is not None:
+        return token_id in _book.asks_by_token
+    with _book_lock:
+        if _book is not None:
+            return token_id in _book.asks_by_token
+        if _replica is None:
+            _replica = JournalReplica(ORDERBOOK_JOURNAL_PATH)
+        _replica.refresh()
+        return token_id in _replica.book.asks_by_token
+
+
+def get_order_book() -> OrderBook:
+    """
+    Return the process-wide order book, replaying the journal and starting settlement on first use
+
+    Raises:
+        OrderBookLocked: another process owns the order book
+    """
+    global _book, _settler, _replica
+    with _book_lock:
+        if _book is None:
+            book = OrderBook(ORDERBOOK_JOURNAL_PATH)
+            book.open_journal()
+            _book, _replica = book, None
+        if _settler is None or not _settler.is_alive():
+            _settler = OrderBookSettler(_book)
+            _settler.start()
+    return _book
@@ -0,0 +1,244 @@
+# backend/api/orderbook_views.py
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from .models import Activity, MarketplaceListing
+from .orderbook import OrderBookLocked, get_order_book
+from .blockchain_utils import owner_of, check_nft_approval
+
+
+def order_book_unavailable(error: OrderBookLocked) -> Response:
+    """503 from a worker that doesn't own the order book"""
+    return Response({
+        'success': False,
+        'error': str(error)
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@api_view(['POST'])
+def place_order(request):
+    """
+    Place a bid or an ask on the order book.
+
+    Request body (bid):
+    {
+        "side": "bid",
+        "activityType": "car",
+        "vintage": 2025,
+        "priceEth": 0.01,
+        "quantity": 5,
+        "wallet": "0x...",
+        "user": "username"
+    }
+
+    Request body (ask):
+    {
+        "side": "ask",
+        "tokenId": 123,
+        "priceEth": 0.01,
+        "wallet": "0x...",
+        "user": "username"
+    }
+
+    An ask's market (activity type and vintage year) comes from the activity
+    that minted the token. The order is matched immediately; trades are
+    settled on chain in batches by the background settler.
+    """
+    try:
+        data = request.data
+        side = data.get('side')
+        wallet = data.get('wallet')
+        user = data.get('user')
+        price_eth = data.get('priceEth')
+
+        if not all([side, wallet, user, price_eth]):
+            return Response({
+                'success': False,
+                'error': 'Missing required fields'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        token_id = None
+        quantity = 1
+        if side == 'ask':
+            token_id = data.get('tokenId')
+            if token_id is None:
+                return Response({
+                    'success': False,
+                    'error': 'Asks need a tokenId'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            token_id = int(token_id)
+
+            activity = Activity.objects.filter(
+                token_id=token_id
+            ).exclude(activity_type='marketplace_purchase').order_by('timestamp').first()
+            if activity is None:
+                return Response({
+                    'success': False,
+                    'error': 'NFT not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+            activity_type = activity.activity_type
+            vintage = activity.timestamp.year
+
+            if MarketplaceListing.objects.filter(token_id=token_id, status__in=['listed', 'pending']).exists():
+                return Response({
+                    'success': False,
+                    'error': 'This NFT is already listed on the marketplace'
+                }, status=status.HTTP_409_CONFLICT)
+
+            if owner_of(token_id, fresh=True).lower() != wallet.lower():
+                return Response({
+                    'success': False,
+                    'error': 'NFT not found or you don\'t own it'
+                }, status=status.HTTP_403_FORBIDDEN)
+
+            approval = check_nft_approval(wallet, token_id)
+            if not approval.get('approved'):
+                return Response({
+                    'success': False,
+                    'error': 'Approve the marketplace to transfer this NFT before placing an ask'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            activity_type = data.get('activityType')
+            vintage = data.get('vintage')
+            quantity = int(data.get('quantity', 1))
+            if not activity_type or vintage is None:
+                return Response({
+                    'success': False,
+                    'error': 'Bids need an activityType and vintage'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            vintage = int(vintage)
+
+        try:
+            order, trades = get_order_book().place(
+                side, activity_type, vintage, price_eth, wallet, user,
+                quantity=quantity, token_id=token_id
+            )
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'order': order.to_dict(),
+            'trades': [trade.to_dict() for trade in trades]
+        }, status=status.HTTP_201_CREATED)
+
+    except OrderBookLocked as e:
+        return order_book_unavailable(e)
+    except Exception as e:
+        print(f"Error placing order: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+def cancel_order(request, order_id):
+    """
+    Cancel an open order.
+
+    Request body:
+    {
+        "wallet": "0x..."
+    }
+    """
+    try:
+        book = get_order_book()
+        order = book.orders.get(int(order_id))
+        if order is None:
+            return Response({
+                'success': False,
+                'error': 'Order not found or no longer open'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if (request.data.get('wallet') or '').lower() != order.wallet.lower():
+            return Response({
+                'success': False,
+                'error': 'Only the order owner can cancel it'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        order = book.cancel(order.order_id)
+        if order is None:
+            return Response({
+                'success': False,
+                'error': 'Order not found or no longer open'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'success': True,
+            'order': order.to_dict()
+        }, status=status.HTTP_200_OK)
+
+    except OrderBookLocked as e:
+        return order_book_unavailable(e)
+    except Exception as e:
+        print(f"Error cancelling order: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def get_order_book_depth(request, activity_type, vintage):
+    """
+    Best bid and ask price levels of one market.
+
+    URL: GET /api/orderbook/<activity_type>/<vintage>/?levels=10
+    """
+    try:
+        levels = max(1, min(int(request.query_params.get('levels', 10)), 100))
+        depth = get_order_book().depth(activity_type, int(vintage), levels)
+
+        return Response({
+            'success': True,
+            'activityType': activity_type,
+            'vintage': int(vintage),
+            'bids': depth['bids'],
+            'asks': depth['asks']
+        }, status=status.HTTP_200_OK)
+
+    except OrderBookLocked as e:
+        return order_book_unavailable(e)
+    except Exception as e:
+        print(f"Error fetching order book: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def get_order_book_trades(request, wallet_address):
+    """
+    Order book trades where a wallet was the buyer or the seller, newest first.
+
+    URL: GET /api/orderbook/trades/<wallet_address>/
+    """
+    try:
+        book = get_order_book()
+        wallet = wallet_address.lower()
+        with book.lock:
+            trades = [
+                trade.to_dict() for trade in reversed(book.trades.values())
+                if wallet in (trade.buyer_wallet.lower(), trade.seller_wallet.lower())
+            ]
+
+        return Response({
+            'success': True,
+            'trades': trades,
+            'count': len(trades)
+        }, status=status.HTTP_200_OK)
+
+    except OrderBookLocked as e:
+        return order_book_unavailable(e)
+    except Exception as e:
+        print(f"Error fetching order book trades: {e}")
+        return Response({
+            'success': False,
+            'error': str(e),
+            'trades': []
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,77 @@
+# backend/api/pagination.py
+"""
+Keyset (seek) pagination helpers.
+
+A cursor is the sort value and id of the last row on a page, encoded as
+URL-safe base64 JSON. The next page is fetched with a WHERE clause on
+(sort value, id) instead of an OFFSET, so page N costs the same as page 1
+when an index covers (sort column, id).
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def parse_page_size(value, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """Parse a ?limit= value, clamped to [1, maximum]"""
+    if value in (None, ''):
+        return default
+    return max(1, min(int(value), maximum))
+
+
+def encode_cursor(value, row_id) -> str:
+    if isinstance(value, datetime):
+        value = {'dt': value.isoformat()}
+    payload = json.dumps([value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Return (sort value, id) from a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(value, dict) and 'dt' in value:
+            value = datetime.fromisoformat(value['dt'])
+        return value, int(row_id)
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def keyset_filter(field: str, descending: bool, value, row_id, id_field: str = 'id') -> Q:
+    """Rows strictly after (value, row_id) in ORDER BY field, id (both in the same direction)"""
+    op = 'lt' if descending else 'gt'
+    return Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'{id_field}__{op}': row_id})
+
+
+def paginate_keyset(queryset, field: str, descending: bool, limit: int, cursor: str = None, id_field: str = 'id'):
+    """
+    Return one page of queryset ordered by (field, id)
+
+    Returns:
+        tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        queryset = queryset.filter(keyset_filter(field, descending, value, row_id, id_field))
+
+    prefix = '-' if descending else ''
+    rows = list(queryset.order_by(f'{prefix}{field}', f'{prefix}{id_field}')[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        last_value = last[field] if isinstance(last, dict) else getattr(last, field)
+        last_id = last[id_field] if isinstance(last, dict) else getattr(last, id_field)
+        next_cursor = encode_cursor(last_value, last_id)
+    return rows, next_cursor
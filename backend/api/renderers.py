@@ -0,0 +1,69 @@
+# backend/api/renderers.py
+"""
+Fast JSON rendering for the high-volume read endpoints.
+
+FastJSONRenderer returns exactly the bytes DRF's JSONRenderer would, but
+encodes with orjson when it is installed (pip install orjson). orjson and
+the stdlib encoder agree on every plain JSON value except floats that
+Python writes in exponent form (1e+16 vs 1e16, 1e-05 vs 0.00001), so the
+orjson path is only taken when the payload holds nothing but str, int,
+bool, None, in-range floats, lists, tuples and str-keyed dicts. Anything
+else (datetimes, Decimals, NaN, huge ints, indent=...) goes through
+JSONRenderer unchanged.
+"""
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Python's repr switches to exponent notation outside this range
+_FIXED_NOTATION_MIN = 1e-4
+_FIXED_NOTATION_MAX = 1e16
+
+_SCALARS = (str, int, bool, type(None))
+
+
+def _orjson_compatible(value) -> bool:
+    """True if orjson encodes value to the same bytes as the stdlib encoder"""
+    value_type = type(value)
+    if value_type in _SCALARS:
+        return True
+    if value_type is float:
+        magnitude = abs(value)
+        return magnitude == 0 or _FIXED_NOTATION_MIN <= magnitude < _FIXED_NOTATION_MAX
+    if value_type is dict:
+        for key, item in value.items():
+            if type(key) is not str or not _orjson_compatible(item):
+                return False
+        return True
+    if value_type is list or value_type is tuple:
+        for item in value:
+            if not _orjson_compatible(item):
+                return False
+        return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer with an orjson fast path and byte-identical output"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+                or not _orjson_compatible(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, lone surrogates
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these so the output is also valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+# renderer_classes for endpoints that return many rows
+FAST_RENDERERS = [FastJSONRenderer, BrowsableAPIRenderer]
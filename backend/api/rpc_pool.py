@@ -0,0 +1,297 @@
+# backend/api/rpc_pool.py
+"""
+Pool of JSON-RPC providers with health scoring and failover.
+
+RPCProviderPool is itself a web3 provider, so `Web3(RPCProviderPool(...))`
+is a drop-in replacement for `Web3(Web3.HTTPProvider(url))`:
+
+- every member keeps its own pooled HTTP session
+- each member is scored by a rolling window of latencies and errors
+- reads go to the best-scoring healthy member and retry on the next one
+- eth_sendRawTransaction fails over across members; a signed transaction
+  has a fixed hash, so resending it elsewhere can never double-spend
+
+Members that fail repeatedly are put in a cooldown and probed again later.
+Nonces for the backend signer are handed out by NonceManager, so they stay
+consistent even when members disagree about the pending transaction count.
+A write that timed out may still have reached a node, so when no member
+accepts it the pool raises TransactionPossiblySent rather than a plain
+error, and its nonce is not handed out again until the chain says so.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "10"))
+RPC_POOL_CONNECTIONS = int(os.getenv("RPC_POOL_CONNECTIONS", "20"))
+# Members with this many consecutive failures are skipped for RPC_COOLDOWN seconds
+RPC_MAX_CONSECUTIVE_FAILURES = int(os.getenv("RPC_MAX_CONSECUTIVE_FAILURES", "3"))
+RPC_COOLDOWN = float(os.getenv("RPC_COOLDOWN", "30"))
+
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+
+# Errors meaning a resent raw transaction is already in the member's mempool
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "already imported")
+
+
+class TransactionPossiblySent(Exception):
+    """No member accepted a transaction, but one may have received it before failing"""
+
+    def __init__(self, message: str, tx_hash):
+        super().__init__(message)
+        self.tx_hash = tx_hash
+
+
+class ProviderStats:
+    """Rolling latency and error window for one pool member"""
+
+    def __init__(self, window: int = 50):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True for success
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(latency)
+                self.consecutive_failures = 0
+            else:
+                # A failure costs the caller a failover, so it counts as a full timeout
+                self.latencies.append(max(latency, RPC_TIMEOUT))
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= RPC_MAX_CONSECUTIVE_FAILURES:
+                    self.cooldown_until = time.monotonic() + RPC_COOLDOWN
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def avg_latency(self) -> float:
+        if not self.latencies:
+            return 0.0
+        return sum(self.latencies) / len(self.latencies)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def score(self) -> float:
+        """Lower is better: average latency (failures counted as RPC_TIMEOUT) inflated by the recent error rate"""
+        # Unmeasured members score 0 so each one gets tried and measured
+        return self.avg_latency * (1 + 10 * self.error_rate)
+
+
+class RPCProviderPool(JSONBaseProvider):
+    """web3 provider that routes each request to the best pool member"""
+
+    def __init__(self, providers: list):
+        """
+        Args:
+            providers: list of (name, provider) pairs; each provider needs
+                make_request() and, for batches, make_batch_request()
+        """
+        super().__init__()
+        if not providers:
+            raise ValueError("RPCProviderPool needs at least one provider")
+        self.members = [(name, provider, ProviderStats()) for name, provider in providers]
+
+    @classmethod
+    def from_urls(cls, urls: list) -> "RPCProviderPool":
+        """Build a pool of HTTP providers, each with its own pooled session"""
+        providers = []
+        for url in urls:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=RPC_POOL_CONNECTIONS, pool_maxsize=RPC_POOL_CONNECTIONS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            provider = Web3.HTTPProvider(
+                url,
+                session=session,
+                request_kwargs={'timeout': RPC_TIMEOUT},
+                # The pool fails over to another member instead of retrying in place
+                exception_retry_configuration=None,
+                # Answer the validation middleware's eth_chainId lookups locally
+                cache_allowed_requests=True,
+            )
+            providers.append((_redact(url), provider))
+        return cls(providers)
+
+    def ranked_members(self) -> list:
+        """Healthy members by score, then members in cooldown as a last resort"""
+        healthy = [m for m in self.members if m[2].healthy]
+        cooling = [m for m in self.members if not m[2].healthy]
+        return (sorted(healthy, key=lambda m: m[2].score)
+                + sorted(cooling, key=lambda m: m[2].cooldown_until))
+
+    def _call(self, member, func, *args):
+        name, provider, stats = member
+        start = time.monotonic()
+        try:
+            response = getattr(provider, func)(*args)
+        except Exception:
+            stats.record(time.monotonic() - start, ok=False)
+            raise
+        stats.record(time.monotonic() - start, ok=True)
+        return response
+
+    def make_request(self, method, params):
+        if method in WRITE_METHODS:
+            return self._send_write(method, params)
+
+        last_error = None
+        for member in self.ranked_members():
+            try:
+                return self._call(member, 'make_request', method, params)
+            except Exception as e:
+                print(f"RPC read {method} failed on {member[0]}: {e}")
+                last_error = e
+        raise last_error
+
+    def make_batch_request(self, batch_requests):
+        last_error = None
+        for member in self.ranked_members():
+            try:
+                return self._call(member, 'make_batch_request', batch_requests)
+            except Exception as e:
+                print(f"RPC batch request failed on {member[0]}: {e}")
+                last_error = e
+        raise last_error
+
+    def _send_write(self, method, params):
+        """Broadcast a transaction, failing over until one member accepts it"""
+        last_error = None
+        attempted = False
+        possibly_sent = False
+        for member in self.ranked_members():
+            try:
+                response = self._call(member, 'make_request', method, params)
+            except Exception as e:
+                print(f"RPC {method} failed on {member[0]}, failing over: {e}")
+                last_error = e
+                attempted = True
+                possibly_sent = possibly_sent or not _never_reached(e)
+                continue
+
+            error = response.get('error') if isinstance(response, dict) else None
+            if error and attempted and method == "eth_sendRawTransaction" and _is_already_known(error):
+                # An earlier member accepted it before timing out; report the hash
+                return {'jsonrpc': '2.0', 'id': response.get('id'), 'result': Web3.to_hex(_raw_tx_hash(params[0]))}
+            return response
+        if possibly_sent and method == "eth_sendRawTransaction":
+            raise TransactionPossiblySent(
+                f"{method} failed on every RPC provider, possibly after being received: {last_error}",
+                _raw_tx_hash(params[0])
+            )
+        raise last_error
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return any(self._probe(member) for member in self.members)
+
+    def _probe(self, member) -> bool:
+        try:
+            response = self._call(member, 'make_request', 'eth_blockNumber', [])
+            return 'result' in response
+        except Exception:
+            return False
+
+    def health_check(self):
+        """Probe every member once (including those in cooldown) to refresh their scores"""
+        for member in self.members:
+            self._probe(member)
+
+    def stats(self) -> list:
+        return [
+            {
+                'provider': name,
+                'healthy': stats.healthy,
+                'avg_latency_ms': round(stats.avg_latency * 1000, 1),
+                'error_rate': round(stats.error_rate, 3),
+                'score': round(stats.score, 4),
+            }
+            for name, _, stats in self.members
+        ]
+
+
+class NonceManager:
+    """
+    Hands out sequential nonces for one signer
+
+    The next nonce is the larger of the local counter and the chain's pending
+    count, so a member lagging behind never causes a nonce to be reused.
+    """
+
+    def __init__(self, w3: Web3):
+        self.w3 = w3
+        self._next = {}
+        # address -> nonce of a transaction that may or may not have been broadcast
+        self._uncertain = {}
+        self.lock = threading.Lock()
+
+    def next_nonce(self, address: str) -> int:
+        """Reserve the next nonce; call with self.lock held until the transaction is sent"""
+        chain_nonce = self.w3.eth.get_transaction_count(address, 'pending')
+        uncertain = self._uncertain.pop(address, None)
+        if uncertain is not None and chain_nonce <= uncertain:
+            # The possibly sent transaction never reached the chain: resync to it
+            self._next[address] = chain_nonce
+        nonce = max(chain_nonce, self._next.get(address, 0))
+        self._next[address] = nonce + 1
+        return nonce
+
+    def release(self, address: str, nonce: int):
+        """Give back a nonce whose transaction was definitely rejected or never broadcast"""
+        if self._next.get(address) == nonce + 1:
+            self._next[address] = nonce
+
+    def mark_possibly_sent(self, address: str, nonce: int):
+        """
+        Keep a nonce whose transaction may have been broadcast
+
+        The next reservation checks the chain's pending count and only
+        reuses the nonce if the chain never saw the transaction.
+        """
+        self._uncertain[address] = nonce
+
+    def reset(self, address: str):
+        """Forget the local counter (e.g. after a 'nonce too low' error)"""
+        self._next.pop(address, None)
+        self._uncertain.pop(address, None)
+
+
+def _raw_tx_hash(raw_transaction):
+    return Web3.keccak(hexstr=raw_transaction) if isinstance(raw_transaction, str) else Web3.keccak(raw_transaction)
+
+
+def _never_reached(error) -> bool:
+    """True if a request certainly never reached the member (refused, or timed out connecting)"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+def _is_already_known(error) -> bool:
+    message = error.get('message', '') if isinstance(error, dict) else str(error)
+    return any(marker in message.lower() for marker in ALREADY_KNOWN_ERRORS)
+
+
+def _redact(url: str) -> str:
+    """Hide API keys in provider names (e.g. https://host/v2/<key>)"""
+    scheme, _, rest = url.partition("://")
+    host = rest.split("/", 1)[0]
+    return f"{scheme}://{host}" if rest != host else url
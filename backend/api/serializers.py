@@ -1,7 +1,49 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Activity
 
+# Every Activity column, in the order the API has always returned them
+ACTIVITY_FIELDS = (
+    'id', 'user', 'activity_type', 'data', 'predicted_emission', 'timestamp', 'transaction_hash',
+    'token_id', 'user_wallet', 'marketplace_status', 'listing_price',
+)
+
+
 class ActivitySerializer(serializers.ModelSerializer):
     class Meta:
         model = Activity
-        fields = '__all__'
+        fields = ACTIVITY_FIELDS
+
+
+def format_datetime(value, tz=None) -> str:
+    """
+    A datetime as DRF's DateTimeField renders it (ISO 8601 in the current timezone, 'Z' for UTC)
+
+    Pass tz=timezone.get_current_timezone() when formatting many values
+    to look the timezone up once.
+    """
+    if value is None:
+        return None
+    value = timezone.localtime(value, tz).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def serialize_activities(activities) -> list:
+    """
+    Same output as ActivitySerializer(activities, many=True).data, for list endpoints
+
+    Reads plain rows with .values() and formats the one column that needs
+    it, instead of building a model instance and running every serializer
+    field for each row.
+
+    Args:
+        activities: Activity queryset (filtered and ordered by the caller)
+
+    Returns:
+        list of dicts
+    """
+    rows = list(activities.values(*ACTIVITY_FIELDS))
+    tz = timezone.get_current_timezone()
+    for row in rows:
+        row['timestamp'] = format_datetime(row['timestamp'], tz)
+    return rows
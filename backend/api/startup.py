@@ -0,0 +1,37 @@
+# backend/api/startup.py
+"""
+Server start-up hooks.
+
+Heavy resources are created on first use rather than at import: web3, the
+RPC provider pool and the contract (web3_interact) and NumPy (analytics).
+manage.py commands, migrations and tests therefore start without them.
+
+Server processes call warm_up_on_start() from backend/wsgi.py and
+backend/asgi.py, so the first requests a worker serves don't pay for
+them either. `python manage.py bench_startup` keeps the cold start within
+budget.
+"""
+import os
+import time
+
+from .blockchain_utils import warm_up as warm_up_chain
+
+# Load heavy resources when a server process starts instead of on the first request
+WARM_UP_ON_START = os.getenv("WARM_UP_ON_START", "true").lower() in ("1", "true", "yes")
+
+
+def warm_up():
+    """Create the chain backend's clients and import the modules loaded on first use"""
+    start = time.perf_counter()
+    try:
+        warm_up_chain()
+    except Exception as e:
+        # The first chain request retries and reports the problem
+        print(f"Chain warm-up failed: {e}")
+    import numpy  # noqa: F401
+    print(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+def warm_up_on_start():
+    if WARM_UP_ON_START:
+        warm_up()
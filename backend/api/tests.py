@@ -0,0 +1,61 @@
+# backend/api/tests.py
+from django.test import TestCase, override_settings
+
+from api import blockchain_utils
+from api.blockchain_utils import get_transaction_receipts
+from api.leaderboard import ALL_TIME_START
+from api.models import Activity, LeaderboardScore, MarketPriceBucket, MarketplaceListing, PendingTransaction
+from api.tx_tracker import _apply_receipt, poll_pending_transactions
+
+
+class MarketplaceEventStreamTests(TestCase):
+
+    def test_event_source_accept_header_is_served(self):
+        response = self.client.get('/api/marketplace/events/', HTTP_ACCEPT='text/event-stream')
+        try:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            self.assertEqual(next(iter(response.streaming_content)), b'retry: 3000\n\n')
+        finally:
+            response.close()
+
+
+@override_settings(CHAIN_BACKEND='memory')
+class TransactionTrackerTests(TestCase):
+
+    def setUp(self):
+        blockchain_utils._backend = None
+        self.chain = blockchain_utils.get_chain_backend()
+
+    def tearDown(self):
+        blockchain_utils._backend = None
+
+    def test_receipt_seen_by_two_workers_is_applied_once(self):
+        seller_wallet = '0x' + '1' * 40
+        buyer_wallet = '0x' + '2' * 40
+        token_id = self.chain.mint_credit(seller_wallet, 2.0, 'tree_planting')['token_id']
+        self.chain.set_approval_for_all(seller_wallet, self.chain.get_backend_address(), True)
+        tx_hash = self.chain.transfer_nft(seller_wallet, buyer_wallet, token_id, wait_for_receipt=False)['transaction_hash']
+
+        activity = Activity.objects.create(
+            user='seller', activity_type='tree_planting', data={}, predicted_emission=2.0,
+            token_id=token_id, user_wallet=seller_wallet, marketplace_status='pending'
+        )
+        listing = MarketplaceListing.objects.create(
+            activity=activity, token_id=token_id, seller='seller', seller_wallet=seller_wallet,
+            price_eth=0.01, co2_grams=2000, activity_type='tree_planting', status='pending',
+            buyer='buyer', buyer_wallet=buyer_wallet, purchase_transaction_hash=tx_hash
+        )
+        PendingTransaction.objects.create(tx_hash=tx_hash, kind='transfer', listing=listing)
+
+        # Both workers' trackers read the row while it is still pending
+        other_worker = list(PendingTransaction.objects.filter(status='pending'))
+        self.assertEqual(poll_pending_transactions(), 1)
+        receipts = get_transaction_receipts([tx_hash])
+        self.assertFalse(_apply_receipt(other_worker[0], receipts[tx_hash]))
+        self.assertEqual(poll_pending_transactions(), 0)
+
+        self.assertEqual(MarketPriceBucket.objects.get(activity_type='tree_planting').trade_count, 1)
+        scores = LeaderboardScore.objects.filter(subject_type='user', period='all', period_start=ALL_TIME_START)
+        self.assertEqual(scores.get(subject='buyer').net_grams, 2000)
+        self.assertEqual(scores.get(subject='seller').net_grams, -2000)
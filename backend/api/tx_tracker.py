@@ -0,0 +1,261 @@
+# backend/api/tx_tracker.py
+"""
+Background confirmation tracker for transactions submitted without waiting.
+
+Views broadcast a transaction, call track_transaction() and return the hash
+straight away. A single daemon thread per process watches the head tracker's
+block number and, once per new block, fetches the receipts of every pending transaction in one
+batched RPC call, then moves the linked Activity records to their final state.
+
+Every worker process runs a tracker, so each receipt is seen once per
+worker. A tracker claims a row by switching it out of 'pending' with a
+conditional UPDATE, and only the one that claims it applies the
+receipt's side effects (activity and listing updates, price buckets,
+leaderboard scores), which are not idempotent.
+"""
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Activity, MarketplaceListing, PendingTransaction
+from .listing_cache import invalidate_listings
+from .events import record_events
+from .analytics import record_listing_sales
+from .leaderboard import record_listing_transfers
+from .orderbook import record_trade_purchases
+from .blockchain_utils import get_transaction_receipts, get_minted_token_id, invalidate_token_cache, get_block_number
+
+# Seconds between checks of the head tracker's block number
+POLL_INTERVAL = float(os.getenv("TX_TRACKER_POLL_INTERVAL", "1"))
+# Pending transactions with no receipt after this many seconds are marked failed
+DROP_TIMEOUT = int(os.getenv("TX_TRACKER_DROP_TIMEOUT", "1800"))
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def track_transaction(tx_hash: str, kind: str, activity=None, listing=None, nonce=None) -> PendingTransaction:
+    """
+    Record a submitted transaction and make sure the tracker is running
+
+    Args:
+        tx_hash: 0x-prefixed transaction hash
+        kind: 'mint' or 'transfer'
+        activity: Activity updated on confirmation (minted or purchase record)
+        listing: MarketplaceListing being sold, for transfers
+        nonce: Nonce the transaction was sent with
+
+    Returns:
+        the PendingTransaction row
+    """
+    pending = PendingTransaction.objects.create(
+        tx_hash=tx_hash,
+        kind=kind,
+        activity=activity,
+        listing=listing,
+        nonce=nonce
+    )
+    ensure_tracker_running()
+    return pending
+
+
+def ensure_tracker_running():
+    """Start the per-process tracker thread if it is not already running"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None or not _tracker.is_alive():
+            _tracker = TransactionTracker()
+            _tracker.start()
+    return _tracker
+
+
+def poll_pending_transactions() -> int:
+    """
+    Fetch receipts for all pending transactions in one batch and apply them
+
+    Returns:
+        number of transactions that reached a final state
+    """
+    pending = list(PendingTransaction.objects.filter(status='pending'))
+    if not pending:
+        return 0
+
+    receipts = get_transaction_receipts([p.tx_hash for p in pending])
+    drop_before = timezone.now() - timedelta(seconds=DROP_TIMEOUT)
+
+    finalized = 0
+    for pending_tx in pending:
+        receipt = receipts.get(pending_tx.tx_hash)
+        if receipt is not None:
+            finalized += _apply_receipt(pending_tx, receipt)
+        elif pending_tx.submitted_at < drop_before:
+            finalized += _mark_failed(pending_tx, "Transaction was not mined before the tracker timeout")
+    return finalized
+
+
+def _claim(pending_tx: PendingTransaction, **fields) -> bool:
+    """
+    Move a still-pending row to its final state, in the caller's transaction
+
+    Returns:
+        False if another worker's tracker already finalized it
+    """
+    claimed = PendingTransaction.objects.filter(pk=pending_tx.pk, status='pending').update(**fields)
+    for name, value in fields.items():
+        setattr(pending_tx, name, value)
+    return claimed == 1
+
+
+def _apply_receipt(pending_tx: PendingTransaction, receipt: dict) -> bool:
+    """
+    Move a pending transaction and its activities to confirmed or failed
+
+    Returns:
+        True if this call finalized it, False if another worker already had
+    """
+    if int(receipt.get('status', '0x0'), 16) != 1:
+        return _mark_failed(pending_tx, "Transaction was mined but failed on chain", receipt)
+
+    with transaction.atomic():
+        if not _claim(
+            pending_tx,
+            status='confirmed',
+            block_number=int(receipt['blockNumber'], 16),
+            gas_used=int(receipt['gasUsed'], 16),
+            confirmed_at=timezone.now()
+        ):
+            return False
+
+        if pending_tx.kind == 'mint' and pending_tx.activity:
+            pending_tx.activity.token_id = get_minted_token_id(receipt)
+            pending_tx.activity.save(update_fields=['token_id'])
+        elif pending_tx.kind == 'transfer' and pending_tx.listing:
+            listing = pending_tx.listing
+            sold_at = timezone.now()
+            MarketplaceListing.objects.filter(pk=listing.pk).update(status='sold', sold_at=sold_at)
+            Activity.objects.filter(pk=listing.activity_id).update(marketplace_status='sold')
+            record_listing_sales([listing], sold_at)
+            record_listing_transfers([listing], sold_at)
+            invalidate_token_cache(listing.token_id, listing.seller_wallet, listing.buyer_wallet)
+        elif pending_tx.kind == 'transfer' and pending_tx.activity and 'order_book_trade_id' in (pending_tx.activity.data or {}):
+            # An order book trade: scored only now that its transfer is confirmed
+            purchase = pending_tx.activity
+            record_trade_purchases([purchase])
+            invalidate_token_cache(purchase.token_id, purchase.data.get('seller_wallet'), purchase.data.get('buyer_wallet'))
+        elif pending_tx.kind == 'batch_transfer':
+            listings = list(MarketplaceListing.objects.filter(purchase_transaction_hash=pending_tx.tx_hash))
+            sold_at = timezone.now()
+            MarketplaceListing.objects.filter(pk__in=[l.pk for l in listings]).update(status='sold', sold_at=sold_at)
+            Activity.objects.filter(pk__in=[l.activity_id for l in listings]).update(marketplace_status='sold')
+            record_listing_sales(listings, sold_at)
+            record_listing_transfers(listings, sold_at)
+            for listing in listings:
+                invalidate_token_cache(listing.token_id, listing.seller_wallet, listing.buyer_wallet)
+
+    print(f"Confirmed {pending_tx.kind} {pending_tx.tx_hash} in block {pending_tx.block_number}")
+    return True
+
+
+def _mark_failed(pending_tx: PendingTransaction, error: str, receipt: dict = None) -> bool:
+    """
+    Mark a transaction failed and record the error on its activities
+
+    Returns:
+        True if this call finalized it, False if another worker already had
+    """
+    fields = {'status': 'failed', 'error': error, 'confirmed_at': timezone.now()}
+    if receipt:
+        fields['block_number'] = int(receipt['blockNumber'], 16)
+        fields['gas_used'] = int(receipt['gasUsed'], 16)
+
+    with transaction.atomic():
+        if not _claim(pending_tx, **fields):
+            return False
+
+        if pending_tx.activity:
+            pending_tx.activity.transaction_hash = f"Error: {error}"
+            pending_tx.activity.save(update_fields=['transaction_hash'])
+        if pending_tx.kind == 'transfer' and pending_tx.listing:
+            # Put the listing back on the market
+            listing = pending_tx.listing
+            MarketplaceListing.objects.filter(pk=listing.pk, status='pending').update(
+                status='listed',
+                reserved_by=None,
+                reserved_until=None,
+                buyer=None,
+                buyer_wallet=None,
+                purchase_activity=None,
+                purchase_transaction_hash=None
+            )
+            Activity.objects.filter(
+                pk=listing.activity_id,
+                marketplace_status='pending'
+            ).update(marketplace_status='listed')
+            _record_relisted([listing.pk])
+            invalidate_listings()
+        elif pending_tx.kind == 'batch_transfer':
+            # Put every listing in the checkout back on the market
+            listings = MarketplaceListing.objects.filter(
+                purchase_transaction_hash=pending_tx.tx_hash,
+                status='pending'
+            )
+            listing_ids, activity_ids = [], []
+            for listing_id, activity_id in listings.values_list('id', 'activity_id'):
+                listing_ids.append(listing_id)
+                activity_ids.append(activity_id)
+            listings.update(
+                status='listed',
+                reserved_by=None,
+                reserved_until=None,
+                buyer=None,
+                buyer_wallet=None,
+                purchase_activity=None,
+                purchase_transaction_hash=None
+            )
+            Activity.objects.filter(
+                pk__in=activity_ids,
+                marketplace_status='pending'
+            ).update(marketplace_status='listed')
+            Activity.objects.filter(
+                activity_type='marketplace_purchase',
+                transaction_hash=pending_tx.tx_hash
+            ).update(transaction_hash=f"Error: {error}")
+            _record_relisted(listing_ids)
+            invalidate_listings()
+
+    print(f"Failed {pending_tx.kind} {pending_tx.tx_hash}: {error}")
+    return True
+
+
+def _record_relisted(listing_ids: list):
+    """Announce listings that went back on the market after a failed sale"""
+    from .marketplace_views import serialize_listing
+
+    relisted = MarketplaceListing.objects.filter(pk__in=listing_ids, status='listed')
+    record_events([('listing_created', listing, serialize_listing(listing)) for listing in relisted])
+
+
+class TransactionTracker(threading.Thread):
+    """Daemon thread that polls receipts once per new block"""
+
+    def __init__(self):
+        super().__init__(name="tx-tracker", daemon=True)
+        self.last_block = None
+
+    def run(self):
+        print("Transaction tracker started")
+        while True:
+            try:
+                block_number = get_block_number()
+                if block_number != self.last_block:
+                    self.last_block = block_number
+                    poll_pending_transactions()
+            except Exception as e:
+                print(f"Transaction tracker error: {e}")
+            finally:
+                close_old_connections()
+            time.sleep(POLL_INTERVAL)
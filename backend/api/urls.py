@@ -1,28 +1,54 @@
 # backend/api/urls.py
 from django.urls import path
-from .views import log_activity, get_user_activities, get_blockchain_credits, blockchain_status
+from .views import (
+    log_activity, get_user_activities, get_transaction_status, get_chain_queue_metrics,
+    get_leaderboard_top, get_leaderboard_rank
+)
+from .async_views import get_blockchain_credits, blockchain_status, get_user_nft_credits, check_approval_status
 from .marketplace_views import (
     get_marketplace_listings,
-    get_user_nft_credits,
+    stream_marketplace_events,
+    get_marketplace_analytics,
     create_listing,
     buy_listing,
-    check_approval_status,
+    checkout,
+    check_approval_status_bulk,
     get_marketplace_contract_address,
     get_marketplace_history,
 )
+from .export_views import export_activities, export_marketplace_history
+from .orderbook_views import place_order, cancel_order, get_order_book_depth, get_order_book_trades
 
 urlpatterns = [
     path('log/', log_activity, name='log_activity'),
     path('activities/<str:username>/', get_user_activities, name='get_user_activities'),
     path('credits/<str:wallet_address>/', get_blockchain_credits, name='get_blockchain_credits'),
     path('blockchain/status/', blockchain_status, name='blockchain_status'),
+    path('transactions/<str:tx_hash>/', get_transaction_status, name='get_transaction_status'),
+    path('chain-queue/', get_chain_queue_metrics, name='get_chain_queue_metrics'),
+    path('leaderboard/', get_leaderboard_top, name='get_leaderboard_top'),
+    path('leaderboard/<str:name>/', get_leaderboard_rank, name='get_leaderboard_rank'),
 
     # Marketplace endpoints
     path('marketplace/listings/', get_marketplace_listings, name='get_marketplace_listings'),
+    path('marketplace/events/', stream_marketplace_events, name='stream_marketplace_events'),
+    path('marketplace/analytics/', get_marketplace_analytics, name='get_marketplace_analytics'),
     path('marketplace/user-credits/<str:wallet_address>/', get_user_nft_credits, name='get_user_nft_credits'),
     path('marketplace/create/', create_listing, name='create_listing'),
     path('marketplace/buy/<str:listing_id>/', buy_listing, name='buy_listing'),
+    path('marketplace/checkout/', checkout, name='checkout'),
     path('marketplace/check-approval/<str:token_id>/<str:owner_address>/', check_approval_status, name='check_approval_status'),
+    path('marketplace/check-approvals/', check_approval_status_bulk, name='check_approval_status_bulk'),
     path('marketplace/contract-address/', get_marketplace_contract_address, name='get_marketplace_contract_address'),
     path('marketplace/history/<str:wallet_address>/', get_marketplace_history, name='get_marketplace_history'),
+
+    # Streaming exports
+    path('exports/activities/', export_activities, name='export_activities'),
+    path('exports/marketplace-history/<str:wallet_address>/', export_marketplace_history, name='export_marketplace_history'),
+
+    # Order book endpoints
+    path('orderbook/orders/', place_order, name='place_order'),
+    path('orderbook/orders/<str:order_id>/cancel/', cancel_order, name='cancel_order'),
+    path('orderbook/trades/<str:wallet_address>/', get_order_book_trades, name='get_order_book_trades'),
+    path('orderbook/<str:activity_type>/<str:vintage>/', get_order_book_depth, name='get_order_book_depth'),
 ]
\ No newline at end of file
@@ -1,11 +1,17 @@
 # backend/api/views.py
 import requests
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Activity
+from .models import Activity, PendingTransaction
 from .serializers import ActivitySerializer
-from .web3_interact import mint_credit, get_user_credits, get_connection_status
+from .archive import get_user_activity_page
+from .pagination import InvalidCursor, parse_page_size
+from .renderers import FAST_RENDERERS
+from .blockchain_utils import mint_credit, parse_wait_for_confirmation
+from .tx_tracker import track_transaction, ensure_tracker_running
+from .leaderboard import PERIODS, SUBJECT_TYPES, get_leaderboard, record_activity
+from .admission import AdmissionRejected, admit_chain_write, get_admission_controller
 import os
 from dotenv import load_dotenv
 
@@ -34,9 +40,14 @@ def log_activity(request):
         "activity_type": "transport|electricity|waste|tree_planting|etc",
         "activity": "drove 20 km to work",
         "user_wallet": "0x..." (optional but required for NFT minting),
-        "is_offset": true/false (optional, determines if this is an offset activity)
+        "is_offset": true/false (optional, determines if this is an offset activity),
+        "wait_for_confirmation": true/false (optional, defaults to not ASYNC_TX_SUBMISSION)
     }
 
+    When not waiting for confirmation, the response carries the transaction
+    hash with "transaction_status": "pending" and token_id null; poll
+    /api/transactions/<tx_hash>/ for the final state.
+
     Response:
     {
         "id": 1,
@@ -58,6 +69,7 @@ def log_activity(request):
     activity_description = payload.get('activity', '')
     user_wallet = payload.get('user_wallet')
     is_offset = payload.get('is_offset', False)
+    wait_for_confirmation = parse_wait_for_confirmation(payload.get('wait_for_confirmation'))
 
     # Determine if this is an offset activity
     is_offset_activity = is_offset or activity_type in OFFSET_ACTIVITY_TYPES
@@ -86,18 +98,23 @@ def log_activity(request):
         predicted_emission=predicted_emission,
         user_wallet=user_wallet
     )
+    record_activity(activity, is_offset_activity)
 
     # Step 3: Mint blockchain NFT credit ONLY for offset activities with wallet
     token_id = None
     transaction_hash = None
+    transaction_status = None
 
     if is_offset_activity and user_wallet and user_wallet != '0x0000000000000000000000000000000000000000':
         print(f"Offset activity detected: {activity_type}. Proceeding with NFT minting...")
         try:
+            # Waits for this wallet's turn if it (or the signer) is over its mint rate
+            admit_chain_write('mint', wallet=user_wallet, user=user)
             mint_result = mint_credit(
                 user_address=user_wallet,
                 emission_amount=predicted_emission,
-                activity_type=activity_type
+                activity_type=activity_type,
+                wait_for_receipt=wait_for_confirmation
             )
 
             if mint_result.get('success'):
@@ -109,16 +126,32 @@ def log_activity(request):
                 activity.token_id = token_id
                 activity.transaction_hash = transaction_hash
                 activity.save()
+
+                if mint_result.get('pending'):
+                    # Token ID is filled in by the tracker once the mint confirms
+                    track_transaction(transaction_hash, 'mint', activity=activity, nonce=mint_result.get('nonce'))
+                    transaction_status = 'pending'
+                else:
+                    transaction_status = 'confirmed'
             else:
                 print(f"Minting failed: {mint_result.get('error')}")
                 transaction_hash = f"Error: {mint_result.get('error', 'Unknown error')}"
+                transaction_status = 'failed'
                 # Save error to database
                 activity.transaction_hash = transaction_hash
                 activity.save()
 
+        except AdmissionRejected as e:
+            print(f"Mint not admitted for {user_wallet}: {e}")
+            transaction_hash = f"Error: {e}"
+            transaction_status = 'rate_limited'
+            activity.transaction_hash = transaction_hash
+            activity.save()
+
         except Exception as e:
             print(f"Blockchain mint error: {e}")
             transaction_hash = f"Error: {str(e)}"
+            transaction_status = 'failed'
             # Save error to database
             activity.transaction_hash = transaction_hash
             activity.save()
@@ -140,21 +173,73 @@ def log_activity(request):
     result['transaction_hash'] = transaction_hash or "Activity logged"
     result['token_id'] = token_id
     result['is_offset'] = is_offset_activity
+    result['transaction_status'] = transaction_status
 
     return Response(result, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
+def get_transaction_status(request, tx_hash):
+    """
+    Get the confirmation state of a transaction submitted without waiting.
+
+    URL: GET /api/transactions/<tx_hash>/
+    """
+    try:
+        pending_tx = PendingTransaction.objects.get(tx_hash=tx_hash)
+    except PendingTransaction.DoesNotExist:
+        return Response({
+            'success': False,
+            'error': 'Transaction not tracked'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if pending_tx.status == 'pending':
+        # Pick up rows left behind by a restarted worker
+        ensure_tracker_running()
+
+    activity = pending_tx.activity
+    return Response({
+        'success': True,
+        'transaction_hash': pending_tx.tx_hash,
+        'kind': pending_tx.kind,
+        'status': pending_tx.status,
+        'block_number': pending_tx.block_number,
+        'gas_used': pending_tx.gas_used,
+        'error': pending_tx.error or None,
+        'activity_id': pending_tx.activity_id,
+        'token_id': activity.token_id if activity else None,
+        'submitted_at': pending_tx.submitted_at,
+        'confirmed_at': pending_tx.confirmed_at,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@renderer_classes(FAST_RENDERERS)
 def get_user_activities(request, username):
     """
     Retrieve all activities for a specific user.
 
-    URL: GET /api/activities/<username>/
+    URL: GET /api/activities/<username>/?limit=50&cursor=...
+
+    Archived activities are included (see api/archive.py). Without limit
+    or cursor the whole history is returned; with them the response is
+    one page, and the X-Next-Cursor header carries the cursor for the
+    next one (absent on the last page).
     """
     try:
-        activities = Activity.objects.filter(user=username).order_by('-timestamp')
-        serializer = ActivitySerializer(activities, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        limit = request.query_params.get('limit')
+        cursor = request.query_params.get('cursor')
+        try:
+            if limit or cursor:
+                limit = parse_page_size(limit)
+            rows, next_cursor = get_user_activity_page(username, limit or None, cursor)
+        except (ValueError, InvalidCursor) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = Response(rows, status=status.HTTP_200_OK)
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+        return response
     except Exception as e:
         print(f"Error fetching activities: {e}")
         return Response(
@@ -164,47 +249,118 @@ def get_user_activities(request, username):
 
 
 @api_view(['GET'])
-def get_blockchain_credits(request, wallet_address):
+def get_chain_queue_metrics(request):
+    """
+    Admission queue for on-chain writes (mints and transfers), per wallet.
+
+    URL: GET /api/chain-queue/
+
+    Returns the writes waiting now (depth) and, per tenant (wallet, or
+    user:<name> without one), waiting writes, the oldest one's wait, counts
+    of admitted, queued and rejected writes, and average, recent average and
+    maximum wait in ms. Counts are for this worker process since it started.
+    """
+    return Response({
+        'success': True,
+        **get_admission_controller().metrics()
+    }, status=status.HTTP_200_OK)
+
+
+def _leaderboard_params(params) -> tuple:
+    """Parse ?period= and ?type=; raises ValueError"""
+    period = params.get('period', 'all')
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of: {', '.join(PERIODS)}")
+    subject_type = params.get('type', 'user')
+    if subject_type not in SUBJECT_TYPES:
+        raise ValueError(f"type must be one of: {', '.join(SUBJECT_TYPES)}")
+    return period, subject_type
+
+
+@api_view(['GET'])
+def get_leaderboard_top(request):
     """
-    Get all carbon credit NFTs for a wallet address directly from blockchain.
+    Users or companies ranked by net CO2 offset.
+
+    URL: GET /api/leaderboard/?period=week&type=user&limit=10&offset=0
 
-    URL: GET /api/credits/<wallet_address>/
+    period is week, month (both the current one) or all (default); type is
+    user (default) or company. Net offset is offset activities plus bought
+    credits minus emitting activities and sold credits, in grams. Tied
+    scores share a rank.
     """
     try:
-        result = get_user_credits(wallet_address)
-        if result.get('success'):
-            return Response({
-                'wallet': wallet_address,
-                'credits': result.get('credits', []),
-                'total_credits': len(result.get('credits', []))
-            }, status=status.HTTP_200_OK)
-        else:
-            return Response({
-                'error': result.get('error', 'Unknown error')
-            }, status=status.HTTP_400_BAD_REQUEST)
+        period, subject_type = _leaderboard_params(request.query_params)
+        limit = parse_page_size(request.query_params.get('limit'), default=10, maximum=100)
+        offset = max(0, int(request.query_params.get('offset') or 0))
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page = get_leaderboard().top(subject_type, period, limit, offset)
+        return Response({
+            'success': True,
+            'period': period,
+            'periodStart': page['period_start'].isoformat(),
+            'type': subject_type,
+            'total': page['total'],
+            'entries': [
+                {'rank': rank, 'name': name, 'netCo2Grams': net_grams}
+                for rank, name, net_grams in page['entries']
+            ]
+        }, status=status.HTTP_200_OK)
     except Exception as e:
-        print(f"Error fetching blockchain credits: {e}")
-        return Response(
-            {"error": str(e)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        print(f"Error reading leaderboard: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['GET'])
-def blockchain_status(request):
+def get_leaderboard_rank(request, name):
     """
-    Check blockchain connection status.
+    One user's or company's place on the leaderboard.
+
+    URL: GET /api/leaderboard/<name>/?period=week&type=user
 
-    URL: GET /api/blockchain/status/
+    Takes the same period and type as /api/leaderboard/. 404 if name has
+    no activity in the period.
     """
     try:
-        status_info = get_connection_status()
-        return Response(status_info, status=status.HTTP_200_OK)
+        period, subject_type = _leaderboard_params(request.query_params)
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        standing = get_leaderboard().rank(subject_type, period, name)
+        if standing['rank'] is None:
+            return Response({
+                'success': False,
+                'error': f"{name} is not on the {period} leaderboard"
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'success': True,
+            'period': period,
+            'periodStart': standing['period_start'].isoformat(),
+            'type': subject_type,
+            'name': name,
+            'rank': standing['rank'],
+            'netCo2Grams': standing['net_grams'],
+            'total': standing['total']
+        }, status=status.HTTP_200_OK)
     except Exception as e:
-        return Response(
-            {"error": str(e), "connected": False},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        print(f"Error reading leaderboard rank: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 def estimate_emission_fallback(activity_type: str, description: str) -> float:
@@ -1,19 +1,30 @@
 # backend/api/web3_interact.py
 import os
 import json
+from functools import lru_cache
+from eth_account import Account
 from web3 import Web3
 from pathlib import Path
 from dotenv import load_dotenv
 
+from .chain_cache import chain_cache
+from .rpc_pool import RPCProviderPool, NonceManager, TransactionPossiblySent
+
 # Load environment variables
 load_dotenv()
 
 RPC_URL = os.getenv("RPC_URL", "https://eth-sepolia.g.alchemy.com/v2/YOUR-PROJECT-ID")
+# Comma-separated list of RPC endpoints; falls back to the single RPC_URL
+RPC_URLS = [url.strip() for url in os.getenv("RPC_URLS", RPC_URL).split(",") if url.strip()]
 CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "0x100bd2512011b0e93A01266a646ba8eB4dee5312")
 PRIVATE_KEY = os.getenv("PRIVATE_KEY", "")
 
-# Initialize Web3
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+# Number of token IDs fetched per getUserCreditsPaged call
+CREDITS_PAGE_SIZE = int(os.getenv("CREDITS_PAGE_SIZE", "100"))
+
+# Gas budget per token for batchTransferFrom, plus a fixed overhead per transaction
+BATCH_TRANSFER_GAS_PER_TOKEN = int(os.getenv("BATCH_TRANSFER_GAS_PER_TOKEN", "80000"))
+BATCH_TRANSFER_BASE_GAS = 50000
 
 # Contract ABI matching CarbonCredit.sol
 CONTRACT_ABI = [
@@ -34,9 +45,9 @@ CONTRACT_ABI = [
         "outputs": [
             {
                 "components": [
-                    {"internalType": "uint256", "name": "co2Amount", "type": "uint256"},
-                    {"internalType": "uint256", "name": "timestamp", "type": "uint256"},
-                    {"internalType": "string", "name": "activityType", "type": "string"}
+                    {"internalType": "uint128", "name": "co2Amount", "type": "uint128"},
+                    {"internalType": "uint64", "name": "timestamp", "type": "uint64"},
+                    {"internalType": "bytes32", "name": "activityType", "type": "bytes32"}
                 ],
                 "internalType": "struct CarbonCredit.Credit",
                 "name": "",
@@ -53,6 +64,17 @@ CONTRACT_ABI = [
         "stateMutability": "view",
         "type": "function"
     },
+    {
+        "inputs": [
+            {"internalType": "address", "name": "user", "type": "address"},
+            {"internalType": "uint256", "name": "offset", "type": "uint256"},
+            {"internalType": "uint256", "name": "limit", "type": "uint256"}
+        ],
+        "name": "getUserCreditsPaged",
+        "outputs": [{"internalType": "uint256[]", "name": "", "type": "uint256[]"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
     {
         "inputs": [{"internalType": "address", "name": "owner", "type": "address"}],
         "name": "balanceOf",
@@ -108,6 +130,17 @@ CONTRACT_ABI = [
         "stateMutability": "nonpayable",
         "type": "function"
     },
+    {
+        "inputs": [
+            {"internalType": "address[]", "name": "from", "type": "address[]"},
+            {"internalType": "address", "name": "to", "type": "address"},
+            {"internalType": "uint256[]", "name": "tokenIds", "type": "uint256[]"}
+        ],
+        "name": "batchTransferFrom",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
     {
         "inputs": [
             {"internalType": "address", "name": "from", "type": "address"},
@@ -134,14 +167,21 @@ CONTRACT_ABI = [
             {"indexed": True, "internalType": "address", "name": "user", "type": "address"},
             {"indexed": True, "internalType": "uint256", "name": "tokenId", "type": "uint256"},
             {"indexed": False, "internalType": "uint256", "name": "co2Amount", "type": "uint256"},
-            {"indexed": False, "internalType": "string", "name": "activityType", "type": "string"}
+            {"indexed": False, "internalType": "bytes32", "name": "activityType", "type": "bytes32"}
         ],
         "name": "CreditMinted",
         "type": "event"
     }
 ]
 
+# topic0 of CreditMinted, used to read token IDs from raw receipt logs
+CREDIT_MINTED_TOPIC = Web3.keccak(text="CreditMinted(address,uint256,uint256,bytes32)").hex()
+
+# The contract packs a credit's activity type into a bytes32
+MAX_ACTIVITY_TYPE_BYTES = 32
+
 # Load ABI from file if available, otherwise use inline
+@lru_cache(maxsize=1)
 def load_contract_abi():
     """Load the contract ABI from the JSON file"""
     possible_paths = [
@@ -162,17 +202,233 @@ def load_contract_abi():
     print("Using inline ABI for CarbonCredit contract")
     return CONTRACT_ABI
 
-# Load ABI and create contract instance
-try:
-    contract_abi = load_contract_abi()
-    contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=contract_abi)
-    print(f"Contract loaded at {CONTRACT_ADDRESS}")
-except Exception as e:
-    print(f"Error loading contract: {e}")
-    contract = None
 
+# ---------------- Lazily created chain objects ---------------- #
+# Nothing below runs at import time, so manage.py commands, migrations and
+# workers that never touch the chain don't pay for it. warm_up() builds
+# everything ahead of the first request.
+
+@lru_cache(maxsize=1)
+def get_rpc_pool() -> RPCProviderPool:
+    """Pool of providers over RPC_URLS (reads go to the fastest healthy
+    endpoint, transaction broadcasts fail over between them)"""
+    return RPCProviderPool.from_urls(RPC_URLS)
+
+
+@lru_cache(maxsize=1)
+def get_w3() -> Web3:
+    return Web3(get_rpc_pool())
 
-def mint_credit(user_address: str, emission_amount: float, activity_type: str = "general") -> dict:
+
+@lru_cache(maxsize=1)
+def get_nonce_manager() -> NonceManager:
+    """Hands out backend-wallet nonces consistently across pool members"""
+    return NonceManager(get_w3())
+
+
+@lru_cache(maxsize=1)
+def get_contract():
+    """The CarbonCredit contract at CONTRACT_ADDRESS, or None if it can't be set up"""
+    try:
+        contract = get_w3().eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=load_contract_abi())
+        print(f"Contract loaded at {CONTRACT_ADDRESS}")
+        return contract
+    except Exception as e:
+        print(f"Error loading contract: {e}")
+        return None
+
+
+def warm_up():
+    """Create the provider pool, contract and backend account ahead of the first request"""
+    get_contract()
+    get_nonce_manager()
+    if PRIVATE_KEY:
+        get_backend_account()
+
+
+_LAZY_ATTRIBUTES = {
+    'rpc_pool': get_rpc_pool,
+    'w3': get_w3,
+    'nonce_manager': get_nonce_manager,
+    'contract': get_contract,
+    'contract_abi': load_contract_abi,
+}
+
+
+def __getattr__(name):
+    """Keep `web3_interact.w3`, `.contract` and friends working for existing callers"""
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ---------------- Cached contract reads ---------------- #
+
+def cached_owner_of(token_id: int, fresh: bool = False) -> str:
+    """ownerOf(tokenId), cached for CHAIN_CACHE_OWNERSHIP_TTL seconds"""
+    contract = get_contract()
+    return chain_cache.get_or_fetch(
+        'ownerOf', (token_id,),
+        lambda: contract.functions.ownerOf(token_id).call(),
+        fresh=fresh
+    )
+
+
+def cached_balance_of(owner_address: str, fresh: bool = False) -> int:
+    """balanceOf(owner), cached for CHAIN_CACHE_OWNERSHIP_TTL seconds"""
+    contract = get_contract()
+    return chain_cache.get_or_fetch(
+        'balanceOf', (owner_address,),
+        lambda: contract.functions.balanceOf(owner_address).call(),
+        fresh=fresh
+    )
+
+
+def cached_get_approved(token_id: int, fresh: bool = False) -> str:
+    """getApproved(tokenId), cached for CHAIN_CACHE_APPROVAL_TTL seconds"""
+    contract = get_contract()
+    return chain_cache.get_or_fetch(
+        'getApproved', (token_id,),
+        lambda: contract.functions.getApproved(token_id).call(),
+        fresh=fresh
+    )
+
+
+def cached_get_approved_many(token_ids: list, fresh: bool = False) -> list:
+    """getApproved for many tokens; cache misses are fetched in one batched request"""
+    return chain_cache.get_many_or_fetch(
+        'getApproved', [(token_id,) for token_id in token_ids],
+        lambda missing: batch_contract_calls([('getApproved', list(args), 'address') for args in missing]),
+        fresh=fresh
+    )
+
+
+def cached_is_approved_for_all(owner_address: str, operator_address: str, fresh: bool = False) -> bool:
+    """isApprovedForAll(owner, operator), cached for CHAIN_CACHE_APPROVAL_TTL seconds"""
+    contract = get_contract()
+    return chain_cache.get_or_fetch(
+        'isApprovedForAll', (owner_address, operator_address),
+        lambda: contract.functions.isApprovedForAll(owner_address, operator_address).call(),
+        fresh=fresh
+    )
+
+
+def cached_get_credit(token_id: int):
+    """getCredit(tokenId); credits are immutable after mint so this is cached forever"""
+    contract = get_contract()
+    return chain_cache.get_or_fetch(
+        'getCredit', (token_id,),
+        lambda: tuple(contract.functions.getCredit(token_id).call())
+    )
+
+
+def decode_activity_type(value) -> str:
+    """Activity type of a getCredit result: zero-padded UTF-8 bytes32 (a string on unpacked deployments)"""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).rstrip(b'\0').decode('utf-8', errors='replace')
+    return value
+
+
+def format_credit(token_id: int, credit_data) -> dict:
+    """API representation of a getCredit (co2Amount, timestamp, activityType) result"""
+    return {
+        'token_id': token_id,
+        'co2_amount_grams': credit_data[0],
+        'co2_amount_kg': credit_data[0] / 1000,
+        'timestamp': credit_data[1],
+        'activity_type': decode_activity_type(credit_data[2])
+    }
+
+
+def invalidate_token_cache(token_id: int, *owner_addresses: str):
+    """
+    Drop cached ownership/approval entries touched by a transfer of token_id
+
+    Transfers clear the token's single approval, so getApproved goes too.
+    """
+    chain_cache.invalidate('ownerOf', token_id)
+    chain_cache.invalidate('getApproved', token_id)
+    for owner_address in owner_addresses:
+        if owner_address:
+            chain_cache.invalidate('balanceOf', Web3.to_checksum_address(owner_address))
+
+
+def _to_hex_hash(tx_hash) -> str:
+    """Normalize a transaction hash to a 0x-prefixed hex string"""
+    tx_hash_hex = tx_hash.hex() if hasattr(tx_hash, 'hex') else str(tx_hash)
+    return tx_hash_hex if tx_hash_hex.startswith('0x') else f'0x{tx_hash_hex}'
+
+
+@lru_cache(maxsize=1)
+def get_backend_account():
+    """
+    The backend wallet's account, derived from PRIVATE_KEY once per process
+
+    Raises:
+        Exception: if PRIVATE_KEY is not set
+    """
+    if not PRIVATE_KEY:
+        raise Exception("PRIVATE_KEY not set in environment")
+    private_key = PRIVATE_KEY if PRIVATE_KEY.startswith('0x') else f'0x{PRIVATE_KEY}'
+    return Account.from_key(private_key)
+
+
+def _send_contract_transaction(contract_function, account, private_key: str, gas: int) -> tuple:
+    """
+    Build, sign and broadcast a contract call from the backend wallet
+
+    Nonces come from the NonceManager under its lock so several submissions
+    in flight at once, or a failover between RPC providers, never reuse or
+    skip a nonce. A nonce is only given back when its transaction was
+    definitely not broadcast.
+
+    Returns:
+        tuple of (tx_hash, nonce)
+    """
+    from .head_tracker import get_head_tracker
+
+    w3 = get_w3()
+    nonce_manager = get_nonce_manager()
+
+    # Fees and chain ID come from the head tracker's in-memory snapshot
+    head_tracker = get_head_tracker()
+    fee_fields = head_tracker.fee_fields()
+    chain_id = head_tracker.chain_id or w3.eth.chain_id
+
+    with nonce_manager.lock:
+        nonce = nonce_manager.next_nonce(account.address)
+        try:
+            transaction = contract_function.build_transaction({
+                'from': account.address,
+                'nonce': nonce,
+                'gas': gas,
+                'chainId': chain_id,
+                **fee_fields
+            })
+
+            # Sign transaction
+            signed_txn = w3.eth.account.sign_transaction(transaction, private_key)
+
+            # Send transaction
+            tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        except TransactionPossiblySent as e:
+            # A node may have it: keep the nonce and let the caller follow the hash
+            # (the tracker marks it failed if it is never mined)
+            print(f"Transaction {_to_hex_hash(e.tx_hash)} may not have been broadcast: {e}")
+            nonce_manager.mark_possibly_sent(account.address, nonce)
+            return e.tx_hash, nonce
+        except Exception as e:
+            if "nonce" in str(e).lower():
+                nonce_manager.reset(account.address)
+            else:
+                nonce_manager.release(account.address, nonce)
+            raise
+
+    return tx_hash, nonce
+
+
+def mint_credit(user_address: str, emission_amount: float, activity_type: str = "general",
+                wait_for_receipt: bool = True) -> dict:
     """
     Mint carbon credits to a user address as an NFT
 
@@ -180,10 +436,14 @@ def mint_credit(user_address: str, emission_amount: float, activity_type: str =
         user_address: Ethereum address of the user
         emission_amount: Amount of CO2 emissions in kg
         activity_type: Type of activity (transport, electricity, etc.)
+        wait_for_receipt: If False, return as soon as the transaction is
+            broadcast (token_id is then None and 'pending' is True)
 
     Returns:
         dict with success status, token_id, and transaction_hash
     """
+    contract = get_contract()
+    w3 = get_w3()
     try:
         if not contract:
             raise Exception("Contract not initialized")
@@ -197,33 +457,36 @@ def mint_credit(user_address: str, emission_amount: float, activity_type: str =
 
         user_address = Web3.to_checksum_address(user_address)
 
-        # Get account from private key
-        private_key = PRIVATE_KEY if PRIVATE_KEY.startswith('0x') else f'0x{PRIVATE_KEY}'
-        account = w3.eth.account.from_key(private_key)
+        account = get_backend_account()
 
         # Convert kg to grams for contract (contract stores in grams)
         co2_grams = int(emission_amount * 1000)
 
+        if len(activity_type.encode()) > MAX_ACTIVITY_TYPE_BYTES:
+            raise Exception(f"Activity type longer than {MAX_ACTIVITY_TYPE_BYTES} bytes: {activity_type}")
+
         print(f"Minting {co2_grams}g CO2 credit to {user_address} for {activity_type}")
 
-        # Build transaction
-        transaction = contract.functions.mintCredit(
-            user_address,
-            co2_grams,
-            activity_type
-        ).build_transaction({
-            'from': account.address,
-            'nonce': w3.eth.get_transaction_count(account.address),
-            'gas': 300000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': w3.eth.chain_id
-        })
-
-        # Sign transaction
-        signed_txn = w3.eth.account.sign_transaction(transaction, private_key)
-
-        # Send transaction
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        tx_hash, nonce = _send_contract_transaction(
+            contract.functions.mintCredit(user_address, co2_grams, activity_type),
+            account,
+            account.key,
+            gas=300000
+        )
+
+        chain_cache.invalidate('balanceOf', user_address)
+
+        if not wait_for_receipt:
+            tx_hash_hex = _to_hex_hash(tx_hash)
+            print(f"Mint submitted, TX: {tx_hash_hex} (nonce {nonce})")
+            return {
+                'success': True,
+                'pending': True,
+                'token_id': None,
+                'transaction_hash': tx_hash_hex,
+                'co2_grams': co2_grams,
+                'nonce': nonce
+            }
 
         # Wait for transaction receipt
         tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
@@ -238,7 +501,8 @@ def mint_credit(user_address: str, emission_amount: float, activity_type: str =
             except Exception as e:
                 print(f"Could not extract token ID from logs: {e}")
 
-            tx_hash_hex = tx_hash.hex() if tx_hash.hex().startswith('0x') else f'0x{tx_hash.hex()}'
+            tx_hash_hex = _to_hex_hash(tx_hash)
+            chain_cache.invalidate('balanceOf', user_address)
             print(f"Successfully minted! TX: {tx_hash_hex}, Token ID: {token_id}")
             return {
                 'success': True,
@@ -263,37 +527,65 @@ def mint_credit(user_address: str, emission_amount: float, activity_type: str =
 
 def get_user_balance(user_address: str) -> int:
     """Get the NFT token count of a user"""
+    contract = get_contract()
     try:
         if not contract:
             return 0
 
         user_address = Web3.to_checksum_address(user_address)
-        balance = contract.functions.balanceOf(user_address).call()
+        balance = cached_balance_of(user_address)
         return balance
     except Exception as e:
         print(f"Error getting balance: {e}")
         return 0
 
 
+def get_user_token_ids(user_address: str, page_size: int = CREDITS_PAGE_SIZE) -> list:
+    """
+    Get all token IDs owned by a user, one getUserCreditsPaged page at a time
+
+    Each page is a separate eth_call whose cost depends only on the page size,
+    so large wallets never hit the RPC gas cap. Contracts deployed before the
+    paged accessor existed fall back to a single getUserCredits call.
+
+    Args:
+        user_address: Checksummed Ethereum address of the owner
+        page_size: Number of token IDs requested per call
+
+    Returns:
+        list of token IDs
+    """
+    contract = get_contract()
+    # Fresh, so a balance cached before a mint or transfer can't cut the last page short
+    balance = cached_balance_of(user_address, fresh=True)
+    if balance == 0:
+        return []
+
+    token_ids = []
+    try:
+        for offset in range(0, balance, page_size):
+            page = contract.functions.getUserCreditsPaged(user_address, offset, page_size).call()
+            token_ids.extend(page)
+            if len(page) < page_size:
+                break
+    except Exception as e:
+        print(f"Paged credit lookup unavailable, falling back to getUserCredits: {e}")
+        token_ids = contract.functions.getUserCredits(user_address).call()
+
+    return token_ids
+
+
 def get_user_credits(user_address: str) -> dict:
     """Get all credit details for a user"""
+    contract = get_contract()
     try:
         if not contract:
             return {'success': False, 'error': 'Contract not initialized', 'credits': []}
 
         user_address = Web3.to_checksum_address(user_address)
-        token_ids = contract.functions.getUserCredits(user_address).call()
+        token_ids = get_user_token_ids(user_address)
 
-        credits = []
-        for token_id in token_ids:
-            credit_data = contract.functions.getCredit(token_id).call()
-            credits.append({
-                'token_id': token_id,
-                'co2_amount_grams': credit_data[0],
-                'co2_amount_kg': credit_data[0] / 1000,
-                'timestamp': credit_data[1],
-                'activity_type': credit_data[2]
-            })
+        credits = [format_credit(token_id, cached_get_credit(token_id)) for token_id in token_ids]
 
         return {'success': True, 'credits': credits}
 
@@ -302,7 +594,7 @@ def get_user_credits(user_address: str) -> dict:
         return {'success': False, 'error': str(e), 'credits': []}
 
 
-def transfer_nft(from_address: str, to_address: str, token_id: int) -> dict:
+def transfer_nft(from_address: str, to_address: str, token_id: int, wait_for_receipt: bool = True) -> dict:
     """
     Transfer an NFT from one address to another (for marketplace purchases)
 
@@ -319,10 +611,14 @@ def transfer_nft(from_address: str, to_address: str, token_id: int) -> dict:
         from_address: Current owner's address
         to_address: Buyer's address
         token_id: Token ID to transfer
+        wait_for_receipt: If False, return as soon as the transaction is
+            broadcast ('pending' is then True)
 
     Returns:
         dict with success status and transaction_hash
     """
+    contract = get_contract()
+    w3 = get_w3()
     try:
         if not contract:
             raise Exception("Contract not initialized")
@@ -337,15 +633,14 @@ def transfer_nft(from_address: str, to_address: str, token_id: int) -> dict:
         from_address = Web3.to_checksum_address(from_address)
         to_address = Web3.to_checksum_address(to_address)
 
-        # Get account from private key (should be contract owner)
-        private_key = PRIVATE_KEY if PRIVATE_KEY.startswith('0x') else f'0x{PRIVATE_KEY}'
-        account = w3.eth.account.from_key(private_key)
+        # Backend wallet (should be contract owner)
+        account = get_backend_account()
 
         print(f"Transferring NFT #{token_id} from {from_address} to {to_address}")
 
-        # First verify the current owner
+        # First verify the current owner (always read from chain before writing)
         try:
-            current_owner = contract.functions.ownerOf(token_id).call()
+            current_owner = cached_owner_of(token_id, fresh=True)
             if current_owner.lower() != from_address.lower():
                 raise Exception(f"NFT #{token_id} is not owned by {from_address}. Current owner: {current_owner}")
         except Exception as e:
@@ -353,8 +648,8 @@ def transfer_nft(from_address: str, to_address: str, token_id: int) -> dict:
 
         # Check if backend wallet is approved
         try:
-            approved_address = contract.functions.getApproved(token_id).call()
-            is_approved_for_all = contract.functions.isApprovedForAll(from_address, account.address).call()
+            approved_address = cached_get_approved(token_id, fresh=True)
+            is_approved_for_all = cached_is_approved_for_all(from_address, account.address, fresh=True)
 
             if approved_address.lower() != account.address.lower() and not is_approved_for_all:
                 raise Exception(
@@ -367,30 +662,32 @@ def transfer_nft(from_address: str, to_address: str, token_id: int) -> dict:
                 raise e
             print(f"Warning: Could not verify approval status: {e}")
 
-        # Build transfer transaction
-        transaction = contract.functions.transferFrom(
-            from_address,
-            to_address,
-            token_id
-        ).build_transaction({
-            'from': account.address,
-            'nonce': w3.eth.get_transaction_count(account.address),
-            'gas': 200000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': w3.eth.chain_id
-        })
-
-        # Sign transaction
-        signed_txn = w3.eth.account.sign_transaction(transaction, private_key)
-
-        # Send transaction
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        tx_hash, nonce = _send_contract_transaction(
+            contract.functions.transferFrom(from_address, to_address, token_id),
+            account,
+            account.key,
+            gas=200000
+        )
+
+        invalidate_token_cache(token_id, from_address, to_address)
+
+        if not wait_for_receipt:
+            tx_hash_hex = _to_hex_hash(tx_hash)
+            print(f"Transfer submitted, TX: {tx_hash_hex} (nonce {nonce})")
+            return {
+                'success': True,
+                'pending': True,
+                'transaction_hash': tx_hash_hex,
+                'nonce': nonce
+            }
 
         # Wait for transaction receipt
         tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
 
         if tx_receipt['status'] == 1:
-            tx_hash_hex = tx_hash.hex() if tx_hash.hex().startswith('0x') else f'0x{tx_hash.hex()}'
+            tx_hash_hex = _to_hex_hash(tx_hash)
+            # Reads made while the transfer was in flight may have re-cached the old owner
+            invalidate_token_cache(token_id, from_address, to_address)
             print(f"Transfer successful! TX: {tx_hash_hex}")
             return {
                 'success': True,
@@ -420,31 +717,222 @@ def transfer_nft(from_address: str, to_address: str, token_id: int) -> dict:
         }
 
 
-def check_nft_approval(owner_address: str, token_id: int) -> dict:
+def batch_contract_calls(calls: list) -> list:
+    """
+    Run many read-only contract calls in one JSON-RPC batch request
+
+    Args:
+        calls: list of (function name, args, output type) tuples,
+            e.g. ('ownerOf', [5], 'address')
+
+    Returns:
+        list of decoded results in call order; an Exception instance in
+        place of any call that reverted or errored
+    """
+    contract = get_contract()
+    w3 = get_w3()
+    if not calls:
+        return []
+
+    responses = w3.provider.make_batch_request([
+        ("eth_call", [{'to': contract.address, 'data': contract.encode_abi(name, args=args)}, 'latest'])
+        for name, args, _ in calls
+    ])
+    if isinstance(responses, dict):
+        raise Exception(responses.get('error', 'Batch request failed'))
+
+    results = []
+    for (name, args, output_type), response in zip(calls, responses):
+        if response.get('error') or response.get('result') in (None, '0x'):
+            results.append(Exception(f"{name}{tuple(args)} failed: {response.get('error')}"))
+        else:
+            results.append(w3.codec.decode([output_type], bytes.fromhex(response['result'][2:]))[0])
+    return results
+
+
+def batch_transfer_nfts(transfers: list, to_address: str, wait_for_receipt: bool = True) -> dict:
+    """
+    Transfer several NFTs, possibly from different sellers, to one buyer in a single transaction
+
+    Ownership of every token and the backend wallet's approvals are checked
+    with one batched read first; any problem fails the whole batch before
+    anything is sent. The contract's batchTransferFrom reverts atomically.
+
+    Args:
+        transfers: list of (from_address, token_id) pairs
+        to_address: Buyer's address
+        wait_for_receipt: If False, return as soon as the transaction is
+            broadcast ('pending' is then True)
+
+    Returns:
+        dict with success status and transaction_hash; on a failed check,
+        'failed_tokens' lists the token IDs that cannot be transferred
+    """
+    contract = get_contract()
+    w3 = get_w3()
+    try:
+        if not contract:
+            raise Exception("Contract not initialized")
+
+        if not PRIVATE_KEY:
+            raise Exception("PRIVATE_KEY not set in environment")
+
+        if not transfers:
+            raise Exception("No tokens to transfer")
+
+        if not Web3.is_address(to_address) or not all(Web3.is_address(f) for f, _ in transfers):
+            raise Exception("Invalid Ethereum addresses")
+
+        to_address = Web3.to_checksum_address(to_address)
+        transfers = [(Web3.to_checksum_address(f), int(token_id)) for f, token_id in transfers]
+
+        account = get_backend_account()
+
+        # One round trip: ownerOf and getApproved per token, isApprovedForAll per seller
+        sellers = sorted({f for f, _ in transfers})
+        calls = [('ownerOf', [token_id], 'address') for _, token_id in transfers]
+        calls += [('getApproved', [token_id], 'address') for _, token_id in transfers]
+        calls += [('isApprovedForAll', [seller, account.address], 'bool') for seller in sellers]
+        results = batch_contract_calls(calls)
+
+        count = len(transfers)
+        owners, approvals = results[:count], results[count:2 * count]
+        approved_for_all = dict(zip(sellers, results[2 * count:]))
+
+        failed_tokens = []
+        errors = []
+        for (from_address, token_id), owner, approved in zip(transfers, owners, approvals):
+            if isinstance(owner, Exception) or owner.lower() != from_address.lower():
+                failed_tokens.append(token_id)
+                errors.append(f"NFT #{token_id} is not owned by {from_address}")
+            elif approved_for_all.get(from_address) is not True and (
+                    isinstance(approved, Exception) or approved.lower() != account.address.lower()):
+                failed_tokens.append(token_id)
+                errors.append(f"Backend wallet {account.address} is not approved to transfer NFT #{token_id}")
+
+        if failed_tokens:
+            return {
+                'success': False,
+                'error': '; '.join(errors),
+                'failed_tokens': failed_tokens,
+                'transaction_hash': None
+            }
+
+        print(f"Batch transferring {count} NFTs to {to_address}")
+        tx_hash, nonce = _send_contract_transaction(
+            contract.functions.batchTransferFrom(
+                [f for f, _ in transfers], to_address, [token_id for _, token_id in transfers]
+            ),
+            account,
+            account.key,
+            gas=BATCH_TRANSFER_BASE_GAS + BATCH_TRANSFER_GAS_PER_TOKEN * count
+        )
+
+        def invalidate():
+            for from_address, token_id in transfers:
+                invalidate_token_cache(token_id, from_address, to_address)
+
+        invalidate()
+
+        if not wait_for_receipt:
+            tx_hash_hex = _to_hex_hash(tx_hash)
+            print(f"Batch transfer submitted, TX: {tx_hash_hex} (nonce {nonce})")
+            return {
+                'success': True,
+                'pending': True,
+                'transaction_hash': tx_hash_hex,
+                'nonce': nonce
+            }
+
+        tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+
+        if tx_receipt['status'] == 1:
+            tx_hash_hex = _to_hex_hash(tx_hash)
+            invalidate()
+            print(f"Batch transfer successful! TX: {tx_hash_hex}")
+            return {
+                'success': True,
+                'transaction_hash': tx_hash_hex,
+                'block_number': tx_receipt['blockNumber'],
+                'gas_used': tx_receipt['gasUsed']
+            }
+        else:
+            raise Exception("Batch transfer was mined but failed on chain")
+
+    except Exception as e:
+        error_message = str(e)
+        print(f"Batch transfer failed: {error_message}")
+        if "insufficient funds" in error_message.lower():
+            error_message = "Insufficient ETH for gas fees in backend wallet"
+        return {
+            'success': False,
+            'error': error_message,
+            'transaction_hash': None
+        }
+
+
+def get_transaction_receipts(tx_hashes: list) -> dict:
+    """
+    Fetch receipts for many transactions in a single JSON-RPC batch request
+
+    Args:
+        tx_hashes: 0x-prefixed transaction hashes
+
+    Returns:
+        dict mapping each hash to its raw receipt, or None while still pending
+    """
+    w3 = get_w3()
+    if not tx_hashes:
+        return {}
+
+    responses = w3.provider.make_batch_request(
+        [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes]
+    )
+    if isinstance(responses, dict):
+        # The whole batch was rejected (single error object)
+        raise Exception(responses.get('error', 'Batch request failed'))
+
+    receipts = {}
+    for tx_hash, response in zip(tx_hashes, responses):
+        if response.get('error'):
+            print(f"Error fetching receipt for {tx_hash}: {response['error']}")
+        receipts[tx_hash] = response.get('result')
+    return receipts
+
+
+def get_minted_token_id(raw_receipt: dict):
+    """Read the token ID from the CreditMinted log of a raw (unformatted) receipt"""
+    for log in raw_receipt.get('logs', []):
+        topics = log.get('topics', [])
+        if len(topics) >= 3 and topics[0].lower().removeprefix('0x') == CREDIT_MINTED_TOPIC.lower().removeprefix('0x'):
+            return int(topics[2], 16)
+    return None
+
+
+def check_nft_approval(owner_address: str, token_id: int, fresh: bool = False) -> dict:
     """
     Check if the backend wallet is approved to transfer a specific NFT
 
     Args:
         owner_address: Owner's wallet address
         token_id: Token ID to check
+        fresh: Bypass the read cache (e.g. right after the owner approved)
 
     Returns:
         dict with approval status and approved address
     """
+    contract = get_contract()
     try:
         if not contract:
             return {'success': False, 'approved': False, 'error': 'Contract not initialized'}
 
         owner_address = Web3.to_checksum_address(owner_address)
 
-        # Get the private key account (backend wallet)
-        private_key = PRIVATE_KEY if PRIVATE_KEY.startswith('0x') else f'0x{PRIVATE_KEY}'
-        account = w3.eth.account.from_key(private_key)
-        backend_address = account.address
+        backend_address = get_backend_account().address
 
         # Check if backend is approved for this specific token
         try:
-            approved_address = contract.functions.getApproved(token_id).call()
+            approved_address = cached_get_approved(token_id, fresh=fresh)
             is_approved = approved_address.lower() == backend_address.lower()
         except:
             approved_address = None
@@ -452,10 +940,11 @@ def check_nft_approval(owner_address: str, token_id: int) -> dict:
 
         # Also check if backend has operator approval for all tokens
         try:
-            is_approved_for_all = contract.functions.isApprovedForAll(
+            is_approved_for_all = cached_is_approved_for_all(
                 owner_address,
-                backend_address
-            ).call()
+                backend_address,
+                fresh=fresh
+            )
         except:
             is_approved_for_all = False
 
@@ -472,11 +961,79 @@ def check_nft_approval(owner_address: str, token_id: int) -> dict:
         return {'success': False, 'approved': False, 'error': str(e)}
 
 
+def check_nft_approvals(owner_address: str, token_ids: list, fresh: bool = False) -> dict:
+    """
+    Check whether the backend wallet may transfer each of an owner's NFTs
+
+    One isApprovedForAll read covers every token; only if the owner has not
+    approved the backend as operator are the tokens' getApproved values
+    read, as a single batched request for the ones not already cached.
+
+    Args:
+        owner_address: Owner's wallet address
+        token_ids: Token IDs to check
+        fresh: Bypass the read cache (e.g. right after the owner approved)
+
+    Returns:
+        dict with is_approved_for_all and per-token 'approvals'
+        ({token_id: {'approved', 'approved_address'}})
+    """
+    contract = get_contract()
+    try:
+        if not contract:
+            return {'success': False, 'error': 'Contract not initialized'}
+
+        owner_address = Web3.to_checksum_address(owner_address)
+        backend_address = get_backend_account().address
+
+        is_approved_for_all = cached_is_approved_for_all(owner_address, backend_address, fresh=fresh)
+        if is_approved_for_all:
+            approvals = {
+                token_id: {'approved': True, 'approved_address': None}
+                for token_id in token_ids
+            }
+        else:
+            approvals = {}
+            for token_id, approved_address in zip(token_ids, cached_get_approved_many(token_ids, fresh=fresh)):
+                if isinstance(approved_address, Exception):
+                    # Nonexistent or burned token
+                    approved_address = None
+                approvals[token_id] = {
+                    'approved': bool(approved_address) and approved_address.lower() == backend_address.lower(),
+                    'approved_address': approved_address
+                }
+
+        return {
+            'success': True,
+            'is_approved_for_all': is_approved_for_all,
+            'approvals': approvals,
+            'backend_address': backend_address
+        }
+
+    except Exception as e:
+        print(f"Error checking approvals: {e}")
+        return {'success': False, 'error': str(e)}
+
+
 def get_connection_status() -> dict:
-    """Check the blockchain connection status"""
+    """
+    Check the blockchain connection status
+
+    Served from the head tracker's in-memory snapshot; no RPC calls are made
+    here once the tracker is running.
+    """
+    from .head_tracker import get_head_tracker
+
+    head = get_head_tracker().snapshot()
     return {
-        "connected": w3.is_connected(),
-        "chain_id": w3.eth.chain_id if w3.is_connected() else None,
+        "connected": head['connected'],
+        "chain_id": head['chain_id'],
         "contract_address": CONTRACT_ADDRESS,
-        "latest_block": w3.eth.block_number if w3.is_connected() else None,
+        "latest_block": head['latest_block'],
+        "base_fee_per_gas": head['base_fee_per_gas'],
+        "suggested_priority_fee": head['suggested_priority_fee'],
+        "head_lag_seconds": head['head_lag_seconds'],
+        "poll_age_seconds": head['poll_age_seconds'],
+        "read_cache": chain_cache.stats(),
+        "rpc_providers": get_rpc_pool().stats(),
     }
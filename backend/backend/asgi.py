@@ -0,0 +1,7 @@
+import os
+from django.core.asgi import get_asgi_application
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+application = get_asgi_application()
+
+from api.startup import warm_up_on_start  # noqa: E402
+warm_up_on_start()
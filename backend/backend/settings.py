@@ -40,7 +40,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
-DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3','NAME': BASE_DIR / 'db.sqlite3',}}
+ASGI_APPLICATION = 'backend.asgi.application'
+DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3','NAME': os.getenv('DATABASE_PATH') or BASE_DIR / 'db.sqlite3',}}
 AUTH_PASSWORD_VALIDATORS = []
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -49,5 +50,22 @@ USE_TZ = True
 STATIC_URL = '/static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CORS_ALLOW_ALL_ORIGINS = True
+# Response headers browser clients may read (activity history paging)
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor']
+
+# "shared" is visible to every worker process on the host (file-based by
+# default; point SHARED_CACHE_BACKEND/LOCATION at Redis or Memcached to share
+# across hosts)
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {
+        'BACKEND': os.getenv('SHARED_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('SHARED_CACHE_LOCATION', '/tmp/carbonsmart-cache'),
+    },
+}
 
 AI_ENGINE_URL = "http://127.0.0.1:8002/predict"
+
+# Contract access: "web3" (the deployed contract) or "memory" (in-process
+# simulator for staging and load tests; see api/blockchain_utils.py)
+CHAIN_BACKEND = os.getenv('CHAIN_BACKEND', 'web3')
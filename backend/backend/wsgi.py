@@ -3,3 +3,6 @@ import os
 from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 application = get_wsgi_application()
+
+from api.startup import warm_up_on_start  # noqa: E402
+warm_up_on_start()
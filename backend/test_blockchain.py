@@ -24,7 +24,7 @@ except Exception as e:
 from api.web3_interact import (
     get_connection_status,
     get_user_balance,
-    get_user_emissions,
+    get_user_credits,
     mint_credit
 )
 
@@ -61,11 +61,12 @@ def test_read_operations():
     try:
         balance = get_user_balance(test_address)
         print(f"\n💰 Balance for {test_address[:10]}...:")
-        print(f"  {balance} CCT tokens")
+        print(f"  {balance} CO2 credit NFTs")
         
-        emissions = get_user_emissions(test_address)
-        print(f"\n🏭 Total Emissions:")
-        print(f"  {emissions} kg CO2")
+        credits = get_user_credits(test_address)
+        offset_kg = sum(credit['co2_amount_kg'] for credit in credits.get('credits', []))
+        print(f"\n🌱 Total Offsets:")
+        print(f"  {offset_kg} kg CO2 across {len(credits.get('credits', []))} credits")
         
         print("\n✅ Read operations successful!")
         return True
@@ -93,15 +94,18 @@ def test_mint_operation():
     
     try:
         print("\n⏳ Sending transaction...")
-        tx_hash = mint_credit(test_address, test_amount)
-        print(f"\n✅ Successfully minted credits!")
+        result = mint_credit(test_address, test_amount, activity_type="tree_planting")
+        if not result.get('success'):
+            raise Exception(result.get('error'))
+        tx_hash = result['transaction_hash']
+        print(f"\n✅ Successfully minted credit #{result.get('token_id')}!")
         print(f"   Transaction Hash: {tx_hash}")
         print(f"\n🔗 View on Etherscan:")
         print(f"   https://sepolia.etherscan.io/tx/{tx_hash}")
         
         # Check new balance
         new_balance = get_user_balance(test_address)
-        print(f"\n💰 New Balance: {new_balance} CCT")
+        print(f"\n💰 New Balance: {new_balance} CO2 credit NFTs")
         
         return True
     except Exception as e:
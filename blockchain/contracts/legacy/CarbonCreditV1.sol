@@ -0,0 +1,159 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/token/ERC721/ERC721.sol";
+import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/utils/Counters.sol";
+
+// The unpacked credit layout (three slots plus string storage per credit)
+// that CarbonCredit used before. Kept so `npm run bench:gas` can compare the
+// two and scripts/migrate-credits.js can read an old deployment.
+contract CarbonCreditV1 is ERC721, Ownable {
+    using Counters for Counters.Counter;
+    Counters.Counter private _tokenIds;
+
+    struct Credit {
+        uint256 co2Amount; // in grams
+        uint256 timestamp;
+        string activityType;
+    }
+
+    mapping(uint256 => Credit) public credits;
+
+    // owner => index => tokenId, and tokenId => index in its owner's list
+    mapping(address => mapping(uint256 => uint256)) private _ownedTokens;
+    mapping(uint256 => uint256) private _ownedTokensIndex;
+
+    event CreditMinted(
+        address indexed user,
+        uint256 indexed tokenId,
+        uint256 co2Amount,
+        string activityType
+    );
+
+    constructor() ERC721("CarbonCredit", "CO2") {}
+
+    function mintCredit(
+        address user,
+        uint256 co2Amount,
+        string memory activityType
+    ) external onlyOwner returns (uint256) {
+        _tokenIds.increment();
+        uint256 newTokenId = _tokenIds.current();
+
+        _mint(user, newTokenId);
+
+        credits[newTokenId] = Credit({
+            co2Amount: co2Amount,
+            timestamp: block.timestamp,
+            activityType: activityType
+        });
+
+        emit CreditMinted(user, newTokenId, co2Amount, activityType);
+
+        return newTokenId;
+    }
+
+    function getCredit(uint256 tokenId) external view returns (Credit memory) {
+        require(_exists(tokenId), "Credit does not exist");
+        return credits[tokenId];
+    }
+
+    function getUserCredits(address user) external view returns (uint256[] memory) {
+        uint256 balance = balanceOf(user);
+        uint256[] memory tokenIds = new uint256[](balance);
+
+        for (uint256 i = 0; i < balance; i++) {
+            tokenIds[i] = _ownedTokens[user][i];
+        }
+
+        return tokenIds;
+    }
+
+    function getUserCreditsPaged(
+        address user,
+        uint256 offset,
+        uint256 limit
+    ) external view returns (uint256[] memory) {
+        uint256 balance = balanceOf(user);
+        if (offset >= balance) {
+            return new uint256[](0);
+        }
+
+        // Clamp before adding, so a huge limit can't overflow offset + limit
+        if (limit > balance - offset) {
+            limit = balance - offset;
+        }
+        uint256 end = offset + limit;
+
+        uint256[] memory tokenIds = new uint256[](end - offset);
+        for (uint256 i = offset; i < end; i++) {
+            tokenIds[i - offset] = _ownedTokens[user][i];
+        }
+
+        return tokenIds;
+    }
+
+    // Move several credits, possibly from different owners, to one recipient in
+    // a single transaction. The caller must be the owner or approved for every
+    // token, and the whole batch reverts if any single transfer would fail.
+    function batchTransferFrom(
+        address[] calldata from,
+        address to,
+        uint256[] calldata tokenIds
+    ) external {
+        require(from.length == tokenIds.length, "Length mismatch");
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            require(
+                _isApprovedOrOwner(_msgSender(), tokenIds[i]),
+                "ERC721: caller is not token owner or approved"
+            );
+            _transfer(from[i], to, tokenIds[i]);
+        }
+    }
+
+    function tokenOfOwnerByIndex(address owner, uint256 index) external view returns (uint256) {
+        require(index < balanceOf(owner), "Owner index out of bounds");
+        return _ownedTokens[owner][index];
+    }
+
+    // Keep the per-owner index in sync on mint, transfer and burn
+    // (same bookkeeping as ERC721Enumerable, without the global token list).
+    function _beforeTokenTransfer(
+        address from,
+        address to,
+        uint256 firstTokenId,
+        uint256 batchSize
+    ) internal virtual override {
+        super._beforeTokenTransfer(from, to, firstTokenId, batchSize);
+        require(batchSize == 1, "Consecutive transfers not supported");
+
+        if (from != address(0) && from != to) {
+            _removeTokenFromOwnerEnumeration(from, firstTokenId);
+        }
+        if (to != address(0) && to != from) {
+            _addTokenToOwnerEnumeration(to, firstTokenId);
+        }
+    }
+
+    function _addTokenToOwnerEnumeration(address to, uint256 tokenId) private {
+        uint256 length = balanceOf(to);
+        _ownedTokens[to][length] = tokenId;
+        _ownedTokensIndex[tokenId] = length;
+    }
+
+    function _removeTokenFromOwnerEnumeration(address from, uint256 tokenId) private {
+        // Swap the last token into the slot being removed, then drop the tail
+        uint256 lastTokenIndex = balanceOf(from) - 1;
+        uint256 tokenIndex = _ownedTokensIndex[tokenId];
+
+        if (tokenIndex != lastTokenIndex) {
+            uint256 lastTokenId = _ownedTokens[from][lastTokenIndex];
+            _ownedTokens[from][tokenIndex] = lastTokenId;
+            _ownedTokensIndex[lastTokenId] = tokenIndex;
+        }
+
+        delete _ownedTokensIndex[tokenId];
+        delete _ownedTokens[from][lastTokenIndex];
+    }
+}
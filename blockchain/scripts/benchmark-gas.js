@@ -0,0 +1,117 @@
+const hre = require("hardhat");
+
+// Total supply to mint before measuring read costs
+const TOTAL_SUPPLY = parseInt(process.env.BENCH_TOTAL_SUPPLY || "10000", 10);
+// Tokens held by the wallet we query (the rest go to a filler wallet)
+const USER_BALANCE = parseInt(process.env.BENCH_USER_BALANCE || "25", 10);
+const PAGE_SIZE = parseInt(process.env.BENCH_PAGE_SIZE || "100", 10);
+// Tokens moved by one batchTransferFrom (a marketplace checkout)
+const BATCH_SIZE = parseInt(process.env.BENCH_BATCH_SIZE || "10", 10);
+// Mints per contract when comparing the packed credit layout with CarbonCreditV1
+const LAYOUT_MINTS = parseInt(process.env.BENCH_LAYOUT_MINTS || "100", 10);
+
+// Average mint gas and one getCredit read on a fresh deployment of a contract
+async function measureLayout(contractName, to) {
+  const Factory = await hre.ethers.getContractFactory(contractName);
+  const contract = await Factory.deploy();
+  await contract.waitForDeployment();
+
+  let mintGasTotal = 0n;
+  for (let i = 1; i <= LAYOUT_MINTS; i++) {
+    const receipt = await (await contract.mintCredit(to, 1000 + i, "tree_planting")).wait();
+    mintGasTotal += receipt.gasUsed;
+  }
+  return {
+    mintGas: Number(mintGasTotal / BigInt(LAYOUT_MINTS)),
+    getCreditGas: Number(await contract.getCredit.estimateGas(LAYOUT_MINTS)),
+  };
+}
+
+async function main() {
+  console.log("⛽ CarbonCredit read-cost benchmark on network:", hre.network.name);
+
+  const [owner, user, filler] = await hre.ethers.getSigners();
+
+  const CarbonCredit = await hre.ethers.getContractFactory("CarbonCredit");
+  const carbonCredit = await CarbonCredit.deploy();
+  await carbonCredit.waitForDeployment();
+
+  console.log(`Minting ${TOTAL_SUPPLY} credits (${USER_BALANCE} to the queried wallet)...`);
+
+  // Spread the user's tokens across the whole ID range so the old
+  // full-supply scan would have had to walk every token to find them.
+  const stride = Math.max(1, Math.floor(TOTAL_SUPPLY / USER_BALANCE));
+  let mintGasTotal = 0n;
+  for (let i = 1; i <= TOTAL_SUPPLY; i++) {
+    const to = i % stride === 0 && i / stride <= USER_BALANCE ? user.address : filler.address;
+    const tx = await carbonCredit.mintCredit(to, 1000 + i, "tree_planting");
+    const receipt = await tx.wait();
+    mintGasTotal += receipt.gasUsed;
+
+    if (i % 1000 === 0) {
+      console.log(`  minted ${i}/${TOTAL_SUPPLY}`);
+    }
+  }
+
+  // Exercise the transfer bookkeeping before measuring
+  const userTokens = await carbonCredit.getUserCredits(user.address);
+  const transferTx = await carbonCredit
+    .connect(user)
+    .transferFrom(user.address, filler.address, userTokens[0]);
+  const transferReceipt = await transferTx.wait();
+
+  const balance = await carbonCredit.balanceOf(user.address);
+
+  const results = {
+    totalSupply: TOTAL_SUPPLY,
+    userBalance: Number(balance),
+    avgMintGas: Number(mintGasTotal / BigInt(TOTAL_SUPPLY)),
+    transferGas: Number(transferReceipt.gasUsed),
+    getCreditGas: Number(await carbonCredit.getCredit.estimateGas(userTokens[0])),
+    getUserCreditsGas: Number(await carbonCredit.getUserCredits.estimateGas(user.address)),
+    getUserCreditsPagedGas: Number(
+      await carbonCredit.getUserCreditsPaged.estimateGas(user.address, 0, PAGE_SIZE)
+    ),
+    fillerGetUserCreditsPagedGas: Number(
+      await carbonCredit.getUserCreditsPaged.estimateGas(filler.address, 0, PAGE_SIZE)
+    ),
+  };
+
+  // Checkout path: the backend wallet moves several of the filler's tokens in one transaction
+  await (await carbonCredit.connect(filler).setApprovalForAll(owner.address, true)).wait();
+  const batchTokens = await carbonCredit.getUserCreditsPaged(filler.address, 0, BATCH_SIZE);
+  const batchTx = await carbonCredit.batchTransferFrom(
+    batchTokens.map(() => filler.address),
+    user.address,
+    batchTokens
+  );
+  const batchReceipt = await batchTx.wait();
+  results.batchSize = batchTokens.length;
+  results.batchTransferGas = Number(batchReceipt.gasUsed);
+  results.batchTransferGasPerToken = Math.round(Number(batchReceipt.gasUsed) / batchTokens.length);
+
+  console.log("\n📊 Results");
+  console.table(results);
+
+  // Same mints against the unpacked layout still found on older deployments
+  const unpacked = await measureLayout("CarbonCreditV1", user.address);
+  const packed = await measureLayout("CarbonCredit", user.address);
+  console.log(`\n📦 Credit storage layout (average of ${LAYOUT_MINTS} mints)`);
+  console.table({
+    mintCredit: {
+      unpacked: unpacked.mintGas,
+      packed: packed.mintGas,
+      saved: unpacked.mintGas - packed.mintGas,
+    },
+    getCredit: {
+      unpacked: unpacked.getCreditGas,
+      packed: packed.getCreditGas,
+      saved: unpacked.getCreditGas - packed.getCreditGas,
+    },
+  });
+}
+
+main().catch((err) => {
+  console.error("❌ Benchmark failed:", err);
+  process.exit(1);
+});
@@ -0,0 +1,94 @@
+const hre = require("hardhat");
+
+// Copies every credit of a CarbonCreditV1 (unpacked layout) deployment into a
+// freshly deployed CarbonCredit, keeping token IDs, owners and mint times, so
+// the backend's database rows stay valid after CONTRACT_ADDRESS is switched.
+//
+//   OLD_CONTRACT_ADDRESS=0x... NEW_CONTRACT_ADDRESS=0x... \
+//     npx hardhat run scripts/migrate-credits.js --network sepolia
+//
+// Tokens already present in the new contract are skipped, so an interrupted
+// run can simply be started again. Import is closed at the end unless
+// MIGRATE_KEEP_OPEN is set.
+const OLD_CONTRACT_ADDRESS = process.env.OLD_CONTRACT_ADDRESS;
+const NEW_CONTRACT_ADDRESS = process.env.NEW_CONTRACT_ADDRESS;
+// Credits imported per transaction
+const BATCH_SIZE = parseInt(process.env.MIGRATE_BATCH_SIZE || "50", 10);
+
+async function exists(contract, tokenId) {
+  try {
+    await contract.ownerOf(tokenId);
+    return true;
+  } catch (err) {
+    return false;
+  }
+}
+
+function packActivityType(activityType) {
+  const bytes = hre.ethers.toUtf8Bytes(activityType);
+  if (bytes.length > 32) {
+    throw new Error(`Activity type "${activityType}" is longer than 32 bytes`);
+  }
+  return hre.ethers.zeroPadBytes(bytes, 32);
+}
+
+async function main() {
+  if (!OLD_CONTRACT_ADDRESS || !NEW_CONTRACT_ADDRESS) {
+    throw new Error("Set OLD_CONTRACT_ADDRESS and NEW_CONTRACT_ADDRESS");
+  }
+  console.log("🚚 Migrating credits on network:", hre.network.name);
+
+  const oldContract = await hre.ethers.getContractAt("CarbonCreditV1", OLD_CONTRACT_ADDRESS);
+  const newContract = await hre.ethers.getContractAt("CarbonCredit", NEW_CONTRACT_ADDRESS);
+
+  let batch = { owners: [], tokenIds: [], credits: [] };
+  let imported = 0;
+  let skipped = 0;
+
+  const flush = async () => {
+    if (batch.tokenIds.length === 0) return;
+    const tx = await newContract.importCredits(batch.owners, batch.tokenIds, batch.credits);
+    const receipt = await tx.wait();
+    imported += batch.tokenIds.length;
+    console.log(
+      `  imported up to token ${batch.tokenIds[batch.tokenIds.length - 1]} ` +
+      `(${imported} total, ${receipt.gasUsed} gas for ${batch.tokenIds.length})`
+    );
+    batch = { owners: [], tokenIds: [], credits: [] };
+  };
+
+  // V1 mints IDs 1, 2, 3, ... and never burns, so the first missing ID ends the range
+  for (let tokenId = 1n; await exists(oldContract, tokenId); tokenId++) {
+    if (await exists(newContract, tokenId)) {
+      skipped++;
+      continue;
+    }
+    const [owner, credit] = await Promise.all([
+      oldContract.ownerOf(tokenId),
+      oldContract.getCredit(tokenId),
+    ]);
+    batch.owners.push(owner);
+    batch.tokenIds.push(tokenId);
+    batch.credits.push({
+      co2Amount: credit.co2Amount,
+      timestamp: credit.timestamp,
+      activityType: packActivityType(credit.activityType),
+    });
+    if (batch.tokenIds.length >= BATCH_SIZE) {
+      await flush();
+    }
+  }
+  await flush();
+
+  console.log(`✅ Imported ${imported} credits (${skipped} already present)`);
+  if (!process.env.MIGRATE_KEEP_OPEN) {
+    await (await newContract.finishCreditImport()).wait();
+    console.log("🔒 Credit import closed");
+  }
+  console.log("⚠️ Owners must call setApprovalForAll for the backend wallet again on the new contract.");
+}
+
+main().catch((err) => {
+  console.error("❌ Migration failed:", err);
+  process.exit(1);
+});
@@ -98,7 +98,8 @@ def get_user_credits(user_wallet_address):
                 'token_id': token_id,
                 'co2_amount_grams': credit_data[0],
                 'timestamp': credit_data[1],
-                'activity_type': credit_data[2]
+                # bytes32, zero-padded UTF-8
+                'activity_type': credit_data[2].rstrip(b'\0').decode()
             })
         
         return {'success': True, 'credits': credits}
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useSession } from 'next-auth/react'
 import { useAccount, useWalletClient } from 'wagmi'
 import { motion } from 'framer-motion'
@@ -37,6 +37,8 @@ export default function MarketplacePage() {
   const router = useRouter()
 
   const [listings, setListings] = useState<Listing[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [userCredits, setUserCredits] = useState<any[]>([])
   const [isLoading, setIsLoading] = useState(true)
   const [purchasingId, setPurchasingId] = useState<string | null>(null)
@@ -51,10 +53,13 @@ export default function MarketplacePage() {
     marketplaceOperator: string
   } | null>(null)
 
-  // Load marketplace listings on mount
+  // Latest listings request; responses to older ones (e.g. a previous filter) are dropped
+  const listingsRequest = useRef(0)
+
+  // Load marketplace listings on mount and whenever the filter changes
   useEffect(() => {
     loadMarketplaceListings()
-  }, [])
+  }, [filter])
 
   // Load user credits when wallet is connected
   useEffect(() => {
@@ -149,16 +154,45 @@ export default function MarketplacePage() {
     }
   }
 
+  // The activity-type filter is applied by the server, so every page matches it
+  const listingFilterParams = () => (filter === 'all' ? {} : { activity_type: filter })
+
   const loadMarketplaceListings = async () => {
+    const request = ++listingsRequest.current
     try {
       setIsLoading(true)
-      const fetchedListings = await apiService.getMarketplaceListings()
-      setListings(fetchedListings)
+      setListings([])
+      setNextCursor(null)
+      const page = await apiService.getMarketplaceListings(listingFilterParams())
+      if (request !== listingsRequest.current) return
+      setListings(page.listings)
+      setNextCursor(page.hasMore ? page.nextCursor : null)
     } catch (error) {
       console.error('Error loading marketplace:', error)
       toast.error('Failed to load marketplace listings')
     } finally {
-      setIsLoading(false)
+      if (request === listingsRequest.current) setIsLoading(false)
+    }
+  }
+
+  const loadMoreListings = async () => {
+    if (!nextCursor) return
+
+    const request = listingsRequest.current
+    try {
+      setIsLoadingMore(true)
+      const page = await apiService.getMarketplaceListings({ ...listingFilterParams(), cursor: nextCursor })
+      if (request !== listingsRequest.current) return
+      setListings((current) => {
+        const seen = new Set(current.map((l) => l.id))
+        return [...current, ...page.listings.filter((l: Listing) => !seen.has(l.id))]
+      })
+      setNextCursor(page.hasMore ? page.nextCursor : null)
+    } catch (error) {
+      console.error('Error loading more listings:', error)
+      toast.error('Failed to load more listings')
+    } finally {
+      setIsLoadingMore(false)
     }
   }
 
@@ -266,10 +300,6 @@ export default function MarketplacePage() {
     }
   }
 
-  const filteredListings = filter === 'all'
-    ? listings
-    : listings.filter(l => l.activityType === filter)
-
   const activityTypeLabels: Record<string, string> = {
     tree_planting: 'Tree Planting',
     renewable_energy: 'Renewable Energy',
@@ -313,7 +343,7 @@ export default function MarketplacePage() {
               <div className="flex items-center justify-between">
                 <div>
                   <p className="text-sm text-neutral-500">Active Listings</p>
-                  <p className="text-2xl font-bold text-neutral-900">{listings.length}</p>
+                  <p className="text-2xl font-bold text-neutral-900">{listings.length}{nextCursor ? '+' : ''}</p>
                 </div>
                 <div className="p-3 rounded-xl bg-primary-100">
                   <ShoppingCartIcon className="h-6 w-6 text-primary-600" />
@@ -385,9 +415,9 @@ export default function MarketplacePage() {
           ) : (
             <>
               {/* Listings Grid */}
-              {filteredListings.length > 0 ? (
+              {listings.length > 0 ? (
                 <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-              {filteredListings.map((listing) => (
+              {listings.map((listing) => (
                 <motion.div
                   key={listing.id}
                   initial={{ opacity: 0, scale: 0.95 }}
@@ -485,6 +515,19 @@ export default function MarketplacePage() {
               </p>
             </div>
           )}
+
+              {/* More pages of listings */}
+              {nextCursor && (
+                <div className="mt-8 text-center">
+                  <button
+                    onClick={loadMoreListings}
+                    disabled={isLoadingMore}
+                    className="px-6 py-2.5 rounded-lg font-medium bg-white border border-neutral-200 text-neutral-700 hover:bg-neutral-100 transition-colors disabled:cursor-wait"
+                  >
+                    {isLoadingMore ? 'Loading...' : 'Load more listings'}
+                  </button>
+                </div>
+              )}
           </>
         )}
 
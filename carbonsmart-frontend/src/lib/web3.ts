@@ -5,9 +5,9 @@ const CONTRACT_ADDRESS = process.env.NEXT_PUBLIC_CONTRACT_ADDRESS || '0x100bd251
 
 const CONTRACT_ABI = [
   "function getUserCredits(address user) external view returns (uint256[])",
-  "function getCredit(uint256 tokenId) external view returns (tuple(uint256 co2Amount, uint256 timestamp, string activityType))",
+  "function getCredit(uint256 tokenId) external view returns (tuple(uint128 co2Amount, uint64 timestamp, bytes32 activityType))",
   "function balanceOf(address owner) external view returns (uint256)",
-  "event CreditMinted(address indexed user, uint256 indexed tokenId, uint256 co2Amount, string activityType)"
+  "event CreditMinted(address indexed user, uint256 indexed tokenId, uint256 co2Amount, bytes32 activityType)"
 ];
 
 export class Web3Service {
@@ -55,7 +55,8 @@ export class Web3Service {
           tokenId: tokenId.toString(),
           co2Amount: parseFloat(ethers.utils.formatUnits(credit.co2Amount, 0)) / 1000, // Convert grams to kg
           timestamp: new Date(credit.timestamp.toNumber() * 1000),
-          activityType: credit.activityType
+          // bytes32, zero-padded UTF-8
+          activityType: ethers.utils.toUtf8String(credit.activityType).replace(/\0+$/, '')
         };
       })
     );
@@ -219,14 +219,50 @@ class ApiService {
   }
 
   // Marketplace API methods
-  async getMarketplaceListings() {
+  // One page of listings; pass nextCursor back as cursor for the next page while hasMore
+  async getMarketplaceListings(params?: {
+    activity_type?: string
+    min_price?: number
+    max_price?: number
+    min_co2?: number
+    max_co2?: number
+    seller?: string
+    sort?: string
+    limit?: number
+    cursor?: string
+  }): Promise<{ listings: any[]; nextCursor: string | null; hasMore: boolean }> {
     try {
-      const response = await this.api.get('/api/marketplace/listings/')
-      return response.data.listings || []
+      const response = await this.api.get('/api/marketplace/listings/', { params })
+      return {
+        listings: response.data.listings || [],
+        nextCursor: response.data.nextCursor || null,
+        hasMore: Boolean(response.data.hasMore),
+      }
     } catch (error) {
       console.error('Error fetching marketplace listings:', error)
-      return []
+      return { listings: [], nextCursor: null, hasMore: false }
+    }
+  }
+
+  // Live marketplace updates; the browser reconnects and resumes from the last event id by itself
+  subscribeMarketplaceEvents(handlers: {
+    onListingCreated?: (listing: any) => void
+    onListingSold?: (listing: any) => void
+    onPriceChanged?: (listing: any) => void
+    onReset?: () => void
+  }): () => void {
+    const baseURL = this.api.defaults.baseURL || ''
+    const source = new EventSource(`${baseURL}/api/marketplace/events/`)
+    const listen = (type: string, handler?: (listing: any) => void) => {
+      if (handler) {
+        source.addEventListener(type, (event) => handler(JSON.parse((event as MessageEvent).data)))
+      }
     }
+    listen('listing_created', handlers.onListingCreated)
+    listen('listing_sold', handlers.onListingSold)
+    listen('price_changed', handlers.onPriceChanged)
+    listen('reset', handlers.onReset && (() => handlers.onReset!()))
+    return () => source.close()
   }
 
   async getUserNFTCredits(walletAddress: string) {
@@ -273,6 +309,37 @@ class ApiService {
     }
   }
 
+  async checkoutMarketplaceListings(data: {
+    listingIds: string[]
+    buyerWallet: string
+    buyer: string
+  }) {
+    try {
+      const response = await this.api.post('/api/marketplace/checkout/', data)
+      return response.data
+    } catch (error: any) {
+      console.error('Error checking out listings:', error)
+      const errorMsg = error?.response?.data?.error || 'Failed to complete checkout'
+      toast.error(errorMsg)
+      throw error
+    }
+  }
+
+  async getMarketplaceAnalytics(params?: {
+    activity_type?: string
+    interval?: 'hour' | 'day' | 'week'
+    start?: string
+    end?: string
+  }) {
+    try {
+      const response = await this.api.get('/api/marketplace/analytics/', { params })
+      return response.data
+    } catch (error) {
+      console.error('Error fetching marketplace analytics:', error)
+      return { success: false, series: [], summary: [] }
+    }
+  }
+
   async checkApprovalStatus(tokenId: number, ownerAddress: string) {
     try {
       const response = await this.api.get(`/api/marketplace/check-approval/${tokenId}/${ownerAddress}/`)
@@ -283,6 +350,20 @@ class ApiService {
     }
   }
 
+  async checkApprovalStatuses(tokenIds: number[], ownerAddress: string, refresh = false) {
+    try {
+      const response = await this.api.post('/api/marketplace/check-approvals/', {
+        ownerAddress,
+        tokenIds,
+        refresh,
+      })
+      return response.data
+    } catch (error) {
+      console.error('Error checking approvals:', error)
+      return { success: false, is_approved_for_all: false, approvals: {} }
+    }
+  }
+
   async getMarketplaceContractAddress() {
     try {
       const response = await this.api.get('/api/marketplace/contract-address/')